@@ -0,0 +1,335 @@
+"""
+Benchmark de calc_stats.py
+==========================
+
+Ce script génère des fichiers synthétiques au format de numbers.csv et de
+sales_data.csv (taille, distribution et proportion de lignes malformées au
+choix), puis exécute chaque mode de lecture et de calcul de calc_stats.py.
+
+Pour chaque mode, il mesure:
+- le temps d'exécution (secondes)
+- le débit (Mo/s, rapporté à la taille du fichier non compressé)
+- le pic de mémoire résidente (RSS, Mo)
+
+Chaque mode tourne dans un processus Python séparé, pour que le pic de
+mémoire mesuré soit bien celui du mode.
+
+Utilisation:
+    python bench_calc_stats.py --lignes 1000000
+    python bench_calc_stats.py --lignes 1000000 10000000 --modes liste incremental
+    python bench_calc_stats.py --lignes 100000 --distribution lognormale --taux-malformes 0.01
+
+Dépendances:
+    - calc_stats.py et bench_commun.py (même dossier)
+    - numpy (optionnel, pour les modes bootstrap et corrélations)
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import calc_stats
+from bench_commun import (
+    preparer_gzip, pic_memoire_mo, mesurer_mode, module_disponible, infos_machine
+)
+
+
+# Nombre de lignes écrites à la fois par les générateurs
+TAILLE_LOT_ECRITURE = 10_000
+
+DISTRIBUTIONS = {
+    'normale': lambda g: g.gauss(45.0, 5.0),
+    'uniforme': lambda g: g.uniform(0.0, 100.0),
+    'exponentielle': lambda g: g.expovariate(1 / 45.0),
+    'lognormale': lambda g: g.lognormvariate(3.8, 0.5),
+}
+
+VALEURS_MALFORMEES = ['n/a', 'abc', '#VALEUR!', '1.2.3']
+
+PRODUITS = [
+    ('Ordinateur Portable', 'Informatique', 899.99),
+    ('Souris', 'Informatique', 29.99),
+    ('Clavier', 'Informatique', 79.99),
+    ('Écran', 'Informatique', 299.99),
+    ('Bureau', 'Mobilier', 249.99),
+    ('Chaise', 'Mobilier', 149.99),
+    ('Lampe', 'Mobilier', 39.99),
+]
+CLIENTS = [
+    ('Alice Dupont', 'Paris'), ('Bob Martin', 'Lyon'),
+    ('Charlie Durand', 'Marseille'), ('Diana Leroy', 'Toulouse'),
+    ('Eve Moreau', 'Nice'), ('Frank Bernard', 'Nantes'),
+]
+
+
+def generer_nombres(chemin, nb_lignes, distribution='normale', taux_malformes=0.0, graine=None):
+    """
+    Génère un fichier au format de numbers.csv (en-tête 'valeur', une valeur par ligne).
+
+    Args:
+        chemin (str): Fichier à créer
+        nb_lignes (int): Nombre de lignes de données
+        distribution (str): Clé de DISTRIBUTIONS
+        taux_malformes (float): Proportion de lignes non numériques
+        graine (int): Graine aléatoire
+
+    Returns:
+        int: Nombre de lignes malformées écrites
+    """
+    generateur = random.Random(graine)
+    tirer = DISTRIBUTIONS[distribution]
+    malformees = 0
+
+    with open(chemin, 'w', encoding='utf-8') as f:
+        f.write("valeur\n")
+        for debut in range(0, nb_lignes, TAILLE_LOT_ECRITURE):
+            lot = []
+            for _ in range(min(TAILLE_LOT_ECRITURE, nb_lignes - debut)):
+                if taux_malformes and generateur.random() < taux_malformes:
+                    lot.append(generateur.choice(VALEURS_MALFORMEES))
+                    malformees += 1
+                else:
+                    lot.append(f"{tirer(generateur):.2f}")
+            f.write("\n".join(lot) + "\n")
+
+    return malformees
+
+
+def generer_ventes(chemin, nb_lignes, distribution='normale', taux_malformes=0.0,
+                   graine=None, lignes_par_jour=50):
+    """
+    Génère un fichier au format de sales_data.csv, trié par date.
+
+    La quantité suit une loi exponentielle arrondie (au moins 1); le prix
+    unitaire du produit est perturbé selon la distribution choisie.
+
+    Args:
+        chemin (str): Fichier à créer
+        nb_lignes (int): Nombre de lignes de données
+        distribution (str): Clé de DISTRIBUTIONS (bruit sur le prix)
+        taux_malformes (float): Proportion de lignes malformées
+        graine (int): Graine aléatoire
+        lignes_par_jour (int): Nombre moyen de ventes par jour
+
+    Returns:
+        int: Nombre de lignes malformées écrites
+    """
+    generateur = random.Random(graine)
+    tirer = DISTRIBUTIONS[distribution]
+    jour = date(2024, 1, 1)
+    malformees = 0
+
+    with open(chemin, 'w', encoding='utf-8') as f:
+        f.write("date,produit,categorie,quantite,prix_unitaire,client,ville\n")
+        for debut in range(0, nb_lignes, TAILLE_LOT_ECRITURE):
+            lot = []
+            for _ in range(min(TAILLE_LOT_ECRITURE, nb_lignes - debut)):
+                if generateur.random() < 1 / lignes_par_jour:
+                    jour += timedelta(days=1)
+                produit, categorie, prix = generateur.choice(PRODUITS)
+                client, ville = generateur.choice(CLIENTS)
+                quantite = max(1, int(generateur.expovariate(1 / 3)))
+                prix_unitaire = prix * (1 + (tirer(generateur) - 45.0) / 450.0)
+                if taux_malformes and generateur.random() < taux_malformes:
+                    malformees += 1
+                    if generateur.random() < 0.5:
+                        lot.append(f"{jour.isoformat()},{produit},{categorie}")
+                        continue
+                    quantite = generateur.choice(VALEURS_MALFORMEES)
+                lot.append(f"{jour.isoformat()},{produit},{categorie},{quantite},"
+                           f"{prix_unitaire:.2f},{client},{ville}")
+            f.write("\n".join(lot) + "\n")
+
+    return malformees
+
+
+def mode_liste(fichier):
+    """Lecture complète en liste puis calcul exact (mode par défaut)."""
+    calc_stats.calculer_statistiques(calc_stats.lire_nombres_csv(fichier))
+
+
+def mode_incremental(fichier):
+    """Mode --cache à froid (sans cache existant)."""
+    cache = Path(f"{fichier}.bench-cache.json")
+    cache.unlink(missing_ok=True)
+    calc_stats.calculer_statistiques_incrementales(fichier, cache)
+    cache.unlink()
+
+
+def mode_gzip(fichier):
+    """Lecture du fichier compressé en gzip avec décompression en arrière-plan."""
+    calc_stats.calculer_statistiques(calc_stats.lire_nombres_csv(f"{fichier}.gz"))
+
+
+def mode_bootstrap(fichier):
+    """Lecture puis 1000 rééchantillons bootstrap sur tous les processeurs."""
+    nombres = calc_stats.lire_nombres_csv(fichier)
+    calc_stats.intervalles_bootstrap(nombres, 1000, graine=0, processus=os.cpu_count() or 1)
+
+
+def mode_glissant(fichier):
+    """Statistiques glissantes sur 7 jours de la colonne quantite."""
+    sortie = Path(f"{fichier}.bench-glissant.csv")
+    calc_stats.calculer_statistiques_glissantes(fichier, 'quantite', sortie, jours=7)
+    sortie.unlink()
+
+
+def mode_correlations(fichier):
+    """Matrice de corrélation en un seul processus."""
+    calc_stats.calculer_correlations(fichier)
+
+
+def mode_correlations_paralleles(fichier):
+    """Matrice de corrélation sur tous les processeurs."""
+    calc_stats.calculer_correlations(fichier, processus=os.cpu_count() or 1)
+
+
+# nom du mode -> (format du fichier, préparation hors mesure, fonction mesurée, besoin de numpy)
+MODES = {
+    'liste': ('nombres', None, mode_liste, False),
+    'incremental': ('nombres', None, mode_incremental, False),
+    'gzip': ('nombres', preparer_gzip, mode_gzip, False),
+    'bootstrap': ('nombres', None, mode_bootstrap, True),
+    'glissant': ('ventes', None, mode_glissant, False),
+    'correlations': ('ventes', None, mode_correlations, True),
+    'correlations_paralleles': ('ventes', None, mode_correlations_paralleles, True),
+}
+
+
+def executer_mode(mode, fichier):
+    """
+    Exécute un mode dans le processus courant et mesure son temps.
+
+    Les messages de calc_stats.py (avertissements des lignes malformées)
+    sont envoyés vers /dev/null pour ne pas fausser la mesure.
+
+    Returns:
+        dict: {'duree_s': ..., 'rss_max_mo': ...}
+    """
+    _, preparer, fonction, _ = MODES[mode]
+    if preparer is not None:
+        preparer(fichier)
+    with open(os.devnull, 'w') as poubelle, contextlib.redirect_stdout(poubelle):
+        debut = time.perf_counter()
+        fonction(fichier)
+        duree = time.perf_counter() - debut
+    return {'duree_s': duree, 'rss_max_mo': pic_memoire_mo()}
+
+
+def lancer_benchmark(tailles, modes, dossier, distribution='normale',
+                     taux_malformes=0.0, graine=0):
+    """
+    Génère les fichiers de chaque taille et mesure chaque mode.
+
+    Args:
+        tailles (list): Nombres de lignes à tester
+        modes (list): Modes à exécuter (clés de MODES)
+        dossier (Path): Dossier des fichiers générés
+        distribution (str): Distribution des valeurs
+        taux_malformes (float): Proportion de lignes malformées
+        graine (int): Graine aléatoire
+
+    Returns:
+        list: Un dictionnaire de résultats par (taille, mode)
+    """
+    dossier.mkdir(parents=True, exist_ok=True)
+    avec_numpy = module_disponible('numpy')
+    generateurs = {'nombres': generer_nombres, 'ventes': generer_ventes}
+    resultats = []
+
+    for nb_lignes in tailles:
+        fichiers = {}
+        for format_fichier in sorted({MODES[m][0] for m in modes}):
+            fichier = dossier / f"{format_fichier}_{nb_lignes}.csv"
+            print(f"📝 Génération de {fichier} ({nb_lignes} lignes)...")
+            malformees = generateurs[format_fichier](
+                fichier, nb_lignes, distribution, taux_malformes, graine
+            )
+            fichiers[format_fichier] = (fichier, malformees)
+
+        for mode in modes:
+            format_fichier, _, _, besoin_numpy = MODES[mode]
+            fichier, malformees = fichiers[format_fichier]
+            taille_mo = fichier.stat().st_size / (1024 * 1024)
+            resultat = {
+                'mode': mode,
+                'fichier': format_fichier,
+                'lignes': nb_lignes,
+                'lignes_malformees': malformees,
+                'taille_mo': round(taille_mo, 3),
+            }
+            if besoin_numpy and not avec_numpy:
+                resultat['ignore'] = "numpy non installé"
+            else:
+                print(f"⏱  {mode} sur {nb_lignes} lignes...")
+                resultat.update(mesurer_mode(__file__, mode, fichier))
+                if 'duree_s' in resultat:
+                    resultat['debit_mo_s'] = round(taille_mo / resultat['duree_s'], 3)
+            resultats.append(resultat)
+
+    return resultats
+
+
+def main():
+    """
+    Fonction principale du script.
+    """
+    if len(sys.argv) == 4 and sys.argv[1] == '--interne':
+        print(json.dumps(executer_mode(sys.argv[2], sys.argv[3])))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark de calc_stats.py")
+    parser.add_argument('--lignes', type=int, nargs='+', default=[1_000_000],
+                        help="Nombre(s) de lignes des fichiers générés")
+    parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=list(MODES),
+                        help="Modes à mesurer (défaut: tous)")
+    parser.add_argument('--distribution', choices=sorted(DISTRIBUTIONS), default='normale')
+    parser.add_argument('--taux-malformes', type=float, default=0.001,
+                        help="Proportion de lignes malformées (défaut: 0.001)")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--dossier', type=Path, default=Path('bench_donnees'),
+                        help="Dossier des fichiers générés (défaut: bench_donnees)")
+    parser.add_argument('--sortie', default='bench_calc_stats.json',
+                        help="Fichier JSON des résultats (défaut: bench_calc_stats.json)")
+    args = parser.parse_args()
+
+    resultats = lancer_benchmark(
+        args.lignes, args.modes, args.dossier,
+        distribution=args.distribution, taux_malformes=args.taux_malformes,
+        graine=args.graine,
+    )
+
+    rapport = {
+        'machine': infos_machine(),
+        'parametres': {
+            'distribution': args.distribution,
+            'taux_malformes': args.taux_malformes,
+            'graine': args.graine,
+        },
+        'resultats': resultats,
+    }
+    with open(args.sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+
+    print()
+    print(f"{'Mode':<26} {'Lignes':>12} {'Durée (s)':>10} {'Mo/s':>10} {'RSS max (Mo)':>13}")
+    print("-" * 75)
+    for r in resultats:
+        if 'duree_s' in r:
+            rss = f"{r['rss_max_mo']:.1f}" if r['rss_max_mo'] is not None else "n/d"
+            print(f"{r['mode']:<26} {r['lignes']:>12} {r['duree_s']:>10.3f} "
+                  f"{r['debit_mo_s']:>10.2f} {rss:>13}")
+        else:
+            print(f"{r['mode']:<26} {r['lignes']:>12} {r.get('ignore') or r.get('erreur')}")
+    print()
+    print(f"✅ Résultats enregistrés dans {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
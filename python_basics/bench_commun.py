@@ -0,0 +1,111 @@
+"""
+Outils communs aux benchmarks
+=============================
+
+Fonctions partagées par bench_calc_stats.py et bench_log_analyzer.py:
+- compression gzip d'un fichier généré (hors mesure)
+- pic de mémoire résidente d'un processus (RSS, Mo)
+- exécution d'un mode dans un processus Python séparé
+- détection des dépendances optionnelles (numpy, pyarrow)
+- description de la machine, enregistrée avec les résultats
+
+Chaque script de benchmark garde ses générateurs de données, ses modes et
+sa fonction `executer_mode()`; il se relance lui-même avec
+`--interne <mode> <fichier>` pour chaque mesure (voir `mesurer_mode()`).
+"""
+
+import contextlib
+import gzip
+import importlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Taille des blocs copiés lors de la compression gzip
+TAILLE_BLOC_COPIE = 1 << 20
+
+
+def preparer_gzip(fichier):
+    """Compresse le fichier (hors mesure) et retourne le chemin de l'archive."""
+    archive = Path(f"{fichier}.gz")
+    if not archive.exists():
+        with open(fichier, 'rb') as source, gzip.open(archive, 'wb', compresslevel=1) as cible:
+            shutil.copyfileobj(source, cible, TAILLE_BLOC_COPIE)
+    return archive
+
+
+def pic_memoire_mo(enfants=False):
+    """
+    Retourne le pic de mémoire résidente en Mo (None si indisponible).
+
+    Sous Linux, le pic du processus courant est lu dans /proc (VmHWM):
+    ru_maxrss garderait après exec() le pic du processus parent.
+
+    Args:
+        enfants (bool): Pic du plus gros des processus enfants terminés
+            au lieu de celui du processus courant
+    """
+    if not enfants:
+        with contextlib.suppress(OSError):
+            with open('/proc/self/status', encoding='ascii') as f:
+                for ligne in f:
+                    if ligne.startswith('VmHWM:'):
+                        return int(ligne.split()[1]) / 1024
+    if resource is None:
+        return None
+    qui = resource.RUSAGE_CHILDREN if enfants else resource.RUSAGE_SELF
+    pic = resource.getrusage(qui).ru_maxrss
+    # ru_maxrss est en octets sous macOS et en kilo-octets sous Linux
+    return pic / (1024 * 1024) if sys.platform == 'darwin' else pic / 1024
+
+
+def mesurer_mode(script, mode, fichier):
+    """
+    Lance un mode dans un processus Python séparé et retourne ses mesures.
+
+    Le script est relancé avec `--interne <mode> <fichier>` et doit écrire
+    ses mesures en JSON sur la dernière ligne de sa sortie.
+
+    Args:
+        script (str): Chemin du script de benchmark (son `__file__`)
+        mode (str): Nom du mode
+        fichier (Path): Fichier de données du mode
+
+    Returns:
+        dict: Mesures du mode, ou {'erreur': ...} en cas d'échec
+    """
+    resultat = subprocess.run(
+        [sys.executable, script, '--interne', mode, str(fichier)],
+        capture_output=True, text=True,
+    )
+    if resultat.returncode != 0:
+        return {'erreur': resultat.stderr.strip().splitlines()[-1:]}
+    return json.loads(resultat.stdout.strip().splitlines()[-1])
+
+
+def module_disponible(nom):
+    """Indique si un module optionnel (numpy, pyarrow...) est installé."""
+    try:
+        importlib.import_module(nom)
+    except ImportError:
+        return False
+    return True
+
+
+def infos_machine():
+    """Retourne la version de Python, la plateforme et le nombre de processeurs."""
+    return {
+        'python': platform.python_version(),
+        'plateforme': platform.platform(),
+        'processeurs': os.cpu_count(),
+    }
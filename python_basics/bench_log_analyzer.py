@@ -0,0 +1,539 @@
+"""
+Benchmark de log_analyzer.py
+============================
+
+Deux mesures:
+
+1. Cardinalités: compare le comptage exact des valeurs distinctes
+   (ensemble Python) avec l'estimation HyperLogLog de log_analyzer.py,
+   pour plusieurs cardinalités et plusieurs précisions:
+   - valeur exacte et valeur estimée, erreur relative observée et théorique
+   - mémoire utilisée (ensemble vs registres)
+   - temps d'insertion
+
+2. Débit (--debit): génère des logs synthétiques au format combiné
+   (nombre de lignes, nombre d'IPs, endpoints selon une loi de Zipf, taux
+   d'erreurs et de lignes malformées au choix), puis exécute chaque mode
+   d'analyse de log_analyzer.py (les modes *_mmap parsent les octets du
+   fichier projeté en mémoire, à comparer au chemin texte; les modes
+   filtre* ne retiennent que les 5xx de /api; le mode sessions ajoute
+   les sessions et le débit par IP). Pour chaque mode, il mesure:
+   - le temps de chaque étape (indexation, export, analyse, affichage, rapport)
+   - le débit (lignes/s et Mo/s)
+   - le pic de mémoire résidente (RSS, Mo) et la mémoire par million de lignes
+
+   Chaque mode tourne dans un processus Python séparé, pour que le pic de
+   mémoire mesuré soit bien celui du mode.
+
+Utilisation:
+    python bench_log_analyzer.py
+    python bench_log_analyzer.py --distincts 1000 100000 1000000 --precisions 10 12 14
+    python bench_log_analyzer.py --debit --lignes 1000000
+    python bench_log_analyzer.py --debit --lignes 100000 1000000 --modes exact approche --zipf 1.3
+
+Dépendances:
+    - log_analyzer.py et bench_commun.py (même dossier)
+    - pyarrow (optionnel, pour le mode parquet)
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import log_analyzer
+from log_analyzer import HyperLogLog
+from bench_commun import (
+    preparer_gzip, pic_memoire_mo, mesurer_mode, module_disponible, infos_machine
+)
+
+
+# Nombre de lignes écrites à la fois par le générateur de logs
+TAILLE_LOT_ECRITURE = 10_000
+
+# Premier instant des logs générés (10/Oct/2024:00:00:00 UTC); le mode
+# index interroge la première heure
+DEBUT_LOGS = 1728518400
+DUREE_REQUETE_INDEX = 3600
+# Requête des modes filtre et filtre_mmap: les lignes sans '" 5' sont écartées avant le parsing
+EXPRESSION_FILTRE = 'status>=500 and path^=/api'
+
+
+SECTIONS = ['api/users', 'api/orders', 'produits', 'articles', 'static/img']
+METHODES = [('GET', 80), ('POST', 12), ('PUT', 4), ('DELETE', 2), ('HEAD', 2)]
+STATUTS_SUCCES = [(200, 85), (301, 5), (304, 10)]
+STATUTS_ERREUR = [(404, 50), (401, 10), (403, 10), (500, 20), (503, 10)]
+REFERERS = ['-', 'https://www.example.com/', 'https://www.google.com/', 'https://t.co/abc']
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64)', 'Mozilla/5.0 (X11; Linux x86_64)',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X)', 'curl/8.4.0',
+    'python-requests/2.31', 'Googlebot/2.1 (+http://www.google.com/bot.html)',
+]
+LIGNES_MALFORMEES = [
+    'ligne corrompue',
+    '10.0.0.1 - - [10/Oct/2024:13:55:36 +0000] "GET"',
+    '- - - [] "" - -',
+]
+
+
+def generer_ips(nb_distincts, nb_valeurs, graine=0):
+    """
+    Génère un flux d'adresses IP avec exactement `nb_distincts` valeurs distinctes.
+
+    Chaque IP distincte apparaît au moins une fois, les répétitions sont
+    tirées au hasard.
+
+    Returns:
+        list: Adresses IP (str)
+    """
+    generateur = random.Random(graine)
+    distinctes = [f"{(i >> 24) & 255}.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+                  for i in generateur.sample(range(1 << 32), nb_distincts)]
+    flux = distinctes + [generateur.choice(distinctes)
+                         for _ in range(max(0, nb_valeurs - nb_distincts))]
+    generateur.shuffle(flux)
+    return flux
+
+
+def taille_ensemble(ensemble):
+    """Mémoire approximative d'un ensemble de chaînes (table + chaînes), en octets."""
+    return sys.getsizeof(ensemble) + sum(sys.getsizeof(v) for v in ensemble)
+
+
+def comparer_cardinalites(flux, precisions):
+    """
+    Compte les valeurs distinctes d'un flux exactement puis avec HyperLogLog.
+
+    Args:
+        flux (list): Valeurs à compter
+        precisions (list): Précisions HyperLogLog à tester
+
+    Returns:
+        list: Un dictionnaire de résultats par méthode
+    """
+    debut = time.perf_counter()
+    ensemble = set()
+    for valeur in flux:
+        ensemble.add(valeur)
+    exact = len(ensemble)
+    resultats = [{
+        'methode': 'exact',
+        'distincts': exact,
+        'estimation': exact,
+        'erreur_relative': 0.0,
+        'memoire_octets': taille_ensemble(ensemble),
+        'duree_s': time.perf_counter() - debut,
+    }]
+
+    for precision in precisions:
+        debut = time.perf_counter()
+        hll = HyperLogLog(precision)
+        for valeur in flux:
+            hll.ajouter(valeur)
+        estimation = hll.estimation()
+        resultats.append({
+            'methode': f'hyperloglog p={precision}',
+            'distincts': exact,
+            'estimation': estimation,
+            'erreur_relative': abs(estimation - exact) / exact,
+            'erreur_theorique': hll.erreur_relative(),
+            'memoire_octets': len(hll.registres),
+            'duree_s': time.perf_counter() - debut,
+        })
+
+    return resultats
+
+
+def poids_zipf(nb, exposant):
+    """Poids cumulés d'une loi de Zipf sur les rangs 1..nb (pour `random.choices`)."""
+    return list(itertools.accumulate(1 / rang ** exposant for rang in range(1, nb + 1)))
+
+
+def generer_logs(chemin, nb_lignes, nb_ips=10_000, nb_endpoints=1_000, zipf=1.1,
+                 taux_erreurs=0.05, taux_malformes=0.001, lignes_par_seconde=50, graine=None):
+    """
+    Génère un fichier de logs au format combiné, avec durée de requête, trié par date.
+
+    Les IPs sont tirées uniformément parmi `nb_ips` adresses, les endpoints
+    selon une loi de Zipf (le rang k est tiré avec une probabilité
+    proportionnelle à 1/k**zipf). Un endpoint sur deux contient un
+    identifiant numérique (regroupé par `--normaliser`).
+
+    Args:
+        chemin (str): Fichier à créer
+        nb_lignes (int): Nombre de lignes
+        nb_ips (int): Nombre d'adresses IP distinctes possibles
+        nb_endpoints (int): Nombre d'endpoints distincts possibles
+        zipf (float): Exposant de la loi de Zipf des endpoints
+        taux_erreurs (float): Proportion de statuts >= 400
+        taux_malformes (float): Proportion de lignes illisibles
+        lignes_par_seconde (int): Nombre moyen de lignes par seconde de log
+        graine (int): Graine aléatoire
+
+    Returns:
+        int: Nombre de lignes malformées écrites
+    """
+    generateur = random.Random(graine)
+    ips = [f"{(i >> 24) & 255}.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+           for i in generateur.sample(range(1 << 32), nb_ips)]
+    endpoints = [f"/{SECTIONS[k % len(SECTIONS)]}/{k if k % 2 else f'page{k}'}"
+                 for k in range(nb_endpoints)]
+    cumul_endpoints = poids_zipf(nb_endpoints, zipf)
+    methodes, poids_methodes = zip(*METHODES)
+    succes, poids_succes = zip(*STATUTS_SUCCES)
+    erreurs, poids_erreurs = zip(*STATUTS_ERREUR)
+    noms_mois = list(log_analyzer.MOIS)
+    seconde, date = None, None
+    malformees = 0
+
+    with open(chemin, 'w', encoding='utf-8') as f:
+        for debut in range(0, nb_lignes, TAILLE_LOT_ECRITURE):
+            taille_lot = min(TAILLE_LOT_ECRITURE, nb_lignes - debut)
+            tirages = zip(generateur.choices(ips, k=taille_lot),
+                          generateur.choices(endpoints, cum_weights=cumul_endpoints, k=taille_lot),
+                          generateur.choices(methodes, poids_methodes, k=taille_lot))
+            lot = []
+            for numero, (ip, endpoint, methode) in enumerate(tirages, debut):
+                if taux_malformes and generateur.random() < taux_malformes:
+                    lot.append(generateur.choice(LIGNES_MALFORMEES))
+                    malformees += 1
+                    continue
+                if numero // lignes_par_seconde != seconde:
+                    seconde = numero // lignes_par_seconde
+                    t = time.gmtime(DEBUT_LOGS + seconde)
+                    date = (f"{t.tm_mday:02d}/{noms_mois[t.tm_mon - 1]}/{t.tm_year}:"
+                            f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} +0000")
+                if generateur.random() < taux_erreurs:
+                    status = generateur.choices(erreurs, poids_erreurs)[0]
+                else:
+                    status = generateur.choices(succes, poids_succes)[0]
+                taille = '-' if status == 304 else int(generateur.expovariate(1 / 5000))
+                lot.append(f'{ip} - - [{date}] "{methode} {endpoint} HTTP/1.1" {status} {taille} '
+                           f'"{generateur.choice(REFERERS)}" "{generateur.choice(USER_AGENTS)}" '
+                           f'{generateur.lognormvariate(-3.0, 1.0):.3f}')
+            f.write("\n".join(lot) + "\n")
+
+    return malformees
+
+
+class Chronometre:
+    """Durées cumulées des étapes d'un mode, en secondes."""
+
+    def __init__(self):
+        self.etapes = {}
+
+    @contextlib.contextmanager
+    def etape(self, nom):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapes[nom] = self.etapes.get(nom, 0.0) + time.perf_counter() - debut
+
+
+def mode_exact(fichier, chrono):
+    """Compteurs exacts dans un seul processus (--exact)."""
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_logs(log_analyzer.lire_logs(fichier))
+
+
+def mode_approche(fichier, chrono):
+    """Top Space-Saving et distincts HyperLogLog dans un seul processus."""
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_logs(log_analyzer.lire_logs(fichier),
+                                          log_analyzer.CAPACITE_TOP_DEFAUT,
+                                          log_analyzer.PRECISION_HLL_DEFAUT)
+
+
+def mode_exact_mmap(fichier, chrono):
+    """Compteurs exacts, octets du fichier projeté en mémoire (--mmap --exact)."""
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_fichiers([str(fichier)], octets=True)
+
+
+def mode_approche_mmap(fichier, chrono):
+    """Mode approché sur les octets du fichier projeté en mémoire (--mmap)."""
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_fichiers([str(fichier)], 1,
+                                              log_analyzer.CAPACITE_TOP_DEFAUT,
+                                              log_analyzer.PRECISION_HLL_DEFAUT, octets=True)
+
+
+def mode_normalise(fichier, chrono):
+    """Comme le mode approché, endpoints regroupés par gabarit (--normaliser)."""
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_logs(log_analyzer.lire_logs(fichier),
+                                          log_analyzer.CAPACITE_TOP_DEFAUT,
+                                          log_analyzer.PRECISION_HLL_DEFAUT,
+                                          normaliseur=log_analyzer.NormaliseurEndpoints())
+
+
+def mode_sessions(fichier, chrono):
+    """Comme le mode approché, avec les sessions et le débit par IP (--sessions)."""
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_logs(log_analyzer.lire_logs(fichier),
+                                          log_analyzer.CAPACITE_TOP_DEFAUT,
+                                          log_analyzer.PRECISION_HLL_DEFAUT,
+                                          sessions=log_analyzer.SessionsIP())
+
+
+def mode_parallele(fichier, chrono):
+    """Tranches du fichier analysées sur tous les processeurs (--workers)."""
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_fichiers([str(fichier)], os.cpu_count() or 1,
+                                              log_analyzer.CAPACITE_TOP_DEFAUT,
+                                              log_analyzer.PRECISION_HLL_DEFAUT)
+
+
+def mode_gzip(fichier, chrono):
+    """Lecture du fichier compressé en gzip."""
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_fichiers([f"{fichier}.gz"], 1,
+                                              log_analyzer.CAPACITE_TOP_DEFAUT,
+                                              log_analyzer.PRECISION_HLL_DEFAUT)
+
+
+def mode_index(fichier, chrono):
+    """Construction de l'index à froid, puis requête sur les 5xx de la première heure."""
+    index = Path(f"{fichier}.bench.logindex.json")
+    index.unlink(missing_ok=True)
+    with chrono.etape('indexation'):
+        log_analyzer.indexer_logs(str(fichier), index)
+    filtre = log_analyzer.FiltreLogs(DEBUT_LOGS, DEBUT_LOGS + DUREE_REQUETE_INDEX,
+                                     log_analyzer.lire_statuts('5xx'))
+    with chrono.etape('requete'):
+        stats = log_analyzer.analyser_logs_indexe(str(fichier), filtre, index,
+                                                  log_analyzer.CAPACITE_TOP_DEFAUT,
+                                                  log_analyzer.PRECISION_HLL_DEFAUT)
+    index.unlink()
+    return stats
+
+
+def mode_filtre(fichier, chrono):
+    """Filtre vérifié sur les lignes brutes avant le parsing (--filtre)."""
+    filtre = log_analyzer.FiltreLogs(**log_analyzer.lire_filtre(EXPRESSION_FILTRE))
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_fichiers([str(fichier)], 1, log_analyzer.CAPACITE_TOP_DEFAUT,
+                                              log_analyzer.PRECISION_HLL_DEFAUT, filtre)
+
+
+def mode_filtre_mmap(fichier, chrono):
+    """Même filtre, lignes candidates cherchées dans le fichier projeté (--filtre --mmap)."""
+    filtre = log_analyzer.FiltreLogs(**log_analyzer.lire_filtre(EXPRESSION_FILTRE))
+    with chrono.etape('analyse'):
+        return log_analyzer.analyser_fichiers([str(fichier)], 1, log_analyzer.CAPACITE_TOP_DEFAUT,
+                                              log_analyzer.PRECISION_HLL_DEFAUT, filtre, octets=True)
+
+
+def mode_parquet(fichier, chrono):
+    """Export Parquet partitionné par jour, puis analyse en colonnes."""
+    with tempfile.TemporaryDirectory() as dossier:
+        cible = Path(dossier) / 'parquet'
+        with chrono.etape('export'):
+            log_analyzer.exporter_parquet(log_analyzer.lire_logs(fichier), cible)
+        with chrono.etape('analyse'):
+            return log_analyzer.analyser_parquet(cible)
+
+
+# nom du mode -> (préparation hors mesure, fonction mesurée, besoin de pyarrow)
+MODES = {
+    'exact': (None, mode_exact, False),
+    'exact_mmap': (None, mode_exact_mmap, False),
+    'approche': (None, mode_approche, False),
+    'approche_mmap': (None, mode_approche_mmap, False),
+    'normalise': (None, mode_normalise, False),
+    'sessions': (None, mode_sessions, False),
+    'parallele': (None, mode_parallele, False),
+    'gzip': (preparer_gzip, mode_gzip, False),
+    'index': (None, mode_index, False),
+    'filtre': (None, mode_filtre, False),
+    'filtre_mmap': (None, mode_filtre_mmap, False),
+    'parquet': (None, mode_parquet, True),
+}
+
+
+def executer_mode(mode, fichier):
+    """
+    Exécute un mode dans le processus courant et mesure chacune de ses étapes.
+
+    Après l'analyse, les statistiques sont affichées (vers /dev/null) et
+    le rapport Markdown est écrit dans un fichier temporaire: ces deux
+    étapes sont mesurées aussi.
+
+    Returns:
+        dict: {'duree_s', 'etapes', 'lignes_lues', 'rss_base_mo', 'rss_max_mo',
+            'rss_enfants_max_mo'}
+    """
+    preparer, fonction, _ = MODES[mode]
+    if preparer is not None:
+        preparer(fichier)
+    rss_base = pic_memoire_mo()
+    chrono = Chronometre()
+    with tempfile.TemporaryDirectory() as dossier, \
+            open(os.devnull, 'w') as poubelle, contextlib.redirect_stdout(poubelle):
+        debut = time.perf_counter()
+        stats = fonction(fichier, chrono)
+        with chrono.etape('affichage'):
+            log_analyzer.afficher_statistiques(stats)
+        with chrono.etape('rapport'):
+            log_analyzer.generer_rapport_markdown(stats, os.path.join(dossier, 'rapport.md'))
+        duree = time.perf_counter() - debut
+    return {
+        'duree_s': duree,
+        'etapes': chrono.etapes,
+        'lignes_lues': stats['total_lignes'],
+        'rss_base_mo': rss_base,
+        'rss_max_mo': pic_memoire_mo(),
+        'rss_enfants_max_mo': pic_memoire_mo(enfants=True),
+    }
+
+
+def lancer_benchmark(tailles, modes, dossier, **parametres):
+    """
+    Génère un fichier de logs par taille et mesure chaque mode.
+
+    Args:
+        tailles (list): Nombres de lignes à tester
+        modes (list): Modes à exécuter (clés de MODES)
+        dossier (Path): Dossier des fichiers générés
+        **parametres: Paramètres de `generer_logs()` (nb_ips, zipf, ...)
+
+    Returns:
+        list: Un dictionnaire de résultats par (taille, mode)
+    """
+    dossier.mkdir(parents=True, exist_ok=True)
+    avec_pyarrow = module_disponible('pyarrow')
+    resultats = []
+
+    for nb_lignes in tailles:
+        fichier = dossier / f"access_{nb_lignes}.log"
+        print(f"📝 Génération de {fichier} ({nb_lignes} lignes)...")
+        malformees = generer_logs(fichier, nb_lignes, **parametres)
+        taille_mo = fichier.stat().st_size / (1024 * 1024)
+
+        for mode in modes:
+            resultat = {
+                'mode': mode,
+                'lignes': nb_lignes,
+                'lignes_malformees': malformees,
+                'taille_mo': round(taille_mo, 3),
+            }
+            if MODES[mode][2] and not avec_pyarrow:
+                resultat['ignore'] = "pyarrow non installé"
+            else:
+                print(f"⏱  {mode} sur {nb_lignes} lignes...")
+                resultat.update(mesurer_mode(__file__, mode, fichier))
+                if 'duree_s' in resultat:
+                    resultat['debit_lignes_s'] = round(nb_lignes / resultat['duree_s'])
+                    resultat['debit_mo_s'] = round(taille_mo / resultat['duree_s'], 3)
+                    if resultat['rss_max_mo'] is not None:
+                        # Mémoire ajoutée par le mode, rapportée à un million de lignes
+                        resultat['rss_par_million_mo'] = round(
+                            (resultat['rss_max_mo'] - resultat['rss_base_mo']) * 1e6 / nb_lignes, 3)
+            resultats.append(resultat)
+
+    return resultats
+
+
+def main_cardinalites(args):
+    """Comparaison exact / HyperLogLog (mode par défaut)."""
+    resultats = []
+    print(f"{'Distincts':>10} {'Méthode':<18} {'Estimation':>11} {'Erreur':>8} "
+          f"{'Mémoire (Ko)':>13} {'Durée (s)':>10}")
+    print("-" * 75)
+    for nb_distincts in args.distincts:
+        flux = generer_ips(nb_distincts, int(nb_distincts * args.repetitions), args.graine)
+        for resultat in comparer_cardinalites(flux, args.precisions):
+            resultats.append(resultat)
+            print(f"{nb_distincts:>10} {resultat['methode']:<18} {resultat['estimation']:>11} "
+                  f"{resultat['erreur_relative'] * 100:>7.2f}% "
+                  f"{resultat['memoire_octets'] / 1024:>13.1f} {resultat['duree_s']:>10.3f}")
+    return {'cardinalites': resultats}
+
+
+def main_debit(args):
+    """Débit et mémoire de chaque mode d'analyse sur des logs synthétiques (--debit)."""
+    parametres = {
+        'nb_ips': args.ips,
+        'nb_endpoints': args.endpoints,
+        'zipf': args.zipf,
+        'taux_erreurs': args.taux_erreurs,
+        'taux_malformes': args.taux_malformes,
+        'graine': args.graine,
+    }
+    resultats = lancer_benchmark(args.lignes, args.modes, args.dossier, **parametres)
+
+    print()
+    print(f"{'Mode':<12} {'Lignes':>10} {'Durée (s)':>10} {'Lignes/s':>11} {'Mo/s':>8} "
+          f"{'RSS max (Mo)':>13}  Étapes (s)")
+    print("-" * 100)
+    for r in resultats:
+        if 'duree_s' in r:
+            rss = f"{r['rss_max_mo']:.1f}" if r['rss_max_mo'] is not None else "n/d"
+            etapes = ', '.join(f"{nom} {duree:.2f}" for nom, duree in r['etapes'].items())
+            print(f"{r['mode']:<12} {r['lignes']:>10} {r['duree_s']:>10.3f} "
+                  f"{r['debit_lignes_s']:>11} {r['debit_mo_s']:>8.2f} {rss:>13}  {etapes}")
+        else:
+            print(f"{r['mode']:<12} {r['lignes']:>10} {r.get('ignore') or r.get('erreur')}")
+
+    return {
+        'machine': infos_machine(),
+        'parametres': parametres,
+        'debit': resultats,
+    }
+
+
+def main():
+    """
+    Fonction principale du script.
+    """
+    if len(sys.argv) == 4 and sys.argv[1] == '--interne':
+        print(json.dumps(executer_mode(sys.argv[2], sys.argv[3])))
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark de log_analyzer.py (distincts exacts vs HyperLogLog, débit avec --debit)")
+    parser.add_argument('--distincts', type=int, nargs='+', default=[1_000, 100_000, 1_000_000],
+                        help="Nombres de valeurs distinctes à tester")
+    parser.add_argument('--repetitions', type=float, default=2.0,
+                        help="Nombre moyen d'occurrences de chaque valeur (défaut: 2)")
+    parser.add_argument('--precisions', type=int, nargs='+', default=[10, 12, 14])
+    parser.add_argument('--debit', action='store_true',
+                        help="Mesurer le débit des modes d'analyse sur des logs synthétiques")
+    parser.add_argument('--lignes', type=int, nargs='+', default=[1_000_000],
+                        help="Nombre(s) de lignes des logs générés (--debit)")
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES),
+                        help="Modes à mesurer (--debit, défaut: tous)")
+    parser.add_argument('--ips', type=int, default=10_000,
+                        help="Nombre d'adresses IP distinctes (défaut: 10000)")
+    parser.add_argument('--endpoints', type=int, default=1_000,
+                        help="Nombre d'endpoints distincts (défaut: 1000)")
+    parser.add_argument('--zipf', type=float, default=1.1,
+                        help="Exposant de la loi de Zipf des endpoints (défaut: 1.1)")
+    parser.add_argument('--taux-erreurs', type=float, default=0.05,
+                        help="Proportion de statuts >= 400 (défaut: 0.05)")
+    parser.add_argument('--taux-malformes', type=float, default=0.001,
+                        help="Proportion de lignes malformées (défaut: 0.001)")
+    parser.add_argument('--dossier', type=Path, default=Path('bench_donnees'),
+                        help="Dossier des logs générés (défaut: bench_donnees)")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--sortie', default='bench_log_analyzer.json',
+                        help="Fichier JSON des résultats (défaut: bench_log_analyzer.json)")
+    args = parser.parse_args()
+
+    rapport = main_debit(args) if args.debit else main_cardinalites(args)
+
+    with open(args.sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    print()
+    print(f"✅ Résultats enregistrés dans {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,21 +6,204 @@ Ce script lit un fichier CSV contenant une colonne de nombres
 et calcule plusieurs statistiques descriptives de base.
 
 Utilisation:
-    python calc_stats.py
+    python calc_stats.py [fichier.csv]
+    python calc_stats.py numbers.csv --cache   # Mode incrémental
+    python calc_stats.py archive.csv.gz        # Entrée compressée (gzip, bz2, zstd)
+    python calc_stats.py sales_data.csv --colonne quantite --fenetre-jours 7
+    python calc_stats.py numbers.csv --bootstrap 10000 --graine 42
+    python calc_stats.py sales_data.csv --correlations
 
 Dépendances:
     - Module statistics (inclus dans Python standard library)
+    - zstandard (optionnel, pour les fichiers .zst)
+    - numpy (optionnel, pour le bootstrap et la matrice de corrélation)
 """
 
+import argparse
+import bz2
 import csv
+import gzip
+import hashlib
+import json
+import math
+import os
+import queue
 import statistics
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
 from pathlib import Path
 
 
+# Taille du bloc (en octets) dont on garde l'empreinte dans le cache
+TAILLE_BLOC_CONTROLE = 4096
+VERSION_CACHE = 1
+
+# Lecture des fichiers compressés: taille des blocs décompressés et
+# nombre maximal de blocs en attente entre le thread de décompression
+# et le thread principal
+TAILLE_BLOC_LECTURE = 1 << 20
+PROFONDEUR_FILE = 8
+
+# Mémoire maximale (en octets) d'un bloc de rééchantillonnages bootstrap
+MEMOIRE_BLOC_BOOTSTRAP = 64 * 1024 * 1024
+
+# Nombre de lignes converties en tableau numpy à la fois (matrice de covariance)
+TAILLE_LOT_COVARIANCE = 10_000
+
+# Données partagées par les processus du bootstrap (voir initialiser_bootstrap)
+DONNEES_BOOTSTRAP = None
+
+# Signatures ("magic bytes") des formats de compression reconnus
+SIGNATURES_COMPRESSION = {
+    b'\x1f\x8b': 'gzip',
+    b'BZh': 'bz2',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+}
+
+
+def detecter_compression(nom_fichier):
+    """
+    Détecte le format de compression d'un fichier d'après ses premiers octets.
+
+    Args:
+        nom_fichier (str): Chemin du fichier
+
+    Returns:
+        str: 'gzip', 'bz2', 'zstd' ou None si le fichier n'est pas compressé
+    """
+    with open(nom_fichier, 'rb') as fichier:
+        debut = fichier.read(4)
+    for signature, format_compression in SIGNATURES_COMPRESSION.items():
+        if debut.startswith(signature):
+            return format_compression
+    return None
+
+
+def ouvrir_decompresse(nom_fichier, format_compression):
+    """
+    Ouvre un fichier compressé et retourne un flux binaire décompressé.
+
+    Raises:
+        ImportError: Si le module zstandard n'est pas installé (fichiers .zst)
+    """
+    if format_compression == 'gzip':
+        return gzip.open(nom_fichier, 'rb')
+    if format_compression == 'bz2':
+        return bz2.open(nom_fichier, 'rb')
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "Le module 'zstandard' est nécessaire pour lire les fichiers .zst "
+            "(pip install zstandard)"
+        ) from None
+    return zstandard.ZstdDecompressor().stream_reader(open(nom_fichier, 'rb'), closefd=True)
+
+
+def lire_blocs_arriere_plan(flux, taille_bloc=TAILLE_BLOC_LECTURE, profondeur=PROFONDEUR_FILE):
+    """
+    Lit un flux dans un thread d'arrière-plan et produit ses blocs.
+
+    Les blocs passent par une file bornée: la décompression (qui libère
+    le GIL) avance pendant que le thread principal analyse les lignes,
+    sans jamais garder plus de `profondeur` blocs en mémoire.
+
+    Args:
+        flux: Flux binaire (fermé à la fin de la lecture)
+        taille_bloc (int): Taille des blocs lus en octets
+        profondeur (int): Nombre maximal de blocs en attente
+
+    Yields:
+        bytes: Blocs de données décompressées
+    """
+    file_blocs = queue.Queue(maxsize=profondeur)
+    arret = threading.Event()
+    fin = object()
+
+    def deposer(element):
+        while not arret.is_set():
+            try:
+                file_blocs.put(element, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def producteur():
+        try:
+            with flux:
+                while not arret.is_set():
+                    bloc = flux.read(taille_bloc)
+                    if not bloc:
+                        break
+                    deposer(bloc)
+        except Exception as e:  # Transmise au thread principal
+            deposer(e)
+        deposer(fin)
+
+    thread = threading.Thread(target=producteur, daemon=True)
+    thread.start()
+    try:
+        while True:
+            element = file_blocs.get()
+            if element is fin:
+                return
+            if isinstance(element, Exception):
+                raise element
+            yield element
+    finally:
+        arret.set()
+        thread.join()
+
+
+def iterer_lignes(blocs):
+    """
+    Découpe une suite de blocs binaires en lignes (sans le retour à la ligne).
+
+    Args:
+        blocs: Itérable de blocs (bytes)
+
+    Yields:
+        bytes: Lignes complètes
+    """
+    reste = b''
+    for bloc in blocs:
+        lignes = (reste + bloc).split(b'\n')
+        reste = lignes.pop()
+        yield from lignes
+    if reste:
+        yield reste
+
+
+def ouvrir_lignes(nom_fichier):
+    """
+    Produit les lignes de texte d'un fichier, compressé ou non.
+
+    Args:
+        nom_fichier (str): Chemin du fichier
+
+    Yields:
+        str: Lignes du fichier
+    """
+    format_compression = detecter_compression(nom_fichier)
+    if format_compression is None:
+        with open(nom_fichier, 'r', encoding='utf-8', newline='') as fichier:
+            yield from fichier
+        return
+
+    blocs = lire_blocs_arriere_plan(ouvrir_decompresse(nom_fichier, format_compression))
+    for ligne in iterer_lignes(blocs):
+        yield ligne.rstrip(b'\r').decode('utf-8')
+
+
 def lire_nombres_csv(nom_fichier):
     """
     Lit les nombres depuis un fichier CSV.
+
+    Les fichiers compressés (gzip, bz2, zstd) sont détectés d'après leurs
+    premiers octets et décompressés à la volée.
     
     Args:
         nom_fichier (str): Chemin du fichier CSV à lire
@@ -35,24 +218,27 @@ def lire_nombres_csv(nom_fichier):
     nombres = []
     
     try:
-        with open(nom_fichier, 'r', encoding='utf-8') as fichier:
-            lecteur = csv.reader(fichier)
-            
-            # Sauter l'en-tête
-            next(lecteur)
-            
-            # Lire chaque ligne et convertir en nombre
-            for numero_ligne, ligne in enumerate(lecteur, start=2):
-                if ligne:  # Ignorer les lignes vides
-                    try:
-                        nombre = float(ligne[0])
-                        nombres.append(nombre)
-                    except (ValueError, IndexError) as e:
-                        print(f"⚠ Avertissement ligne {numero_ligne}: {e}")
+        lecteur = csv.reader(ouvrir_lignes(nom_fichier))
+        
+        # Sauter l'en-tête
+        next(lecteur)
+        
+        # Lire chaque ligne et convertir en nombre
+        for numero_ligne, ligne in enumerate(lecteur, start=2):
+            if ligne:  # Ignorer les lignes vides
+                try:
+                    nombre = float(ligne[0])
+                    nombres.append(nombre)
+                except (ValueError, IndexError) as e:
+                    print(f"⚠ Avertissement ligne {numero_ligne}: {e}")
     
     except FileNotFoundError:
         print(f"❌ Erreur: Le fichier '{nom_fichier}' n'existe pas")
         sys.exit(1)
+    except ImportError as e:
+        # Fichier .zst sans le module zstandard
+        print(f"❌ Erreur: {e}")
+        sys.exit(1)
     
     return nombres
 
@@ -88,10 +274,729 @@ def calculer_statistiques(nombres):
     
     # Calcul de l'étendue (range)
     stats['range'] = stats['max'] - stats['min']
-    
+
     return stats
 
 
+class AccumulateurStats:
+    """
+    Accumulateur de statistiques en une seule passe (algorithme de Welford).
+
+    Ne conserve que quelques nombres (effectif, moyenne, somme des carrés
+    des écarts, min, max) : il peut donc être sérialisé dans un cache et
+    fusionné avec un autre accumulateur (formule de Chan et al.).
+    La médiane exacte n'est pas disponible dans ce mode.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def ajouter(self, valeur):
+        """Ajoute une valeur à l'accumulateur."""
+        self.count += 1
+        delta = valeur - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (valeur - self.mean)
+        if valeur < self.min:
+            self.min = valeur
+        if valeur > self.max:
+            self.max = valeur
+
+    def fusionner(self, autre):
+        """
+        Fusionne un autre accumulateur dans celui-ci.
+
+        Args:
+            autre (AccumulateurStats): Accumulateur calculé sur d'autres données
+        """
+        if autre.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = autre.count, autre.mean, autre.m2
+            self.min, self.max = autre.min, autre.max
+            return
+        total = self.count + autre.count
+        delta = autre.mean - self.mean
+        self.mean += delta * autre.count / total
+        self.m2 += autre.m2 + delta * delta * self.count * autre.count / total
+        self.count = total
+        self.min = min(self.min, autre.min)
+        self.max = max(self.max, autre.max)
+
+    def vers_dict(self):
+        """Retourne l'état de l'accumulateur sous forme sérialisable (JSON)."""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+        }
+
+    @classmethod
+    def depuis_dict(cls, etat):
+        """Reconstruit un accumulateur à partir de `vers_dict()`."""
+        accumulateur = cls()
+        accumulateur.count = etat['count']
+        accumulateur.mean = etat['mean']
+        accumulateur.m2 = etat['m2']
+        if accumulateur.count:
+            accumulateur.min = etat['min']
+            accumulateur.max = etat['max']
+        return accumulateur
+
+    def statistiques(self):
+        """
+        Retourne les statistiques au même format que `calculer_statistiques()`.
+
+        La médiane vaut None (non calculable sans garder toutes les valeurs).
+        """
+        if self.count == 0:
+            raise ValueError("La liste de nombres est vide")
+
+        variance = self.m2 / (self.count - 1) if self.count >= 2 else 0
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'median': None,
+            'min': self.min,
+            'max': self.max,
+            'stdev': math.sqrt(variance),
+            'variance': variance,
+            'range': self.max - self.min,
+        }
+
+
+def chemin_cache_par_defaut(nom_fichier):
+    """Retourne le chemin du fichier cache associé à un fichier de données."""
+    return Path(f"{nom_fichier}.statscache.json")
+
+
+def empreinte_bloc(fichier, fin):
+    """
+    Calcule l'empreinte SHA-256 du dernier bloc lu avant la position `fin`.
+
+    Args:
+        fichier: Fichier ouvert en mode binaire
+        fin (int): Position (en octets) de fin du bloc
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    debut = max(0, fin - TAILLE_BLOC_CONTROLE)
+    fichier.seek(debut)
+    return hashlib.sha256(fichier.read(fin - debut)).hexdigest()
+
+
+def accumuler_depuis(fichier, accumulateur, position, numero_ligne):
+    """
+    Lit les lignes complètes à partir de `position` et les ajoute à l'accumulateur.
+
+    Une dernière ligne sans retour à la ligne (éventuellement en cours
+    d'écriture) n'est pas ajoutée : elle est retournée à part pour que
+    l'appelant décide quoi en faire.
+
+    Args:
+        fichier: Fichier ouvert en mode binaire
+        accumulateur (AccumulateurStats): Accumulateur à compléter
+        position (int): Position de départ en octets
+        numero_ligne (int): Nombre de lignes déjà traitées
+
+    Returns:
+        tuple: (nouvelle position, nouveau numéro de ligne, ligne incomplète)
+    """
+    fichier.seek(position)
+    for ligne in fichier:
+        if not ligne.endswith(b'\n'):
+            return position, numero_ligne, ligne
+        position += len(ligne)
+        numero_ligne += 1
+        ajouter_ligne(accumulateur, ligne, numero_ligne)
+
+    return position, numero_ligne, b''
+
+
+def ajouter_ligne(accumulateur, ligne, numero_ligne):
+    """
+    Convertit la première colonne d'une ligne brute (bytes) et l'ajoute.
+
+    L'en-tête (ligne 1) et les lignes vides sont ignorés.
+    """
+    if numero_ligne == 1 or not ligne.strip():
+        return
+    try:
+        accumulateur.ajouter(float(ligne.split(b',', 1)[0].strip(b' \t\r\n"')))
+    except ValueError as e:
+        print(f"⚠ Avertissement ligne {numero_ligne}: {e}")
+
+
+def calculer_statistiques_incrementales(nom_fichier, chemin_cache=None):
+    """
+    Calcule les statistiques d'un fichier en ne lisant que les lignes ajoutées.
+
+    L'état de l'accumulateur est sauvegardé dans un fichier cache avec la
+    taille, la date de modification et l'empreinte du dernier bloc traité.
+    Si le fichier a été tronqué ou réécrit, tout est recalculé.
+
+    Args:
+        nom_fichier (str): Chemin du fichier CSV
+        chemin_cache (str): Chemin du cache (par défaut: <fichier>.statscache.json)
+
+    Returns:
+        tuple: (stats, mode) où mode vaut 'cache', 'incremental' ou 'complet'
+    """
+    if chemin_cache is None:
+        chemin_cache = chemin_cache_par_defaut(nom_fichier)
+
+    infos = os.stat(nom_fichier)
+    cache = charger_cache(chemin_cache)
+
+    with open(nom_fichier, 'rb') as fichier:
+        mode = 'complet'
+        if cache is not None:
+            if cache['taille'] == infos.st_size and cache['mtime'] == infos.st_mtime_ns:
+                mode = 'cache'
+            elif (cache['position'] <= infos.st_size
+                  and empreinte_bloc(fichier, cache['position']) == cache['empreinte']):
+                mode = 'incremental'
+
+        if mode == 'complet':
+            accumulateur = AccumulateurStats()
+            position, numero_ligne = 0, 0
+        else:
+            accumulateur = AccumulateurStats.depuis_dict(cache['accumulateur'])
+            position, numero_ligne = cache['position'], cache['lignes']
+
+        # En mode 'cache', seule une éventuelle ligne finale incomplète est relue
+        position, numero_ligne, reste = accumuler_depuis(
+            fichier, accumulateur, position, numero_ligne
+        )
+        if mode != 'cache':
+            sauvegarder_cache(chemin_cache, {
+                'version': VERSION_CACHE,
+                'taille': infos.st_size,
+                'mtime': infos.st_mtime_ns,
+                'position': position,
+                'lignes': numero_ligne,
+                'empreinte': empreinte_bloc(fichier, position),
+                'accumulateur': accumulateur.vers_dict(),
+            })
+
+    # La ligne finale sans retour à la ligne compte dans le résultat,
+    # mais pas dans le cache : elle sera relue au prochain passage
+    if reste:
+        accumulateur = AccumulateurStats.depuis_dict(accumulateur.vers_dict())
+        ajouter_ligne(accumulateur, reste, numero_ligne + 1)
+
+    return accumulateur.statistiques(), mode
+
+
+def charger_cache(chemin_cache):
+    """
+    Charge le cache s'il existe et s'il est lisible.
+
+    Returns:
+        dict: Contenu du cache ou None
+    """
+    try:
+        with open(chemin_cache, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if cache.get('version') != VERSION_CACHE:
+        return None
+    return cache
+
+
+def sauvegarder_cache(chemin_cache, cache):
+    """Écrit le cache de façon atomique (fichier temporaire puis renommage)."""
+    temporaire = f"{chemin_cache}.tmp"
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(temporaire, chemin_cache)
+
+
+class FenetreGlissante:
+    """
+    Statistiques sur une fenêtre glissante avec des mises à jour en O(1) amorti.
+
+    - Moyenne et variance: ajout/retrait de Welford sur une file (deque) des valeurs
+    - Min et max: files monotones, chaque valeur y entre et en sort une seule fois
+    """
+
+    def __init__(self):
+        self.valeurs = deque()  # (numéro, clé, valeur) du plus ancien au plus récent
+        self.mins = deque()     # (numéro, valeur) croissantes
+        self.maxs = deque()     # (numéro, valeur) décroissantes
+        self.numero = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def __len__(self):
+        return len(self.valeurs)
+
+    def ajouter(self, valeur, cle=None):
+        """Ajoute une valeur (la clé sert au retrait par date)."""
+        self.numero += 1
+        self.valeurs.append((self.numero, cle, valeur))
+        delta = valeur - self.mean
+        self.mean += delta / len(self.valeurs)
+        self.m2 += delta * (valeur - self.mean)
+
+        while self.mins and self.mins[-1][1] >= valeur:
+            self.mins.pop()
+        self.mins.append((self.numero, valeur))
+        while self.maxs and self.maxs[-1][1] <= valeur:
+            self.maxs.pop()
+        self.maxs.append((self.numero, valeur))
+
+    def retirer_plus_ancien(self):
+        """Retire la valeur la plus ancienne de la fenêtre."""
+        numero, _, valeur = self.valeurs.popleft()
+        n = len(self.valeurs)
+        if n == 0:
+            self.mean = self.m2 = 0.0
+        else:
+            ancienne_moyenne = self.mean
+            self.mean -= (valeur - self.mean) / n
+            self.m2 = max(0.0, self.m2 - (valeur - ancienne_moyenne) * (valeur - self.mean))
+
+        if self.mins[0][0] == numero:
+            self.mins.popleft()
+        if self.maxs[0][0] == numero:
+            self.maxs.popleft()
+
+    def retirer_cles_avant(self, cle_limite):
+        """Retire toutes les valeurs dont la clé est inférieure ou égale à `cle_limite`."""
+        while self.valeurs and self.valeurs[0][1] <= cle_limite:
+            self.retirer_plus_ancien()
+
+    def statistiques(self):
+        """Retourne effectif, moyenne, écart-type, min et max de la fenêtre."""
+        n = len(self.valeurs)
+        return {
+            'count': n,
+            'mean': self.mean,
+            'stdev': math.sqrt(self.m2 / (n - 1)) if n >= 2 else 0.0,
+            'min': self.mins[0][1],
+            'max': self.maxs[0][1],
+        }
+
+
+def calculer_statistiques_glissantes(nom_fichier, colonne, fichier_sortie,
+                                     fenetre=None, jours=None, colonne_date='date'):
+    """
+    Calcule des statistiques glissantes et les écrit au fur et à mesure dans un CSV.
+
+    Une ligne de sortie est produite par ligne d'entrée: aucune donnée n'est
+    gardée en mémoire en dehors de la fenêtre courante.
+
+    Args:
+        nom_fichier (str): Fichier CSV d'entrée (trié par date)
+        colonne (str): Colonne numérique à analyser
+        fichier_sortie (str): Fichier CSV de sortie
+        fenetre (int): Taille de la fenêtre en nombre de lignes
+        jours (int): Taille de la fenêtre en nombre de jours
+        colonne_date (str): Colonne contenant la date (format AAAA-MM-JJ)
+
+    Returns:
+        int: Nombre de lignes écrites
+
+    Raises:
+        ValueError: Si la fenêtre est mal définie, si une colonne manque
+            ou si les dates ne sont pas triées
+    """
+    if (fenetre is None) == (jours is None):
+        raise ValueError("Indiquez soit une fenêtre en lignes, soit une fenêtre en jours")
+    if (fenetre if fenetre is not None else jours) < 1:
+        raise ValueError("La taille de la fenêtre doit être positive")
+
+    lecteur = csv.DictReader(ouvrir_lignes(nom_fichier))
+    colonnes = lecteur.fieldnames or []
+    if colonne not in colonnes:
+        raise ValueError(f"Colonne '{colonne}' absente du fichier")
+    avec_date = colonne_date in colonnes
+    if jours is not None and not avec_date:
+        raise ValueError(f"Colonne de date '{colonne_date}' absente du fichier")
+
+    fenetre_courante = FenetreGlissante()
+    derniere_date = None
+    lignes_ecrites = 0
+
+    with open(fichier_sortie, 'w', encoding='utf-8', newline='') as sortie:
+        ecrivain = csv.writer(sortie)
+        ecrivain.writerow([colonne_date, colonne, 'count', 'moyenne', 'ecart_type', 'min', 'max'])
+
+        for numero_ligne, ligne in enumerate(lecteur, start=2):
+            try:
+                valeur = float(ligne[colonne])
+            except (ValueError, TypeError) as e:
+                print(f"⚠ Avertissement ligne {numero_ligne}: {e}")
+                continue
+            jour = None
+            if avec_date:
+                try:
+                    jour = date.fromisoformat(ligne[colonne_date])
+                except (ValueError, TypeError) as e:
+                    # Une fenêtre en lignes n'utilise pas la date: seule la sortie reste vide
+                    if jours is not None:
+                        print(f"⚠ Avertissement ligne {numero_ligne}: {e}")
+                        continue
+
+            if jours is not None:
+                if derniere_date is not None and jour < derniere_date:
+                    raise ValueError(f"Ligne {numero_ligne}: le fichier n'est pas trié par date")
+                derniere_date = jour
+                fenetre_courante.retirer_cles_avant(jour.toordinal() - jours)
+                fenetre_courante.ajouter(valeur, jour.toordinal())
+            else:
+                fenetre_courante.ajouter(valeur)
+                if len(fenetre_courante) > fenetre:
+                    fenetre_courante.retirer_plus_ancien()
+
+            stats = fenetre_courante.statistiques()
+            ecrivain.writerow([
+                jour.isoformat() if jour else '', valeur, stats['count'],
+                round(stats['mean'], 6), round(stats['stdev'], 6),
+                stats['min'], stats['max'],
+            ])
+            lignes_ecrites += 1
+
+    return lignes_ecrites
+
+
+def initialiser_bootstrap(donnees):
+    """Copie les données une seule fois dans chaque processus du pool."""
+    global DONNEES_BOOTSTRAP
+    DONNEES_BOOTSTRAP = donnees
+
+
+def bootstrap_bloc(nb_reechantillons, graine):
+    """
+    Calcule moyenne et médiane pour un bloc de rééchantillonnages.
+
+    Les rééchantillons sont tirés d'un coup sous forme de matrice d'indices
+    (nb_reechantillons x n), puis les statistiques sont calculées ligne
+    par ligne de façon vectorisée.
+
+    Args:
+        nb_reechantillons (int): Nombre de rééchantillons du bloc
+        graine: Graine (numpy.random.SeedSequence) propre au bloc
+
+    Returns:
+        tuple: (moyennes, médianes) sous forme de tableaux numpy
+    """
+    import numpy as np
+
+    generateur = np.random.default_rng(graine)
+    indices = generateur.integers(0, len(DONNEES_BOOTSTRAP),
+                                  size=(nb_reechantillons, len(DONNEES_BOOTSTRAP)))
+    echantillons = DONNEES_BOOTSTRAP[indices]
+    del indices
+    return echantillons.mean(axis=1), np.median(echantillons, axis=1)
+
+
+def intervalles_bootstrap(nombres, nb_reechantillons, niveau=0.95, graine=None,
+                          processus=1, memoire_bloc=MEMOIRE_BLOC_BOOTSTRAP):
+    """
+    Calcule les intervalles de confiance bootstrap (percentiles) de la moyenne
+    et de la médiane.
+
+    Les rééchantillons sont traités par blocs dont la taille est choisie pour
+    ne pas dépasser `memoire_bloc` octets. Chaque bloc reçoit sa propre graine
+    dérivée de `graine`: le résultat est identique quel que soit le nombre
+    de processus.
+
+    Args:
+        nombres (list): Liste de nombres
+        nb_reechantillons (int): Nombre de rééchantillons B
+        niveau (float): Niveau de confiance (entre 0 et 1)
+        graine (int): Graine aléatoire (None pour un tirage non reproductible)
+        processus (int): Nombre de processus (1 = dans le processus courant)
+        memoire_bloc (int): Mémoire maximale par bloc en octets
+
+    Returns:
+        dict: {'mean': (bas, haut), 'median': (bas, haut), 'niveau': ..., 'reechantillons': ...}
+
+    Raises:
+        ValueError: Si les paramètres sont invalides
+        ImportError: Si numpy n'est pas installé
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "Le module 'numpy' est nécessaire pour le bootstrap (pip install numpy)"
+        ) from None
+
+    if not nombres:
+        raise ValueError("La liste de nombres est vide")
+    if nb_reechantillons < 1:
+        raise ValueError("Le nombre de rééchantillons doit être positif")
+    if not 0 < niveau < 1:
+        raise ValueError("Le niveau de confiance doit être compris entre 0 et 1")
+
+    donnees = np.asarray(nombres, dtype=np.float64)
+    # Un bloc contient la matrice d'indices (int64), les valeurs tirées (float64)
+    # et la copie de ces valeurs que np.median trie: 24 octets par élément
+    taille_bloc = max(1, memoire_bloc // (24 * len(donnees)))
+    tailles = [min(taille_bloc, nb_reechantillons - debut)
+               for debut in range(0, nb_reechantillons, taille_bloc)]
+    graines = np.random.SeedSequence(graine).spawn(len(tailles))
+
+    if processus > 1 and len(tailles) > 1:
+        with ProcessPoolExecutor(max_workers=processus, initializer=initialiser_bootstrap,
+                                 initargs=(donnees,)) as executeur:
+            resultats = list(executeur.map(bootstrap_bloc, tailles, graines))
+    else:
+        initialiser_bootstrap(donnees)
+        resultats = [bootstrap_bloc(taille, g) for taille, g in zip(tailles, graines)]
+
+    moyennes = np.concatenate([moyennes for moyennes, _ in resultats])
+    medianes = np.concatenate([medianes for _, medianes in resultats])
+    bornes = [(1 - niveau) / 2 * 100, (1 + niveau) / 2 * 100]
+    return {
+        'mean': tuple(float(b) for b in np.percentile(moyennes, bornes)),
+        'median': tuple(float(b) for b in np.percentile(medianes, bornes)),
+        'niveau': niveau,
+        'reechantillons': nb_reechantillons,
+    }
+
+
+class AccumulateurCovariance:
+    """
+    Accumulateur en une passe des moyennes et des co-moments de plusieurs colonnes.
+
+    Chaque lot de lignes est centré sur sa propre moyenne puis fusionné
+    (formule de Chan et al. en version matricielle): la mise à jour du
+    co-moment est un produit matriciel sur le lot plus une correction de
+    rang 1. Deux accumulateurs se fusionnent de la même façon, ce qui permet
+    de traiter un fichier par morceaux ou dans plusieurs processus.
+    """
+
+    def __init__(self, colonnes):
+        import numpy as np
+
+        self.colonnes = list(colonnes)
+        self.count = 0
+        self.mean = np.zeros(len(self.colonnes))
+        self.comoment = np.zeros((len(self.colonnes), len(self.colonnes)))
+
+    def fusionner_moments(self, count, mean, comoment):
+        """Fusionne des moments (effectif, moyennes, co-moments) dans l'accumulateur."""
+        import numpy as np
+
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.comoment += comoment + np.outer(delta, delta) * (self.count * count / total)
+        self.mean += delta * (count / total)
+        self.count = total
+
+    def ajouter_lot(self, lot):
+        """
+        Ajoute un lot de lignes.
+
+        Args:
+            lot: Tableau numpy de forme (nb_lignes, nb_colonnes)
+        """
+        if len(lot) == 0:
+            return
+        moyenne_lot = lot.mean(axis=0)
+        centre = lot - moyenne_lot
+        self.fusionner_moments(len(lot), moyenne_lot, centre.T @ centre)
+
+    def fusionner(self, autre):
+        """Fusionne un autre accumulateur (mêmes colonnes) dans celui-ci."""
+        self.fusionner_moments(autre.count, autre.mean, autre.comoment)
+
+    def vers_dict(self):
+        """Retourne l'état sous forme sérialisable."""
+        return {
+            'colonnes': self.colonnes,
+            'count': self.count,
+            'mean': self.mean.tolist(),
+            'comoment': self.comoment.tolist(),
+        }
+
+    @classmethod
+    def depuis_dict(cls, etat):
+        """Reconstruit un accumulateur à partir de `vers_dict()`."""
+        import numpy as np
+
+        accumulateur = cls(etat['colonnes'])
+        accumulateur.count = etat['count']
+        accumulateur.mean = np.array(etat['mean'], dtype=np.float64)
+        accumulateur.comoment = np.array(etat['comoment'], dtype=np.float64)
+        return accumulateur
+
+    def covariance(self):
+        """Retourne la matrice de covariance (estimateur non biaisé)."""
+        if self.count < 2:
+            raise ValueError("Au moins 2 lignes sont nécessaires")
+        return self.comoment / (self.count - 1)
+
+    def correlation(self):
+        """Retourne la matrice des corrélations de Pearson (nan si écart-type nul)."""
+        import numpy as np
+
+        covariance = self.covariance()
+        ecarts_types = np.sqrt(np.diag(covariance))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return covariance / np.outer(ecarts_types, ecarts_types)
+
+
+def detecter_colonnes_numeriques(nom_fichier):
+    """
+    Repère les colonnes numériques d'après la première ligne de données.
+
+    Returns:
+        tuple: (indices des colonnes, noms des colonnes)
+    """
+    lecteur = csv.reader(ouvrir_lignes(nom_fichier))
+    en_tete = next(lecteur, [])
+    premiere_ligne = next(lecteur, [])
+    indices = []
+    for i, valeur in enumerate(premiere_ligne[:len(en_tete)]):
+        try:
+            float(valeur)
+            indices.append(i)
+        except ValueError:
+            pass
+    return indices, [en_tete[i] for i in indices]
+
+
+def accumuler_covariance(lignes_csv, accumulateur, indices, taille_lot=TAILLE_LOT_COVARIANCE):
+    """
+    Convertit des lignes CSV par lots et les ajoute à l'accumulateur.
+
+    Les lignes dont une colonne numérique n'est pas convertible sont ignorées.
+
+    Args:
+        lignes_csv: Itérable de lignes déjà découpées (listes de champs)
+        accumulateur (AccumulateurCovariance): Accumulateur à compléter
+        indices (list): Indices des colonnes numériques
+        taille_lot (int): Nombre de lignes par lot
+    """
+    import numpy as np
+
+    lot = []
+    for ligne in lignes_csv:
+        try:
+            lot.append([float(ligne[i]) for i in indices])
+        except (ValueError, IndexError):
+            continue
+        if len(lot) >= taille_lot:
+            accumulateur.ajouter_lot(np.array(lot, dtype=np.float64))
+            lot = []
+    if lot:
+        accumulateur.ajouter_lot(np.array(lot, dtype=np.float64))
+
+
+def covariance_segment(nom_fichier, debut, fin, indices, colonnes):
+    """
+    Calcule l'accumulateur de covariance d'une tranche d'octets d'un fichier.
+
+    Une ligne appartient à la tranche où elle commence; l'en-tête est ignoré.
+
+    Returns:
+        dict: État de l'accumulateur (voir `AccumulateurCovariance.vers_dict()`)
+    """
+    def lignes_segment():
+        with open(nom_fichier, 'rb') as fichier:
+            position = debut
+            if debut == 0:
+                position += len(fichier.readline())
+            else:
+                fichier.seek(debut - 1)
+                position += len(fichier.readline()) - 1
+            while position < fin:
+                ligne = fichier.readline()
+                if not ligne:
+                    break
+                position += len(ligne)
+                yield ligne.decode('utf-8')
+
+    accumulateur = AccumulateurCovariance(colonnes)
+    accumuler_covariance(csv.reader(lignes_segment()), accumulateur, indices)
+    return accumulateur.vers_dict()
+
+
+def calculer_correlations(nom_fichier, processus=1):
+    """
+    Calcule en une passe la matrice de corrélation des colonnes numériques d'un CSV.
+
+    Avec plusieurs processus, un fichier non compressé est découpé en
+    tranches d'octets; chaque processus calcule ses moments, puis ceux-ci
+    sont fusionnés.
+
+    Args:
+        nom_fichier (str): Chemin du fichier CSV
+        processus (int): Nombre de processus
+
+    Returns:
+        AccumulateurCovariance: Accumulateur final (voir `correlation()`)
+
+    Raises:
+        ValueError: S'il n'y a pas de colonne numérique
+        ImportError: Si numpy n'est pas installé
+    """
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "Le module 'numpy' est nécessaire pour les corrélations (pip install numpy)"
+        ) from None
+
+    indices, colonnes = detecter_colonnes_numeriques(nom_fichier)
+    if not colonnes:
+        raise ValueError("Aucune colonne numérique trouvée")
+
+    accumulateur = AccumulateurCovariance(colonnes)
+    if processus > 1 and detecter_compression(nom_fichier) is None:
+        taille = os.path.getsize(nom_fichier)
+        bornes = [taille * i // processus for i in range(processus + 1)]
+        with ProcessPoolExecutor(max_workers=processus) as executeur:
+            etats = executeur.map(
+                covariance_segment,
+                [nom_fichier] * processus, bornes[:-1], bornes[1:],
+                [indices] * processus, [colonnes] * processus,
+            )
+            for etat in etats:
+                accumulateur.fusionner(AccumulateurCovariance.depuis_dict(etat))
+    else:
+        lecteur = csv.reader(ouvrir_lignes(nom_fichier))
+        next(lecteur)
+        accumuler_covariance(lecteur, accumulateur, indices)
+
+    return accumulateur
+
+
+def afficher_correlations(accumulateur):
+    """
+    Affiche la matrice des corrélations de Pearson.
+
+    Args:
+        accumulateur (AccumulateurCovariance): Accumulateur rempli
+    """
+    correlations = accumulateur.correlation()
+    largeur = max(12, max(len(c) for c in accumulateur.colonnes) + 2)
+    print("\n" + "="*50)
+    print("           MATRICE DE CORRÉLATION (Pearson)")
+    print("="*50)
+    print(f"Nombre de lignes   : {accumulateur.count}")
+    print()
+    print(" " * largeur + "".join(f"{c:>{largeur}}" for c in accumulateur.colonnes))
+    for nom, ligne in zip(accumulateur.colonnes, correlations):
+        print(f"{nom:<{largeur}}" + "".join(f"{v:>{largeur}.3f}" for v in ligne))
+    print()
+
+
 def afficher_statistiques(stats):
     """
     Affiche les statistiques de manière formatée.
@@ -107,7 +1012,10 @@ def afficher_statistiques(stats):
     print()
     print("Tendance centrale:")
     print(f"  • Moyenne        : {stats['mean']:.2f}")
-    print(f"  • Médiane        : {stats['median']:.2f}")
+    if stats['median'] is not None:
+        print(f"  • Médiane        : {stats['median']:.2f}")
+    else:
+        print("  • Médiane        : n/d (mode incrémental)")
     print()
     print("Dispersion:")
     print(f"  • Minimum        : {stats['min']:.2f}")
@@ -120,17 +1028,136 @@ def afficher_statistiques(stats):
     print()
 
 
+def afficher_intervalles(intervalles):
+    """
+    Affiche les intervalles de confiance bootstrap.
+
+    Args:
+        intervalles (dict): Résultat de `intervalles_bootstrap()`
+    """
+    niveau = intervalles['niveau'] * 100
+    print(f"Intervalles de confiance à {niveau:g}% "
+          f"(bootstrap, {intervalles['reechantillons']} rééchantillons):")
+    print(f"  • Moyenne        : [{intervalles['mean'][0]:.2f} ; {intervalles['mean'][1]:.2f}]")
+    print(f"  • Médiane        : [{intervalles['median'][0]:.2f} ; {intervalles['median'][1]:.2f}]")
+    print()
+
+
 def main():
     """
     Fonction principale du script.
     """
-    # Nom du fichier (dans le même dossier que le script)
+    # Nom du fichier par défaut (dans le même dossier que le script)
     script_dir = Path(__file__).parent
-    nom_fichier = script_dir / 'numbers.csv'
-    
+
+    parser = argparse.ArgumentParser(description="Calcul de statistiques descriptives")
+    parser.add_argument('fichier', nargs='?', default=script_dir / 'numbers.csv',
+                        help="Fichier CSV à analyser (défaut: numbers.csv)")
+    parser.add_argument('--cache', action='store_true',
+                        help="Mode incrémental: ne relit que les lignes ajoutées")
+    parser.add_argument('--fichier-cache', default=None,
+                        help="Chemin du cache (défaut: <fichier>.statscache.json)")
+    bootstrap = parser.add_argument_group("intervalles de confiance bootstrap")
+    bootstrap.add_argument('--bootstrap', type=int, default=None, metavar='B',
+                           help="Nombre de rééchantillons bootstrap (nécessite numpy)")
+    bootstrap.add_argument('--niveau', type=float, default=0.95,
+                           help="Niveau de confiance (défaut: 0.95)")
+    bootstrap.add_argument('--graine', type=int, default=None,
+                           help="Graine aléatoire pour des résultats reproductibles")
+    bootstrap.add_argument('--processus', type=int, default=1,
+                           help="Nombre de processus (bootstrap, corrélations; défaut: 1)")
+    parser.add_argument('--correlations', action='store_true',
+                        help="Matrice de corrélation des colonnes numériques (nécessite numpy)")
+    glissant = parser.add_argument_group("statistiques glissantes")
+    taille = glissant.add_mutually_exclusive_group()
+    taille.add_argument('--fenetre', type=int, default=None,
+                        help="Fenêtre glissante de N lignes")
+    taille.add_argument('--fenetre-jours', type=int, default=None,
+                        help="Fenêtre glissante de N jours")
+    glissant.add_argument('--colonne', default=None,
+                          help="Colonne numérique à analyser (défaut: première colonne numérique)")
+    glissant.add_argument('--colonne-date', default='date',
+                          help="Colonne de date AAAA-MM-JJ (défaut: date)")
+    glissant.add_argument('--sortie', default='stats_glissantes.csv',
+                          help="Fichier CSV de sortie (défaut: stats_glissantes.csv)")
+    args = parser.parse_args()
+    # Vérifiés avant toute lecture: sinon l'erreur n'apparaîtrait qu'après les statistiques
+    if args.bootstrap is not None and args.bootstrap < 1:
+        parser.error(f"--bootstrap: au moins 1 rééchantillon attendu (reçu {args.bootstrap})")
+    if not 0 < args.niveau < 1:
+        parser.error(f"--niveau: valeur attendue entre 0 et 1 (reçu {args.niveau:g})")
+    if args.bootstrap is not None:
+        # Ces modes n'affichent pas les statistiques auxquelles le bootstrap s'ajoute
+        incompatibles = [option for option, active in (
+            ('--cache', args.cache),
+            ('--correlations', args.correlations),
+            ('--fenetre', args.fenetre is not None),
+            ('--fenetre-jours', args.fenetre_jours is not None),
+        ) if active]
+        if incompatibles:
+            parser.error(f"--bootstrap ne se combine pas avec {', '.join(incompatibles)}")
+    nom_fichier = args.fichier
+
     print("🔢 Calcul de Statistiques")
     print(f"📁 Lecture du fichier: {nom_fichier}")
-    
+
+    if args.correlations:
+        if not Path(nom_fichier).exists():
+            print(f"❌ Erreur: Le fichier '{nom_fichier}' n'existe pas")
+            sys.exit(1)
+        try:
+            accumulateur = calculer_correlations(nom_fichier, processus=args.processus)
+            afficher_correlations(accumulateur)
+        except (ValueError, ImportError) as e:
+            print(f"❌ Erreur: {e}")
+            sys.exit(1)
+        return
+
+    if args.fenetre is not None or args.fenetre_jours is not None:
+        if not Path(nom_fichier).exists():
+            print(f"❌ Erreur: Le fichier '{nom_fichier}' n'existe pas")
+            sys.exit(1)
+        colonne = args.colonne
+        try:
+            if colonne is None:
+                _, colonnes = detecter_colonnes_numeriques(nom_fichier)
+                if not colonnes:
+                    raise ValueError("aucune colonne numérique, indiquez --colonne")
+                colonne = colonnes[0]
+                print(f"📈 Colonne analysée: {colonne}")
+            nb_lignes = calculer_statistiques_glissantes(
+                nom_fichier, colonne, args.sortie,
+                fenetre=args.fenetre, jours=args.fenetre_jours,
+                colonne_date=args.colonne_date,
+            )
+        except (ValueError, ImportError) as e:
+            print(f"❌ Erreur: {e}")
+            sys.exit(1)
+        print(f"✅ {nb_lignes} lignes de statistiques glissantes écrites dans {args.sortie}")
+        return
+
+    if args.cache and not Path(nom_fichier).exists():
+        print(f"❌ Erreur: Le fichier '{nom_fichier}' n'existe pas")
+        sys.exit(1)
+    if args.cache and detecter_compression(nom_fichier):
+        print("⚠ Le mode incrémental ne s'applique pas aux fichiers compressés: calcul complet")
+        args.cache = False
+
+    if args.cache:
+        try:
+            stats, mode = calculer_statistiques_incrementales(nom_fichier, args.fichier_cache)
+        except ValueError:
+            print("❌ Aucune donnée valide trouvée dans le fichier")
+            sys.exit(1)
+        libelles = {
+            'cache': "fichier inchangé, résultat lu dans le cache",
+            'incremental': "seules les lignes ajoutées ont été lues",
+            'complet': "calcul complet (pas de cache valide)",
+        }
+        print(f"♻️  Cache: {libelles[mode]}")
+        afficher_statistiques(stats)
+        return
+
     # Lecture des données
     nombres = lire_nombres_csv(nom_fichier)
     
@@ -146,6 +1173,18 @@ def main():
     # Affichage des résultats
     afficher_statistiques(stats)
     
+    # Intervalles de confiance (optionnel)
+    if args.bootstrap is not None:
+        try:
+            intervalles = intervalles_bootstrap(
+                nombres, args.bootstrap, niveau=args.niveau,
+                graine=args.graine, processus=args.processus,
+            )
+        except (ValueError, ImportError) as e:
+            print(f"❌ Erreur: {e}")
+            sys.exit(1)
+        afficher_intervalles(intervalles)
+
     # Affichage des 5 premières et dernières valeurs
     print("📊 Aperçu des données:")
     print(f"  Premières valeurs: {nombres[:5]}")
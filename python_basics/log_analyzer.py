@@ -7,129 +7,3186 @@ Ce script analyse un fichier de logs de serveur web et produit des statistiques
 - Top 5 des endpoints les plus consultés
 - Statistiques sur les codes de statut HTTP
 - Détection des erreurs (codes 4xx et 5xx)
+- Requêtes, erreurs et taux de 5xx par minute
+- Bande passante par endpoint et latences p50/p95/p99
+- Normalisation des endpoints (/users/48213 -> /users/{id}) avant comptage
+- Ingestion simultanée de plusieurs fichiers et de logs reçus en syslog UDP
+- Sessions par IP et IPs au débit anormal (fenêtre glissante)
+- Filtre ('status>=500 and path^=/api') vérifié sur la ligne brute avant le parsing
 
-Format de log attendu (Apache Combined Log Format) :
-IP - - [date] "METHOD /endpoint HTTP/version" status_code
+Format de log attendu (Apache Combined Log Format, champs après le statut optionnels) :
+IP ident user [date] "METHOD /endpoint HTTP/version" status taille "referer" "user-agent" durée
+(durée de la requête en secondes, comme $request_time de nginx)
 
 Utilisation:
-    python log_analyzer.py
+    python log_analyzer.py [fichier.log]
+    python log_analyzer.py 'logs/access.log*' --workers 8   # Fichiers tournés, .gz compris
+    python log_analyzer.py logs/                            # Tous les logs d'un dossier
+    python log_analyzer.py access.log --normaliser          # Endpoints regroupés par gabarit
+    python log_analyzer.py access.log --sessions --seuil-debit 120   # Sessions et débits anormaux
+    python log_analyzer.py access.log --workers 4   # Analyse sur 4 processus
+    python log_analyzer.py access.log --exact       # Top IPs/endpoints exacts (Counter)
+    python log_analyzer.py access.log --precision-hll 14   # Distincts estimés plus précis
+    python log_analyzer.py access.log --follow --intervalle 5   # Suivi en direct
+    python log_analyzer.py access.log --follow --json etat.json # Instantané JSON
+    python log_analyzer.py a.log b.log --follow                 # Plusieurs fichiers suivis
+    python log_analyzer.py --udp 0.0.0.0:5140                   # Logs reçus en syslog UDP
+    python log_analyzer.py access.log --construire-index        # Index des blocs
+    python log_analyzer.py access.log --statut 5xx --depuis 2024-10-10T14:00 --jusqu-a 2024-10-10T14:05
+    python log_analyzer.py access.log --filtre 'status>=500 and path^=/api'   # Filtre avant parsing
+    python log_analyzer.py access.log --export-parquet logs_parquet   # Conversion en Parquet
+    python log_analyzer.py logs_parquet --parquet --statut 5xx        # Analyse du Parquet
+    python log_analyzer.py access.log --mmap                          # Parsing des octets (mmap)
+    python log_analyzer.py access.log --profile                       # Temps par étape
+    python log_analyzer.py access.log --profile-sortie profil.json    # Profil speedscope
+
+Dépendances:
+    - pyarrow (optionnel, pour --export-parquet et --parquet)
 
 Auteur: Cours Python et Analyse de Données
 Session: S7 - Collections Avancées
 """
 
-import re
-from collections import Counter, defaultdict
-from datetime import datetime
-from pathlib import Path
+import argparse
+import asyncio
+import contextlib
+import cProfile
+import glob
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import operator
+import os
+import random
+import re
+import socket
+import time
+from array import array
+from collections import Counter, OrderedDict, defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import chain, islice
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+# Taille du tampon de lecture (en octets): peu d'appels système,
+# mémoire constante quelle que soit la taille du fichier
+TAILLE_TAMPON_LECTURE = 1 << 20
+
+# Nombre d'erreurs gardées en exemple (échantillon aléatoire, par statut avec --par-statut)
+NB_EXEMPLES_ERREURS = 10
+
+# Nombre de minutes affichées dans le trafic par minute (les plus récentes)
+NB_MINUTES_AFFICHEES = 15
+
+# Nombre de compteurs gardés par le top approximatif (Space-Saving)
+CAPACITE_TOP_DEFAUT = 10_000
+
+# Précision par défaut des estimations HyperLogLog: 2**12 registres d'un
+# octet (4 Ko), erreur relative typique de 1.04 / sqrt(4096) ≈ 1.6 %
+PRECISION_HLL_DEFAUT = 12
+
+# Index des logs (--construire-index): un résumé par bloc d'environ 1 Mo,
+# invalidé par la version, la taille et l'empreinte des 4 derniers Ko indexés
+TAILLE_BLOC_INDEX = 1 << 20
+TAILLE_BLOC_CONTROLE = 4096
+VERSION_INDEX = 1
+
+# Nombre d'enregistrements convertis en table Arrow à la fois (--export-parquet)
+TAILLE_LOT_PARQUET = 100_000
+
+# Sessions par IP (--sessions): une session se termine après 30 minutes sans
+# requête; le débit de chaque IP active est compté sur une fenêtre glissante
+# de 60 s découpée en 12 cases (anneau), au-delà de 300 requêtes elle est signalée
+DELAI_SESSION = 1800
+FENETRE_DEBIT = 60
+NB_CASES_FENETRE = 12
+SEUIL_DEBIT = 300
+MAX_ANOMALIES = 1000
+
+# Expression de --filtre: conditions 'champ opérateur valeur' reliées par 'and'
+MOTIF_CONDITION = re.compile(r'\s*([A-Za-z_]+)\s*(==|!=|>=|<=|\^=|=|>|<)\s*(\S+)\s*$')
+ALIAS_CHAMPS_FILTRE = {'statut': 'status', 'methode': 'method', 'endpoint': 'path'}
+COMPARAISONS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+STATUTS_POSSIBLES = frozenset(range(100, 600))
+# Au-delà de 3 variantes (codes ou premiers chiffres), un indice de statut
+# ne trie presque plus rien: le critère est vérifié après le parsing seulement
+MAX_INDICES_FILTRE = 3
+
+# Parsing des octets (--mmap): le fichier projeté est parcouru par fenêtres
+# de 64 Mo, dont les pages sont rendues au noyau une fois analysées
+TAILLE_FENETRE_MMAP = 64 << 20
+
+# Pause entre deux lectures du fichier suivi (--follow), en secondes
+PAUSE_SUIVI = 0.5
+
+# Ingestion asynchrone (--udp, --follow sur plusieurs fichiers): les lignes
+# sont analysées par lots de 1000; au plus 64 lots attendent l'agrégation
+TAILLE_LOT_INGESTION = 1000
+MAX_LOTS_INGESTION = 64
+# Tampon de réception UDP du noyau: absorbe les rafales pendant l'analyse d'un lot
+TAILLE_TAMPON_UDP = 1 << 22
+
+# En-tête syslog devant la ligne de log: RFC 5424 ("<134>1 2024-10-10T13:55:36Z
+# web1 nginx - - - ") ou RFC 3164 ("<134>Oct 10 13:55:36 web1 nginx[12]: ")
+MOTIF_SYSLOG = re.compile(
+    r'(?:<\d{1,3}>(?:1 \S+ \S+ \S+ \S+ \S+ (?:-|\[.*?\]) ?'
+    r'|[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d \S+ [^:\s]+: ?)?)?'
+)
+
+# Profil par étape (--profile): le parsing est chronométré sur une ligne
+# sur 100, la lecture par lots de 1000 lignes (deux appels d'horloge par lot)
+ECHANTILLON_PROFIL = 100
+TAILLE_LOT_PROFIL = 1000
+
+# Les séries par minute s'allongent par blocs d'une heure; au-delà de
+# 400 jours d'écart avec la première minute, une date est jugée aberrante.
+# Une série d'au plus un jour peut repartir d'une autre origine
+BLOC_MINUTES = 60
+PORTEE_MAX_MINUTES = 400 * 24 * 60
+MAX_MINUTES_REANCRAGE = 24 * 60
+
+MOIS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+        'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+# Esquisses de latence: erreur relative de 2 % sur chaque quantile,
+# au plus 512 classes par endpoint
+PRECISION_LATENCE = 0.02
+NB_CLASSES_LATENCE = 512
+
+# Endpoint sous lequel sont regroupées les latences au-delà de `capacite_top` endpoints
+AUTRES_ENDPOINTS = '(autres)'
+
+# Noms retenus quand un dossier est donné: access.log, access.log.1, access.log.2.gz...
+MOTIF_NOM_LOG = re.compile(r'\.log(\.\d+)?(\.gz)?$|\.gz$')
+MOTIF_ROTATION = re.compile(r'(.*?)(?:\.(\d+))?(?:\.gz)?$')
+
+# Règles de normalisation des endpoints (nom, regex d'un segment de chemin),
+# essayées dans l'ordre: /users/48213/orders/99 -> /users/{id}/orders/{id}
+REGLES_NORMALISATION = [
+    ('uuid', r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'),
+    ('id', r'\d+'),
+    ('hash', r'[0-9a-fA-F]{16,}'),
+]
+
+# Nombre d'endpoints bruts dont le gabarit est gardé en cache (LRU)
+TAILLE_CACHE_NORMALISATION = 1 << 16
+
+# Durées (classe de latence) et user-agents (HyperLogLog) déjà vus gardés
+# en cache (LRU): peu de valeurs distinctes, une par ligne du format combiné
+TAILLE_CACHE_COMBINE = 1 << 12
+
+# Pattern compilé une seule fois pour tout le module: format commun, puis
+# taille, referer et user-agent (format combiné) et durée, tous optionnels.
+# Chaînes entre guillemets en boucle déroulée ([^"\\]*(?:\\.[^"\\]*)*):
+# une alternative par caractère doublait le coût du match
+MOTIF_LOG = re.compile(
+    r'(\S+) \S+ \S+ \[(.*?)\] "(\S+) (\S+) HTTP/\d\.\d" (\d+)'
+    r'(?: (\d+|-)(?: "([^"\\]*(?:\\.[^"\\]*)*)" "([^"\\]*(?:\\.[^"\\]*)*)")?(?: (\d+(?:\.\d+)?))?)?'
+)
+
+# Même motif sur des octets (--mmap), parcouru sur tout le tampon: chaque
+# correspondance couvre une ligne entière, champs à None si elle est invalide
+# (plus rapide qu'une recherche du début de ligne à chaque position)
+MOTIF_LOG_OCTETS = re.compile(
+    rb'(?=[\s\S])(?:[ \t]*(\S+) \S+ \S+ \[(.*?)\] "(\S+) (\S+) HTTP/\d\.\d" (\d+)'
+    rb'(?: (\d+|-)(?: "([^"\\\n]*(?:\\.[^"\\\n]*)*)" "([^"\\\n]*(?:\\.[^"\\\n]*)*)")?'
+    rb'(?: (\d+(?:\.\d+)?))?)?)?'
+    rb'[^\n]*\n?'
+)
+
+# Enregistrement léger (tuple nommé, sans dictionnaire par instance);
+# les champs absents du format commun valent None
+EnregistrementLog = namedtuple(
+    'EnregistrementLog',
+    ['ip', 'date', 'method', 'endpoint', 'status', 'taille', 'referer', 'user_agent', 'duree'],
+    defaults=(None, None, None, None),
+)
+
+
+def lire_logs(nom_fichier, taille_tampon=TAILLE_TAMPON_LECTURE):
+    """
+    Lit un fichier de logs ligne par ligne, sans le charger en mémoire.
+    
+    Args:
+        nom_fichier (str): Chemin du fichier de logs
+        taille_tampon (int): Taille du tampon de lecture en octets
+    
+    Yields:
+        str: Lignes du fichier, une à une
+    
+    Les fichiers compressés par gzip (reconnus à leur signature, quel que
+    soit leur nom) sont décompressés à la volée.
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+    """
+    if est_gzip(nom_fichier):
+        with gzip.open(nom_fichier, 'rt', encoding='utf-8', errors='replace') as fichier:
+            yield from fichier
+        return
+    with open(nom_fichier, 'r', encoding='utf-8', errors='replace',
+              buffering=taille_tampon) as fichier:
+        yield from fichier
+
+
+def est_gzip(nom_fichier):
+    """Indique si un fichier est compressé par gzip (signature 1f 8b)."""
+    with open(nom_fichier, 'rb') as fichier:
+        return fichier.read(2) == b'\x1f\x8b'
+
+
+def cle_rotation(chemin):
+    """
+    Clé de tri chronologique des fichiers tournés.
+
+    access.log.30.gz ... access.log.2.gz, access.log.1 puis access.log:
+    plus le numéro de rotation est grand, plus le fichier est ancien.
+    """
+    chemin = Path(chemin)
+    base, numero = MOTIF_ROTATION.match(chemin.name).groups()
+    return (str(chemin.parent), base, -int(numero) if numero else 0)
+
+
+def lister_fichiers_logs(entrees):
+    """
+    Développe des chemins, des dossiers et des motifs glob en liste de fichiers.
+
+    Un dossier apporte ses fichiers de logs (*.log, *.log.N, *.log.N.gz, *.gz).
+    Les fichiers sont triés du plus ancien au plus récent (voir `cle_rotation()`).
+
+    Args:
+        entrees (list): Chemins, dossiers ou motifs ('logs/access.log*')
+
+    Returns:
+        list: Chemins des fichiers, sans doublon
+
+    Raises:
+        FileNotFoundError: Si un chemin n'existe pas ou si un motif ne trouve rien
+    """
+    fichiers = []
+    for entree in map(str, entrees):
+        if glob.has_magic(entree):
+            trouves = [f for f in glob.glob(entree) if os.path.isfile(f)]
+        elif os.path.isdir(entree):
+            trouves = [str(f) for f in Path(entree).iterdir()
+                       if f.is_file() and MOTIF_NOM_LOG.search(f.name)]
+        elif os.path.isfile(entree):
+            trouves = [entree]
+        else:
+            trouves = []
+        if not trouves:
+            raise FileNotFoundError(entree)
+        fichiers.extend(sorted(trouves, key=cle_rotation))
+    return list(dict.fromkeys(fichiers))
+
+
+def parser_ligne_log(ligne):
+    """
+    Parse une ligne de log pour extraire les informations.
+    
+    Format: IP - - [date] "METHOD /endpoint HTTP/version" status [taille "referer" "user-agent"] [durée]
+    
+    Args:
+        ligne (str): Une ligne de log
+    
+    Returns:
+        dict: Dictionnaire contenant les informations parsées ou None si échec
+    """
+    enregistrement = parser_ligne_rapide(ligne)
+    if enregistrement:
+        return enregistrement._asdict()
+    return None
+
+
+def parser_ligne_rapide(ligne):
+    """
+    Parse une ligne de log et retourne un `EnregistrementLog` (sans dictionnaire).
+
+    Utilise le pattern précompilé `MOTIF_LOG`. Un découpage par `str.split()`
+    a été mesuré: avec les vérifications nécessaires pour donner le même
+    résultat que la regex, il est plus lent que celle-ci sous CPython.
+
+    Args:
+        ligne (str): Une ligne de log (sans retour à la ligne)
+
+    Returns:
+        EnregistrementLog: Champs de la ligne, ou None si elle est invalide
+    """
+    match = MOTIF_LOG.match(ligne)
+    if match:
+        ip, date, methode, endpoint, status, taille, referer, user_agent, duree = match.groups()
+        if taille is not None:
+            # '-': réponse sans corps
+            taille = 0 if taille == '-' else int(taille)
+        if duree is not None:
+            duree = float(duree)
+        return EnregistrementLog(ip, date, methode, endpoint, int(status),
+                                 taille, referer, user_agent, duree)
+    return None
+
+
+def date_vers_epoch(texte):
+    """
+    Convertit une date de log ('10/Oct/2024:13:55:36 +0000') en secondes epoch.
+
+    Le calcul est fait à la main (jours depuis 1970 par l'algorithme
+    « days from civil »), bien plus vite que `datetime.strptime()`.
+
+    Args:
+        texte (str): Date au format des logs Apache
+
+    Returns:
+        int: Secondes depuis le 1er janvier 1970 UTC, ou None si la date est invalide
+    """
+    try:
+        jour = int(texte[0:2])
+        mois = MOIS[texte[3:6]]
+        annee = int(texte[7:11])
+        heures, minutes, secondes = int(texte[12:14]), int(texte[15:17]), int(texte[18:20])
+        fuseau = texte[21:26]
+        decalage = (int(fuseau[1:3]) * 3600 + int(fuseau[3:5]) * 60) if fuseau else 0
+    except (KeyError, ValueError):
+        return None
+    if fuseau.startswith('-'):
+        decalage = -decalage
+
+    annee -= mois <= 2
+    ere = annee // 400
+    annee_ere = annee - ere * 400
+    jour_annee = (153 * (mois + (-3 if mois > 2 else 9)) + 2) // 5 + jour - 1
+    jour_ere = annee_ere * 365 + annee_ere // 4 - annee_ere // 100 + jour_annee
+    jours = ere * 146097 + jour_ere - 719468
+    return jours * 86400 + heures * 3600 + minutes * 60 + secondes - decalage
+
+
+class SerieMinutes:
+    """
+    Requêtes, erreurs (4xx/5xx) et erreurs 5xx par minute.
+
+    Les compteurs sont des tableaux d'entiers (`array`) indexés par le
+    nombre de minutes écoulées depuis `origine`; ils s'allongent par
+    blocs de `BLOC_MINUTES`. Les dates aberrantes (plus de
+    `PORTEE_MAX_MINUTES` d'écart) sont ignorées et leurs lignes comptées
+    dans `hors_portee`. Si c'est la première date qui était aberrante,
+    la série repart des dates suivantes (voir `reancrer()`).
+    """
+
+    def __init__(self):
+        self.origine = None  # Première minute (minutes depuis epoch)
+        self.requetes = array('q')
+        self.erreurs = array('q')
+        self.erreurs_5xx = array('q')
+        # Lignes datées hors de la série (compteur tenu par l'appelant d'indice())
+        self.hors_portee = 0
+
+    def __len__(self):
+        return len(self.requetes)
+
+    def indice(self, epoch, reancrer=True):
+        """
+        Retourne l'indice de la minute contenant `epoch`, en agrandissant les tableaux.
+
+        Args:
+            epoch (int): Secondes epoch
+            reancrer (bool): Permettre de repartir de cette date (voir `reancrer()`)
+
+        Returns:
+            int: Indice dans les tableaux, ou None si la date est aberrante
+        """
+        minute = epoch // 60
+        if self.origine is None:
+            self.origine = minute
+        decalage = minute - self.origine
+        if decalage < 0:
+            # Ligne antérieure à la première: décaler l'origine d'un nombre entier de blocs
+            if len(self) - decalage > PORTEE_MAX_MINUTES:
+                return self.reancrer(epoch) if reancrer else None
+            ajout = -(decalage // BLOC_MINUTES) * BLOC_MINUTES
+            for tableau in (self.requetes, self.erreurs, self.erreurs_5xx):
+                tableau[:0] = array('q', bytes(8 * ajout))
+            self.origine -= ajout
+            decalage += ajout
+        elif decalage >= len(self):
+            if decalage >= PORTEE_MAX_MINUTES:
+                return self.reancrer(epoch) if reancrer else None
+            ajout = (decalage - len(self)) // BLOC_MINUTES * BLOC_MINUTES + BLOC_MINUTES
+            for tableau in (self.requetes, self.erreurs, self.erreurs_5xx):
+                tableau.extend(array('q', bytes(8 * ajout)))
+        return decalage
+
+    def reancrer(self, epoch):
+        """
+        Repart de la minute de `epoch` si la série actuelle est creuse.
+
+        Sans cela, une première ligne à la date aberrante (mauvaise année)
+        fixerait l'origine loin de toutes les suivantes, toutes ignorées.
+        La série est abandonnée quand elle couvre au plus
+        `MAX_MINUTES_REANCRAGE` minutes et ne compte pas plus de requêtes
+        que de lignes déjà ignorées; ses requêtes passent dans `hors_portee`.
+
+        Returns:
+            int: Indice de la minute de `epoch`, ou None si la série est gardée
+        """
+        if len(self) > MAX_MINUTES_REANCRAGE:
+            return None
+        requetes = sum(self.requetes)
+        if requetes > self.hors_portee:
+            return None
+        self.hors_portee += requetes
+        # Vidés sur place: l'agrégation garde des références aux tableaux
+        for tableau in (self.requetes, self.erreurs, self.erreurs_5xx):
+            del tableau[:]
+        self.origine = None
+        return self.indice(epoch)
+
+    def fusionner(self, autre):
+        """
+        Additionne les compteurs d'une autre série.
+
+        Args:
+            autre (SerieMinutes): Série à ajouter
+        """
+        self.hors_portee += autre.hors_portee
+        if autre.origine is None:
+            return
+        # Agrandir les tableaux pour couvrir la première et la dernière minute de l'autre série
+        for minute in (autre.origine, autre.origine + len(autre) - 1):
+            if self.indice(minute * 60, reancrer=False) is None:
+                self.hors_portee += sum(autre.requetes)
+                return
+        base = autre.origine - self.origine
+        for tableau, ajout in ((self.requetes, autre.requetes), (self.erreurs, autre.erreurs),
+                               (self.erreurs_5xx, autre.erreurs_5xx)):
+            for i, valeur in enumerate(ajout):
+                if valeur:
+                    tableau[base + i] += valeur
+
+    def vers_dict(self):
+        """
+        Retourne la série sans les minutes vides en début et en fin.
+
+        Returns:
+            dict: 'debut' (epoch de la première minute), listes par minute
+                'requetes', 'erreurs', 'erreurs_5xx' et lignes 'hors_portee'
+        """
+        actives = [i for i, valeur in enumerate(self.requetes) if valeur]
+        if not actives:
+            return {'debut': None, 'requetes': [], 'erreurs': [], 'erreurs_5xx': [],
+                    'hors_portee': self.hors_portee}
+        premier, dernier = actives[0], actives[-1] + 1
+        return {
+            'debut': (self.origine + premier) * 60,
+            'requetes': self.requetes[premier:dernier].tolist(),
+            'erreurs': self.erreurs[premier:dernier].tolist(),
+            'erreurs_5xx': self.erreurs_5xx[premier:dernier].tolist(),
+            'hors_portee': self.hors_portee,
+        }
+
+
+class NormaliseurEndpoints:
+    """
+    Remplace les identifiants des endpoints par des gabarits ({id}, {uuid}, {hash}).
+
+    Toutes les règles sont réunies en une seule regex (un groupe nommé
+    par règle) appliquée en une passe aux segments du chemin; la
+    chaîne de requête (?...) est retirée. Les résultats sont gardés dans
+    un cache LRU: un endpoint déjà vu ne coûte qu'une recherche. Une
+    règle remplace les suivantes de même nom (--regle 'id=...' remplace
+    la règle id par défaut).
+    """
+
+    def __init__(self, regles=None, taille_cache=TAILLE_CACHE_NORMALISATION, garder_requete=False):
+        self.regles = []
+        noms = set()
+        for nom, regex in (REGLES_NORMALISATION if regles is None else regles):
+            if not nom.isidentifier():
+                raise ValueError(f"Nom de règle invalide: '{nom}'")
+            # Un nom de groupe ne peut pas apparaître deux fois dans la regex unique
+            if nom not in noms:
+                noms.add(nom)
+                self.regles.append((nom, regex))
+        self.taille_cache = taille_cache
+        self.garder_requete = garder_requete
+        self.compiler()
+
+    def compiler(self):
+        """Compile la regex unique et crée le cache."""
+        alternatives = '|'.join(f'(?P<{nom}>{regex})' for nom, regex in self.regles)
+        # Un segment entier: précédé d'un '/', suivi d'un séparateur ou de la fin
+        self.motif = re.compile(rf'(?<=/)(?:{alternatives})(?=[/?;.]|$)')
+        self.normaliser = lru_cache(maxsize=self.taille_cache)(self.calculer)
+
+    def calculer(self, endpoint):
+        """Calcule le gabarit d'un endpoint (sans passer par le cache)."""
+        if not self.garder_requete:
+            endpoint = endpoint.partition('?')[0]
+        return self.motif.sub(lambda m: '{' + m.lastgroup + '}', endpoint)
+
+    def __call__(self, endpoint):
+        return self.normaliser(endpoint)
+
+    def __getstate__(self):
+        # Regex et cache ne se transmettent pas aux processus: ils sont recréés
+        return {'regles': self.regles, 'taille_cache': self.taille_cache,
+                'garder_requete': self.garder_requete}
+
+    def __setstate__(self, etat):
+        self.__dict__.update(etat)
+        self.compiler()
+
+
+def lire_regle(texte):
+    """
+    Lit une règle de normalisation de la ligne de commande ('nom=regex').
+
+    Returns:
+        tuple: (nom, regex)
+    """
+    nom, separateur, regex = texte.partition('=')
+    if not separateur or not nom.isidentifier():
+        raise argparse.ArgumentTypeError(f"Règle attendue sous la forme nom=regex: '{texte}'")
+    try:
+        re.compile(regex)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"Regex invalide pour '{nom}': {e}") from None
+    return nom, regex
+
+
+class SpaceSaving:
+    """
+    Top-k approximatif en mémoire fixe (algorithme Space-Saving).
+
+    Au plus `capacite` éléments sont suivis. Quand un nouvel élément arrive
+    et que la table est pleine, il remplace l'élément le moins fréquent et
+    hérite de son compteur, gardé comme erreur maximale. Chaque compteur
+    surestime donc le vrai nombre d'au plus `erreur` (et d'au plus
+    total / capacite dans tous les cas). Deux résumés se fusionnent
+    (Agarwal et al., "Mergeable Summaries").
+    """
+
+    def __init__(self, capacite=CAPACITE_TOP_DEFAUT):
+        if capacite < 1:
+            raise ValueError("La capacité doit être positive")
+        self.capacite = capacite
+        self.compteurs = {}
+        self.erreurs = {}
+        self.total = 0
+        # Tas (compteur, élément): un compteur du tas n'est jamais supérieur
+        # au compteur réel, il est mis à jour seulement quand on cherche le minimum
+        self.tas = []
+
+    def __len__(self):
+        return len(self.compteurs)
+
+    def minimum(self):
+        """Retourne le plus petit compteur suivi (0 si la table n'est pas pleine)."""
+        if len(self.compteurs) < self.capacite:
+            return 0
+        tas, compteurs = self.tas, self.compteurs
+        while True:
+            compteur, element = tas[0]
+            reel = compteurs[element]
+            if reel == compteur:
+                return compteur
+            heapq.heapreplace(tas, (reel, element))
+
+    def ajouter(self, element, nombre=1):
+        """Compte une (ou plusieurs) occurrence(s) d'un élément."""
+        self.total += nombre
+        compteurs = self.compteurs
+        if element in compteurs:
+            compteurs[element] += nombre
+        elif len(compteurs) < self.capacite:
+            compteurs[element] = nombre
+            self.erreurs[element] = 0
+            heapq.heappush(self.tas, (nombre, element))
+        else:
+            minimum = self.minimum()
+            _, remplace = heapq.heapreplace(self.tas, (minimum + nombre, element))
+            del compteurs[remplace]
+            del self.erreurs[remplace]
+            compteurs[element] = minimum + nombre
+            self.erreurs[element] = minimum
+
+    def fusionner(self, autre):
+        """
+        Fusionne un autre résumé dans celui-ci.
+
+        Un élément absent d'un résumé plein y a été vu au plus `minimum()`
+        fois: ce minimum est ajouté à son compteur et à son erreur.
+        """
+        min_self, min_autre = self.minimum(), autre.minimum()
+        fusion = []
+        for element in self.compteurs.keys() | autre.compteurs.keys():
+            fusion.append((
+                self.compteurs.get(element, min_self) + autre.compteurs.get(element, min_autre),
+                self.erreurs.get(element, min_self) + autre.erreurs.get(element, min_autre),
+                element,
+            ))
+        fusion = heapq.nlargest(self.capacite, fusion, key=lambda t: t[0])
+        self.compteurs = {element: compteur for compteur, _, element in fusion}
+        self.erreurs = {element: erreur for _, erreur, element in fusion}
+        self.tas = [(compteur, element) for compteur, _, element in fusion]
+        heapq.heapify(self.tas)
+        self.total += autre.total
+
+    def most_common(self, n):
+        """Retourne les n éléments les plus fréquents [(élément, compteur)], comme Counter."""
+        return [(element, self.compteurs[element]) for element, _ in self.top_avec_erreurs(n)]
+
+    def top_avec_erreurs(self, n):
+        """Retourne les n éléments les plus fréquents [(élément, erreur maximale)]."""
+        meilleurs = heapq.nlargest(n, self.compteurs.items(), key=lambda t: t[1])
+        return [(element, self.erreurs[element]) for element, _ in meilleurs]
+
+    def precision(self, n):
+        """
+        Retourne les bornes d'erreur du top n.
+
+        Returns:
+            dict: capacité, erreur maximale globale (total / capacité),
+                erreur maximale du top et nombre d'éléments du top dont
+                la place est garantie (compteur - erreur >= compteur suivant)
+        """
+        meilleurs = heapq.nlargest(n + 1, self.compteurs.items(), key=lambda t: t[1])
+        suivant = meilleurs[n][1] if len(meilleurs) > n else self.minimum()
+        top = meilleurs[:n]
+        return {
+            'capacite': self.capacite,
+            'suivis': len(self.compteurs),
+            'erreur_max': self.total // self.capacite if len(self.compteurs) >= self.capacite else 0,
+            'erreur_max_top': max((self.erreurs[e] for e, _ in top), default=0),
+            'garantis': sum(1 for e, c in top if c - self.erreurs[e] >= suivant),
+        }
+
+
+class HyperLogLog:
+    """
+    Estimation du nombre de valeurs distinctes en mémoire fixe (HyperLogLog).
+
+    Chaque valeur est hachée sur 64 bits (BLAKE2b, identique d'un processus
+    à l'autre); les `precision` premiers bits choisissent un registre, qui
+    garde le rang du premier bit à 1 parmi les bits restants. Deux
+    estimateurs de même précision se fusionnent en prenant le maximum
+    registre par registre.
+    """
+
+    def __init__(self, precision=PRECISION_HLL_DEFAUT):
+        if not 4 <= precision <= 18:
+            raise ValueError("La précision doit être comprise entre 4 et 18")
+        self.precision = precision
+        self.registres = bytearray(1 << precision)
+
+    def ajouter(self, valeur):
+        """Ajoute une valeur (str ou bytes)."""
+        if isinstance(valeur, str):
+            valeur = valeur.encode('utf-8', 'surrogateescape')
+        h = int.from_bytes(hashlib.blake2b(valeur, digest_size=8).digest(), 'big')
+        bits_restants = 64 - self.precision
+        indice = h >> bits_restants
+        rang = bits_restants - (h & ((1 << bits_restants) - 1)).bit_length() + 1
+        if rang > self.registres[indice]:
+            self.registres[indice] = rang
+
+    def fusionner(self, autre):
+        """Fusionne un autre estimateur (même précision) dans celui-ci."""
+        if autre.precision != self.precision:
+            raise ValueError("Impossible de fusionner des HyperLogLog de précisions différentes")
+        self.registres = bytearray(map(max, self.registres, autre.registres))
+
+    def estimation(self):
+        """Retourne le nombre estimé de valeurs distinctes."""
+        m = len(self.registres)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimation = alpha * m * m / sum(2.0 ** -r for r in self.registres)
+        vides = self.registres.count(0)
+        if estimation <= 2.5 * m and vides:
+            # Petites cardinalités: comptage linéaire des registres vides
+            estimation = m * math.log(m / vides)
+        return round(estimation)
+
+    def erreur_relative(self):
+        """Retourne l'erreur relative standard (1.04 / sqrt(nombre de registres))."""
+        return 1.04 / math.sqrt(len(self.registres))
+
+
+class EsquisseQuantiles:
+    """
+    Quantiles approchés en mémoire bornée (histogramme à classes logarithmiques).
+
+    Une valeur x > 0 tombe dans la classe ceil(log(x) / log(gamma)), avec
+    gamma = (1 + a) / (1 - a): le quantile renvoyé a une erreur relative
+    d'au plus `a` (principe de DDSketch). Au-delà de `nb_classes_max`
+    classes, les plus basses sont regroupées (seuls les petits quantiles
+    perdent en précision). Deux esquisses de même précision se fusionnent
+    en additionnant leurs classes.
+    """
+
+    def __init__(self, precision_relative=PRECISION_LATENCE, nb_classes_max=NB_CLASSES_LATENCE):
+        if not 0 < precision_relative < 1:
+            raise ValueError("La précision relative doit être comprise entre 0 et 1")
+        self.precision_relative = precision_relative
+        self.nb_classes_max = nb_classes_max
+        self.gamma = (1 + precision_relative) / (1 - precision_relative)
+        self.log_gamma = math.log(self.gamma)
+        self.classes = {}
+        self.zeros = 0
+        self.nombre = 0
+
+    def ajouter(self, valeur, nombre=1):
+        """Ajoute une valeur (positive ou nulle)."""
+        self.ajouter_classe(self.classe(valeur), nombre)
+
+    def classe(self, valeur):
+        """Retourne la classe d'une valeur (None pour une valeur nulle ou négative)."""
+        if valeur <= 0:
+            return None
+        return math.ceil(math.log(valeur) / self.log_gamma)
+
+    def ajouter_classe(self, classe, nombre=1):
+        """
+        Ajoute une valeur déjà rangée par `classe()` (même précision).
+
+        Permet de calculer la classe une seule fois (et de la mettre en
+        cache) pour une valeur ajoutée à plusieurs esquisses.
+        """
+        self.nombre += nombre
+        if classe is None:
+            self.zeros += nombre
+            return
+        classes = self.classes
+        classes[classe] = classes.get(classe, 0) + nombre
+        if len(classes) > self.nb_classes_max:
+            self.reduire()
+
+    def reduire(self):
+        """Regroupe les classes les plus basses pour revenir à `nb_classes_max`."""
+        cles = sorted(self.classes)
+        surplus = len(cles) - self.nb_classes_max
+        if surplus > 0:
+            regroupe = sum(self.classes.pop(cle) for cle in cles[:surplus])
+            self.classes[cles[surplus]] += regroupe
+
+    def fusionner(self, autre):
+        """Fusionne une autre esquisse (même précision) dans celle-ci."""
+        if autre.precision_relative != self.precision_relative:
+            raise ValueError("Impossible de fusionner des esquisses de précisions différentes")
+        for classe, nombre in autre.classes.items():
+            self.classes[classe] = self.classes.get(classe, 0) + nombre
+        self.zeros += autre.zeros
+        self.nombre += autre.nombre
+        self.reduire()
+
+    def quantile(self, q):
+        """
+        Retourne le quantile q (entre 0 et 1), ou None si l'esquisse est vide.
+        """
+        if self.nombre == 0:
+            return None
+        rang = q * (self.nombre - 1)
+        cumul = self.zeros
+        if rang < cumul:
+            return 0.0
+        for classe in sorted(self.classes):
+            cumul += self.classes[classe]
+            if rang < cumul:
+                # Milieu (relatif) de la classe ]gamma^(i-1), gamma^i]
+                return 2 * self.gamma ** classe / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.classes) / (self.gamma + 1)
+
+    def resume(self):
+        """Retourne le nombre de valeurs et les quantiles p50, p95 et p99."""
+        return {'nombre': self.nombre, 'p50': self.quantile(0.50),
+                'p95': self.quantile(0.95), 'p99': self.quantile(0.99)}
+
+
+class Reservoir:
+    """
+    Échantillon aléatoire uniforme de taille fixe d'un flux (algorithme L de Li).
+
+    Après les `taille` premiers éléments, chacun des n éléments vus a la
+    même probabilité taille / n d'être dans l'échantillon. Au lieu d'un
+    tirage par élément, le rang du prochain élément retenu est tiré à
+    l'avance: les éléments sautés ne coûtent qu'une comparaison. Deux
+    réservoirs se fusionnent en un échantillon uniforme de l'union.
+    """
+
+    def __init__(self, taille=NB_EXEMPLES_ERREURS, graine=None):
+        self.taille = taille
+        self.elements = []
+        self.vus = 0
+        self.generateur = random.Random(graine)
+        # Plus grande clé aléatoire retenue et rang du prochain élément retenu
+        self.poids = 1.0
+        self.prochain = None
+
+    def __len__(self):
+        return len(self.elements)
+
+    def uniforme(self):
+        """Tire un nombre dans ]0, 1[."""
+        while True:
+            u = self.generateur.random()
+            if u > 0:
+                return u
+
+    def tirer_prochain(self):
+        """Tire le rang du prochain élément qui entrera dans l'échantillon."""
+        saut = math.floor(math.log(self.uniforme()) / math.log(1 - self.poids))
+        self.prochain = self.vus + saut + 1
+
+    def ajouter(self, element):
+        """Présente un élément du flux au réservoir."""
+        self.vus += 1
+        if len(self.elements) < self.taille:
+            self.elements.append(element)
+            if len(self.elements) == self.taille:
+                self.poids = math.exp(math.log(self.uniforme()) / self.taille)
+                self.tirer_prochain()
+        elif self.vus == self.prochain:
+            self.elements[self.generateur.randrange(self.taille)] = element
+            self.poids *= math.exp(math.log(self.uniforme()) / self.taille)
+            self.tirer_prochain()
+
+    def fusionner(self, autre):
+        """
+        Fusionne un autre réservoir (même taille) dans celui-ci.
+
+        Chaque place est prise dans l'un ou l'autre réservoir avec une
+        probabilité proportionnelle au nombre d'éléments qu'il reste à y
+        représenter (loi hypergéométrique).
+        """
+        if autre.vus == 0:
+            return
+        gauche, droite = list(self.elements), list(autre.elements)
+        reste_gauche, reste_droite = self.vus, autre.vus
+        elements = []
+        while len(elements) < self.taille and (gauche or droite):
+            if gauche and (not droite or
+                           self.generateur.random() * (reste_gauche + reste_droite) < reste_gauche):
+                elements.append(gauche.pop(self.generateur.randrange(len(gauche))))
+                reste_gauche -= 1
+            else:
+                elements.append(droite.pop(self.generateur.randrange(len(droite))))
+                reste_droite -= 1
+        self.elements = elements
+        self.vus += autre.vus
+        if self.taille and len(elements) == self.taille:
+            # Plus grande des `taille` plus petites clés parmi `vus`: loi Bêta
+            self.poids = self.generateur.betavariate(self.taille, self.vus - self.taille + 1)
+            self.tirer_prochain()
+
+
+def deriver_graine(graine, *cles):
+    """
+    Dérive de `graine` une graine propre à `cles` (statut, tranche...).
+
+    Deux générateurs de même graine tirent les mêmes nombres: des
+    réservoirs par statut ou des tranches d'un pool de processus
+    retiendraient les mêmes rangs. La dérivation passe par SHA-256 (et
+    non `hash()`, salé par processus): elle reste reproductible.
+
+    Returns:
+        int: Graine dérivée, ou None si `graine` est None
+    """
+    if graine is None:
+        return None
+    empreinte = hashlib.sha256(repr((graine, *cles)).encode('utf-8')).digest()
+    return int.from_bytes(empreinte[:8], 'big')
+
+
+class EtatSession:
+    """Session en cours d'une IP et son anneau de compteurs de débit."""
+
+    __slots__ = ('debut', 'dernier', 'requetes', 'cases', 'case', 'debit')
+
+    def __init__(self, instant, nb_cases):
+        self.debut = self.dernier = instant
+        self.requetes = 0
+        # cases[c % nb_cases]: requêtes de la case c (la plus récente est `case`)
+        self.cases = array('I', bytes(4 * nb_cases))
+        self.case = 0
+        self.debit = 0
+
+
+class SessionsIP:
+    """
+    Sessions par IP et détection des IPs au débit anormal, en mémoire bornée.
+
+    Une session regroupe les requêtes d'une IP séparées de moins de
+    `delai` secondes. Seules les IPs actives ont un état, dans un
+    OrderedDict rangé de la moins à la plus récemment vue: les IPs
+    inactives depuis `delai` sont en tête et sont retirées (leur session
+    est close) dès que l'horloge des logs avance. Une session close ne
+    laisse que des résumés de taille fixe: esquisses de durée et de
+    nombre de requêtes, top des IPs par nombre de sessions (Space-Saving).
+
+    Le débit de chaque IP active est compté dans un anneau de `nb_cases`
+    cases couvrant `fenetre` secondes; une IP qui dépasse `seuil`
+    requêtes sur la fenêtre est signalée (au plus `max_anomalies` IPs
+    gardées en détail).
+    """
+
+    def __init__(self, delai=DELAI_SESSION, fenetre=FENETRE_DEBIT, seuil=SEUIL_DEBIT,
+                 nb_cases=NB_CASES_FENETRE, capacite_top=CAPACITE_TOP_DEFAUT,
+                 max_anomalies=MAX_ANOMALIES):
+        if delai <= 0 or fenetre <= 0 or nb_cases < 1:
+            raise ValueError("Le délai, la fenêtre et le nombre de cases doivent être positifs")
+        self.delai = delai
+        self.fenetre = fenetre
+        self.seuil = seuil
+        self.nb_cases = nb_cases
+        self.largeur_case = max(1, math.ceil(fenetre / nb_cases))
+        self.max_anomalies = max_anomalies
+        self.actives = OrderedDict()
+        self.actives_max = 0
+        self.maintenant = None
+        self.sessions = 0
+        self.durees = EsquisseQuantiles()
+        self.requetes = EsquisseQuantiles()
+        self.sessions_ip = SpaceSaving(capacite_top)
+        # IP -> {'debut': epoch du premier dépassement, 'pic': débit maximal, 'depassements': n}
+        self.anomalies = {}
+        self.anomalies_ignorees = 0
+
+    def __call__(self, ip, instant):
+        """Compte une requête de `ip` à l'instant `instant` (secondes epoch)."""
+        actives = self.actives
+        if self.maintenant is None or instant > self.maintenant:
+            self.maintenant = instant
+            self.expirer()
+        etat = actives.get(ip)
+        if etat is not None and instant - etat.dernier > self.delai:
+            self.fermer(ip, actives.pop(ip))
+            etat = None
+        if etat is None:
+            etat = actives[ip] = EtatSession(instant, self.nb_cases)
+            etat.case = instant // self.largeur_case
+            if len(actives) > self.actives_max:
+                self.actives_max = len(actives)
+        else:
+            actives.move_to_end(ip)
+            if instant > etat.dernier:
+                etat.dernier = instant
+            elif instant < etat.debut:
+                etat.debut = instant
+        etat.requetes += 1
+
+        # Anneau de débit: les cases sorties de la fenêtre sont remises à zéro
+        case = instant // self.largeur_case
+        ecart = case - etat.case
+        cases, nb_cases = etat.cases, self.nb_cases
+        if ecart > 0:
+            if ecart >= nb_cases:
+                for i in range(nb_cases):
+                    cases[i] = 0
+                etat.debit = 0
+            else:
+                for c in range(etat.case + 1, case + 1):
+                    etat.debit -= cases[c % nb_cases]
+                    cases[c % nb_cases] = 0
+            etat.case = case
+        elif ecart <= -nb_cases:
+            # Requête en retard, hors de la fenêtre courante
+            return
+        cases[case % nb_cases] += 1
+        etat.debit += 1
+        if etat.debit > self.seuil:
+            self.signaler(ip, instant, etat.debit)
+
+    def signaler(self, ip, instant, debit):
+        """Enregistre un dépassement du seuil de débit."""
+        anomalie = self.anomalies.get(ip)
+        if anomalie is None:
+            if len(self.anomalies) >= self.max_anomalies:
+                self.anomalies_ignorees += 1
+                return
+            anomalie = self.anomalies[ip] = {'debut': instant, 'pic': debit, 'depassements': 0}
+        anomalie['depassements'] += 1
+        if debit > anomalie['pic']:
+            anomalie['pic'] = debit
+
+    def expirer(self):
+        """Clôt les sessions des IPs inactives depuis plus de `delai` secondes."""
+        actives, limite = self.actives, self.maintenant - self.delai
+        while actives:
+            ip, etat = next(iter(actives.items()))
+            if etat.dernier >= limite:
+                break
+            del actives[ip]
+            self.fermer(ip, etat)
+
+    def fermer(self, ip, etat):
+        """Ajoute une session close aux résumés."""
+        self.sessions += 1
+        self.durees.ajouter(etat.dernier - etat.debut)
+        self.requetes.ajouter(etat.requetes)
+        self.sessions_ip.ajouter(ip)
+
+    def fusionner(self, autre):
+        """
+        Fusionne les sessions d'un morceau de logs situé après celui-ci.
+
+        Les sessions encore ouvertes de ce morceau sont closes; celles de
+        l'autre restent ouvertes. Une session à cheval sur les deux morceaux
+        compte donc pour deux.
+        """
+        for ip, etat in self.actives.items():
+            self.fermer(ip, etat)
+        self.actives = OrderedDict(autre.actives)
+        self.actives_max = max(self.actives_max, autre.actives_max)
+        if autre.maintenant is not None:
+            self.maintenant = max(self.maintenant or autre.maintenant, autre.maintenant)
+        self.sessions += autre.sessions
+        self.durees.fusionner(autre.durees)
+        self.requetes.fusionner(autre.requetes)
+        self.sessions_ip.fusionner(autre.sessions_ip)
+        for ip, anomalie in autre.anomalies.items():
+            if ip in self.anomalies:
+                actuelle = self.anomalies[ip]
+                actuelle['pic'] = max(actuelle['pic'], anomalie['pic'])
+                actuelle['depassements'] += anomalie['depassements']
+            elif len(self.anomalies) < self.max_anomalies:
+                self.anomalies[ip] = dict(anomalie)
+            else:
+                self.anomalies_ignorees += anomalie['depassements']
+        self.anomalies_ignorees += autre.anomalies_ignorees
+
+    def resume(self, texte=None, n=10):
+        """
+        Retourne les statistiques des sessions, sessions ouvertes comprises.
+
+        Args:
+            texte (callable): Conversion des IPs en octets (voir `AgregatsLogs.texte()`)
+            n (int): Nombre d'IPs des tops
+
+        Returns:
+            dict: Nombre de sessions, quantiles de durée (s) et de requêtes par
+                session, top des IPs par sessions, IPs au débit anormal
+        """
+        texte = texte or (lambda ip: ip)
+        durees, requetes = EsquisseQuantiles(), EsquisseQuantiles()
+        durees.fusionner(self.durees)
+        requetes.fusionner(self.requetes)
+        sessions_ip = Counter(dict(self.sessions_ip.compteurs))
+        for ip, etat in self.actives.items():
+            durees.ajouter(etat.dernier - etat.debut)
+            requetes.ajouter(etat.requetes)
+            sessions_ip[ip] += 1
+        anomalies = heapq.nlargest(n, self.anomalies.items(), key=lambda t: t[1]['pic'])
+        return {
+            'delai': self.delai,
+            'fenetre': self.fenetre,
+            'seuil': self.seuil,
+            'total': self.sessions + len(self.actives),
+            'ouvertes': len(self.actives),
+            'ouvertes_max': self.actives_max,
+            'duree': durees.resume(),
+            'requetes': requetes.resume(),
+            'top_ips': [(texte(ip), nombre) for ip, nombre in sessions_ip.most_common(n)],
+            'nb_anomalies': len(self.anomalies),
+            'anomalies_ignorees': self.anomalies_ignorees,
+            'anomalies': [dict(anomalie, ip=texte(ip)) for ip, anomalie in anomalies],
+        }
+
+
+class AgregatsLogs:
+    """
+    Agrégats (compteurs et exemples d'erreurs) d'un ensemble de lignes de logs.
+
+    Des agrégats partiels, calculés sur des morceaux de fichier ou dans
+    des processus différents, se combinent avec `fusionner()`;
+    `vers_stats()` produit le dictionnaire attendu par
+    `afficher_statistiques()` et `generer_rapport_markdown()`.
+    """
+
+    def __init__(self, capacite_top=None, precision_hll=None, nb_exemples=NB_EXEMPLES_ERREURS,
+                 par_statut=False, graine=None, normaliseur=None, sessions=None):
+        # capacite_top=None: compteurs exacts; sinon top approximatif en mémoire fixe
+        # precision_hll: estimation HyperLogLog des IPs, endpoints et user-agents distincts
+        self.capacite_top = capacite_top
+        self.precision_hll = precision_hll
+        self.user_agents = None
+        if precision_hll is None:
+            self.hll_ips = self.hll_endpoints = self.hll_user_agents = None
+            if capacite_top is None:
+                self.user_agents = set()
+        else:
+            self.hll_ips = HyperLogLog(precision_hll)
+            self.hll_endpoints = HyperLogLog(precision_hll)
+            self.hll_user_agents = HyperLogLog(precision_hll)
+        if capacite_top is None:
+            self.ips = Counter()
+            self.endpoints = Counter()
+            self.octets_endpoints = Counter()
+        else:
+            self.ips = SpaceSaving(capacite_top)
+            self.endpoints = SpaceSaving(capacite_top)
+            self.octets_endpoints = SpaceSaving(capacite_top)
+        self.octets_total = 0
+        # Latences (format avec durée): une esquisse globale et une par endpoint,
+        # au plus `capacite_top` endpoints (les suivants sont regroupés)
+        self.latence_globale = EsquisseQuantiles()
+        self.latences = {}
+        self.status_codes = Counter()
+        self.methodes = Counter()
+        self.series = SerieMinutes()
+        # Endpoints comptés par gabarit (NormaliseurEndpoints) ou tels quels (None)
+        self.normaliseur = normaliseur
+        # Sessions par IP et anomalies de débit (SessionsIP), ou None
+        self.sessions = sessions
+        # Exemples d'erreurs: un réservoir, ou un par code de statut (par_statut=True);
+        # le nombre exact d'erreurs par statut reste dans status_codes
+        self.nb_exemples = nb_exemples
+        self.par_statut = par_statut
+        self.graine = graine
+        self.exemples = {}
+        # Clés des compteurs en octets (analyser_octets), décodées à l'affichage
+        self.octets = False
+        self.total_lignes = 0
+        self.lignes_parsees = 0
+        # Lignes lues mais écartées par le filtre (précontrôle compris),
+        # absentes de total_lignes
+        self.lignes_filtrees = 0
+        self.total_erreurs = 0
+
+    def analyser(self, lignes, filtre=None):
+        """
+        Parse des lignes et met à jour les compteurs.
+
+        Args:
+            lignes (iterable): Lignes de logs (str)
+            filtre (callable): Reçoit chaque enregistrement parsé; les lignes
+                refusées sont comptées à part, dans `lignes_filtrees` (voir
+                `FiltreLogs`, dont les indices écartent des lignes avant même
+                le parsing: une ligne invalide sans indice y est comptée aussi)
+        """
+        if self.octets:
+            raise ValueError("Agrégats déjà alimentés par analyser_octets()")
+        self.agreger(self.enregistrements_texte(lignes, filtre))
+
+    def enregistrements_texte(self, lignes, filtre):
+        """Parse des lignes de texte; compte les lignes lues (voir `analyser()`)."""
+        parser = parser_ligne_rapide
+        # Filtre poussé avant le parsing: indices cherchés dans la ligne brute
+        precontrole = filtre.precontrole if getattr(filtre, 'indices', None) else None
+        total_lignes = filtrees = 0
+        for ligne in lignes:
+            if precontrole is not None and not precontrole(ligne):
+                filtrees += 1
+                continue
+            total_lignes += 1
+            enregistrement = parser(ligne.strip())
+            if enregistrement is None:
+                continue
+            if filtre is not None and not filtre(enregistrement):
+                total_lignes -= 1
+                filtrees += 1
+                continue
+            yield enregistrement
+        self.total_lignes += total_lignes
+        self.lignes_filtrees += filtrees
+
+    def analyser_octets(self, tampon, debut=0, fin=None, filtre=None):
+        """
+        Parse un tampon d'octets (mmap, bytes) sans décoder les lignes.
+
+        `MOTIF_LOG_OCTETS` parcourt tout le tampon, une ligne par
+        correspondance: pas de découpage en lignes ni de décodage UTF-8.
+        Les compteurs sont indexés par les octets des champs; seules les
+        valeurs affichées sont décodées, par `vers_stats()`. Mêmes comptes
+        que `analyser()` sur les mêmes lignes.
+
+        Avec un filtre ayant des indices, le tampon est parcouru de ligne
+        candidate en ligne candidate (voir `lignes_candidates()`): les
+        lignes sans indice ne passent pas par la regex du parsing.
+
+        Args:
+            tampon: Octets des lignes de logs (mmap, bytes)
+            debut (int): Position du premier octet (début de ligne)
+            fin (int): Position de fin (exclue, None: fin du tampon)
+            filtre (FiltreLogs): Critères, comme pour `analyser()` (None: tout)
+        """
+        if self.total_lignes and not self.octets:
+            raise ValueError("Agrégats déjà alimentés par analyser()")
+        self.octets = True
+        fin = len(tampon) if fin is None else fin
+        self.agreger(self.enregistrements_octets(tampon, debut, fin, filtre))
+
+    def enregistrements_octets(self, tampon, debut, fin, filtre):
+        """
+        Décode les correspondances de `MOTIF_LOG_OCTETS` en tuples aux champs
+        de `EnregistrementLog` (en octets, statut, taille et durée convertis);
+        compte les lignes lues (voir `analyser_octets()`).
+        """
+        precontrole = None
+        correspondances = None
+        if filtre is not None:
+            filtre = filtre.en_octets()
+            if filtre.indices:
+                precontrole = filtre.precontrole
+                # Les lignes candidates sont celles qui ont l'indice du premier critère
+                correspondances = lignes_candidates(tampon, debut, fin, filtre.indices[0])
+        if correspondances is None:
+            correspondances = MOTIF_LOG_OCTETS.finditer(tampon, debut, fin)
+        total_lignes = 0
+        for match in correspondances:
+            total_lignes += 1
+            ip, date, methode, endpoint, status, taille, referer, user_agent, duree = match.groups()
+            if ip is None:
+                # Ligne invalide comptée, comme dans analyser(), si elle a tous les indices
+                if precontrole is not None and not precontrole(match.group()):
+                    total_lignes -= 1
+                continue
+            if taille is not None:
+                taille = 0 if taille == b'-' else int(taille)
+            if duree is not None:
+                duree = float(duree)
+            # Tuple simple: un tuple nommé par ligne coûterait cher dans ce chemin rapide
+            enregistrement = (ip, date, methode, endpoint, int(status), taille,
+                              referer, user_agent, duree)
+            if filtre is not None and not filtre(EnregistrementLog._make(enregistrement)):
+                total_lignes -= 1
+                continue
+            yield enregistrement
+        self.total_lignes += total_lignes
+        if filtre is not None:
+            # Les lignes sautées par lignes_candidates() ne sont pas parcourues
+            self.lignes_filtrees += compter_lignes(tampon, debut, fin) - total_lignes
+
+    def agreger(self, enregistrements):
+        """
+        Met à jour les compteurs avec des enregistrements parsés.
+
+        Boucle commune à `analyser()` et `analyser_octets()`: les champs
+        sont en texte ou en octets (self.octets), les lignes lues sont
+        comptées par le générateur d'enregistrements.
+
+        Args:
+            enregistrements (iterable): Enregistrements retenus (EnregistrementLog
+                ou tuples de mêmes champs)
+        """
+        # Références locales: moins de recherches d'attributs dans la boucle
+        ips, endpoints = self.ips, self.endpoints
+        status_codes, methodes = self.status_codes, self.methodes
+        exemples = self.exemples
+        par_statut = self.par_statut
+        series = self.series
+        requetes_minute, erreurs_minute, erreurs_5xx_minute = (
+            series.requetes, series.erreurs, series.erreurs_5xx)
+        # Les lignes consécutives partagent souvent la même seconde:
+        # la dernière date (et sa minute) convertie est mémorisée
+        derniere_date = derniere_minute = dernier_fuseau = None
+        minute = epoch = None
+        exact = self.capacite_top is None
+        avec_hll = self.precision_hll is not None
+        if avec_hll:
+            hll_ips, hll_endpoints = self.hll_ips.ajouter, self.hll_endpoints.ajouter
+            # Ajouter deux fois la même valeur ne change pas les registres:
+            # les user-agents déjà vus (peu nombreux) ne sont pas rehachés
+            hll_user_agents = lru_cache(maxsize=TAILLE_CACHE_COMBINE)(
+                self.hll_user_agents.ajouter)
+        user_agents = self.user_agents
+        octets_endpoints = self.octets_endpoints
+        # Latences comptées par (endpoint, classe) puis ajoutées aux esquisses
+        # en fin de lot: une incrémentation par ligne au lieu de deux esquisses
+        latences_lot = Counter()
+        classe_duree = lru_cache(maxsize=TAILLE_CACHE_COMBINE)(self.latence_globale.classe)
+        normaliser = None
+        if self.normaliseur is not None and self.octets:
+            gabarit = self.normaliseur.normaliser
+
+            @lru_cache(maxsize=self.normaliseur.taille_cache)
+            def normaliser(endpoint):
+                return gabarit(endpoint.decode('utf-8', 'surrogateescape')).encode(
+                    'utf-8', 'surrogateescape')
+        elif self.normaliseur is not None:
+            normaliser = self.normaliseur.normaliser
+        sessions = self.sessions
+        debut_minute = instant = None
+        lignes_parsees = total_erreurs = octets_total = 0
+
+        for enregistrement in enregistrements:
+            lignes_parsees += 1
+            ip, date, methode, endpoint, status, taille, _, user_agent, duree = enregistrement
+            if normaliser is not None:
+                endpoint = normaliser(endpoint)
+            if exact:
+                ips[ip] += 1
+                endpoints[endpoint] += 1
+            else:
+                ips.ajouter(ip)
+                endpoints.ajouter(endpoint)
+            if avec_hll:
+                hll_ips(ip)
+                hll_endpoints(endpoint)
+            status_codes[status] += 1
+            methodes[methode] += 1
+
+            # Champs du format combiné (None en format commun)
+            if taille:
+                octets_total += taille
+                if exact:
+                    octets_endpoints[endpoint] += taille
+                else:
+                    octets_endpoints.ajouter(endpoint, taille)
+            if user_agent is not None:
+                if avec_hll:
+                    hll_user_agents(user_agent)
+                elif user_agents is not None:
+                    user_agents.add(user_agent)
+            if duree is not None:
+                latences_lot[endpoint, classe_duree(duree)] += 1
+
+            if date != derniere_date:
+                derniere_date = date
+                # Seules les secondes changent: même minute, pas de conversion
+                if derniere_date[:17] != derniere_minute or derniere_date[20:] != dernier_fuseau:
+                    derniere_minute, dernier_fuseau = derniere_date[:17], derniere_date[20:]
+                    epoch = date_vers_epoch(derniere_date if isinstance(derniere_date, str)
+                                            else derniere_date.decode('ascii', 'replace'))
+                    minute = None if epoch is None else series.indice(epoch)
+                    debut_minute = None if epoch is None else epoch - int(derniere_date[18:20])
+                if sessions is not None:
+                    secondes = derniere_date[18:20]
+                    instant = (debut_minute + int(secondes)
+                               if debut_minute is not None and secondes.isdigit() else None)
+            if minute is not None:
+                requetes_minute[minute] += 1
+            elif epoch is not None:
+                # Date lisible mais hors de la série (rare: attribut acceptable)
+                series.hors_portee += 1
+            if instant is not None:
+                sessions(ip, instant)
+
+            # Détecter les erreurs (4xx et 5xx)
+            if status >= 400:
+                total_erreurs += 1
+                if minute is not None:
+                    erreurs_minute[minute] += 1
+                    if status >= 500:
+                        erreurs_5xx_minute[minute] += 1
+                cle = status if par_statut else None
+                reservoir = exemples.get(cle)
+                if reservoir is None:
+                    reservoir = exemples[cle] = Reservoir(self.nb_exemples,
+                                                          deriver_graine(self.graine, cle))
+                # En octets, l'enregistrement n'est décodé que s'il est affiché
+                reservoir.ajouter(enregistrement)
+
+        self.lignes_parsees += lignes_parsees
+        self.total_erreurs += total_erreurs
+        self.octets_total += octets_total
+        # Toutes les esquisses ont la même précision: la classe calculée vaut
+        # pour chacune (ordre d'insertion: premières apparitions des endpoints)
+        for (endpoint, classe), nombre in latences_lot.items():
+            self.latence_globale.ajouter_classe(classe, nombre)
+            self.esquisse_endpoint(endpoint).ajouter_classe(classe, nombre)
+
+    def texte(self, valeur):
+        """Décode une clé des compteurs si elle est en octets (voir `analyser_octets()`)."""
+        return valeur.decode('utf-8', 'replace') if isinstance(valeur, bytes) else valeur
+
+    def esquisse_endpoint(self, endpoint):
+        """Retourne (en la créant si besoin) l'esquisse de latence d'un endpoint."""
+        esquisse = self.latences.get(endpoint)
+        if esquisse is None:
+            if self.capacite_top is not None and len(self.latences) >= self.capacite_top:
+                endpoint = AUTRES_ENDPOINTS.encode() if self.octets else AUTRES_ENDPOINTS
+                esquisse = self.latences.get(endpoint)
+            if esquisse is None:
+                esquisse = self.latences[endpoint] = EsquisseQuantiles()
+        return esquisse
+
+    def exemples_erreurs(self):
+        """
+        Retourne les erreurs échantillonnées, par statut puis par date.
+
+        Returns:
+            list: Enregistrements (EnregistrementLog)
+        """
+        exemples = []
+        for cle in sorted(self.exemples, key=lambda c: -1 if c is None else c):
+            elements = self.exemples[cle].elements
+            if self.octets:
+                # Tuples aux champs en octets (voir `enregistrements_octets()`)
+                elements = [EnregistrementLog._make(map(self.texte, e)) for e in elements]
+            exemples.extend(sorted(elements, key=lambda e: date_vers_epoch(e.date) or 0))
+        return exemples
+
+    def fusionner(self, autre):
+        """
+        Ajoute les agrégats d'un autre morceau (situé après celui-ci dans le fichier).
+
+        Args:
+            autre (AgregatsLogs): Agrégats partiels à fusionner
+        """
+        if self.total_lignes and autre.total_lignes and self.octets != autre.octets:
+            raise ValueError("Impossible de fusionner des agrégats de texte et d'octets")
+        self.octets = self.octets or autre.octets
+        if self.capacite_top is None:
+            self.ips.update(autre.ips)
+            self.endpoints.update(autre.endpoints)
+            self.octets_endpoints.update(autre.octets_endpoints)
+        else:
+            self.ips.fusionner(autre.ips)
+            self.endpoints.fusionner(autre.endpoints)
+            self.octets_endpoints.fusionner(autre.octets_endpoints)
+        if self.precision_hll is not None:
+            self.hll_ips.fusionner(autre.hll_ips)
+            self.hll_endpoints.fusionner(autre.hll_endpoints)
+            self.hll_user_agents.fusionner(autre.hll_user_agents)
+        elif self.user_agents is not None:
+            self.user_agents.update(autre.user_agents)
+        self.octets_total += autre.octets_total
+        self.latence_globale.fusionner(autre.latence_globale)
+        for endpoint, esquisse in autre.latences.items():
+            self.esquisse_endpoint(endpoint).fusionner(esquisse)
+        self.status_codes.update(autre.status_codes)
+        self.methodes.update(autre.methodes)
+        self.series.fusionner(autre.series)
+        if autre.sessions is not None:
+            if self.sessions is None:
+                self.sessions = autre.sessions
+            else:
+                self.sessions.fusionner(autre.sessions)
+        for cle, reservoir in autre.exemples.items():
+            if cle in self.exemples:
+                self.exemples[cle].fusionner(reservoir)
+            else:
+                self.exemples[cle] = reservoir
+        self.total_lignes += autre.total_lignes
+        self.lignes_parsees += autre.lignes_parsees
+        self.lignes_filtrees += autre.lignes_filtrees
+        self.total_erreurs += autre.total_erreurs
+
+    def vers_stats(self):
+        """
+        Retourne les statistiques finales.
+
+        Returns:
+            dict: Dictionnaire contenant les statistiques
+        """
+        texte = self.texte
+        top_endpoints = self.endpoints.most_common(5)
+        stats = {
+            'total_lignes': self.total_lignes,
+            'lignes_parsees': self.lignes_parsees,
+            'lignes_ignorees': self.total_lignes - self.lignes_parsees,
+            'lignes_filtrees': self.lignes_filtrees,
+            'top_ips': [(texte(ip), n) for ip, n in self.ips.most_common(10)],
+            'top_endpoints': [(texte(endpoint), n) for endpoint, n in top_endpoints],
+            'status_distribution': dict(self.status_codes),
+            'methodes_distribution': {texte(methode): n for methode, n in self.methodes.items()},
+            'par_minute': self.series.vers_dict(),
+            'octets_total': self.octets_total,
+            'top_bande_passante': [(texte(endpoint), n)
+                                   for endpoint, n in self.octets_endpoints.most_common(5)],
+            'total_erreurs': self.total_erreurs,
+            'erreurs': [
+                {'ip': e.ip, 'endpoint': e.endpoint, 'status': e.status, 'date': e.date}
+                for e in self.exemples_erreurs()
+            ],
+            'erreurs_par_statut': {status: n for status, n in sorted(self.status_codes.items())
+                                   if status >= 400},
+            'echantillon_erreurs': {'taille': self.nb_exemples, 'par_statut': self.par_statut},
+        }
+        if self.precision_hll is not None:
+            stats['distincts'] = {
+                'methode': 'hyperloglog',
+                'ips': self.hll_ips.estimation(),
+                'endpoints': self.hll_endpoints.estimation(),
+                'user_agents': self.hll_user_agents.estimation(),
+                'erreur_relative': self.hll_ips.erreur_relative(),
+            }
+        elif self.capacite_top is None:
+            stats['distincts'] = {
+                'methode': 'exact',
+                'ips': len(self.ips),
+                'endpoints': len(self.endpoints),
+                'user_agents': len(self.user_agents),
+                'erreur_relative': 0.0,
+            }
+        if self.normaliseur is not None:
+            stats['normalisation'] = [nom for nom, _ in self.normaliseur.regles]
+        if self.sessions is not None:
+            stats['sessions'] = self.sessions.resume(self.texte)
+        if self.latence_globale.nombre:
+            stats['latences'] = {
+                'globale': self.latence_globale.resume(),
+                'endpoints': [(texte(endpoint), self.latences[endpoint].resume())
+                              for endpoint, _ in top_endpoints if endpoint in self.latences],
+            }
+        if self.capacite_top is not None:
+            stats['precision_top'] = {
+                'ips': self.ips.precision(10),
+                'endpoints': self.endpoints.precision(5),
+            }
+        return stats
+
+
+def analyser_logs(lignes, capacite_top=None, precision_hll=None, **options):
+    """
+    Analyse les lignes de logs et extrait des statistiques.
+
+    Les lignes sont consommées une à une (liste ou générateur comme
+    `lire_logs()`): seuls les compteurs restent en mémoire. Aucun
+    dictionnaire n'est créé par ligne; les exemples d'erreurs sont un
+    échantillon aléatoire de taille fixe.
+    
+    Args:
+        lignes (iterable): Lignes de logs
+        capacite_top (int): Nombre de compteurs du top approximatif des IPs
+            et endpoints (None: compteurs exacts)
+        precision_hll (int): Précision HyperLogLog pour estimer le nombre
+            d'IPs et d'endpoints distincts (None: comptage exact si possible)
+        **options: Autres paramètres de `AgregatsLogs` (nb_exemples,
+            par_statut, graine)
+    
+    Returns:
+        dict: Dictionnaire contenant les statistiques
+    """
+    agregats = AgregatsLogs(capacite_top, precision_hll, **options)
+    agregats.analyser(lignes)
+    return agregats.vers_stats()
+
+
+def decouper_fichier(nom_fichier, nb_parts):
+    """
+    Découpe un fichier en tranches d'octets qui commencent en début de ligne.
+
+    Args:
+        nom_fichier (str): Chemin du fichier
+        nb_parts (int): Nombre de tranches souhaitées
+
+    Returns:
+        list: Liste de couples (début, fin) en octets, sans tranche vide
+    """
+    taille = os.path.getsize(nom_fichier)
+    bornes = [0]
+    with open(nom_fichier, 'rb') as fichier:
+        for i in range(1, nb_parts):
+            fichier.seek(max(taille * i // nb_parts, bornes[-1]))
+            if fichier.tell() > 0:
+                # Avancer jusqu'au début de la ligne suivante
+                fichier.seek(fichier.tell() - 1)
+                fichier.readline()
+            bornes.append(min(fichier.tell(), taille))
+    bornes.append(taille)
+    return [(debut, fin) for debut, fin in zip(bornes, bornes[1:]) if fin > debut]
+
+
+def lire_segment(nom_fichier, debut, fin, taille_tampon=TAILLE_TAMPON_LECTURE):
+    """
+    Lit les lignes d'une tranche d'octets (qui commence en début de ligne).
+
+    Yields:
+        str: Lignes de la tranche
+    """
+    with open(nom_fichier, 'rb', buffering=taille_tampon) as fichier:
+        fichier.seek(debut)
+        position = debut
+        for ligne in fichier:
+            if position >= fin:
+                break
+            position += len(ligne)
+            yield ligne.decode('utf-8', errors='replace')
+
+
+def lire_blocs(nom_fichier, taille_bloc=TAILLE_TAMPON_LECTURE):
+    """
+    Lit un fichier (décompressé s'il y a lieu) par blocs d'octets de lignes complètes.
+
+    Yields:
+        bytes: Blocs d'environ `taille_bloc` octets finissant par un saut
+            de ligne (sauf le dernier si le fichier n'en a pas)
+    """
+    ouvrir = gzip.open if est_gzip(nom_fichier) else open
+    with ouvrir(nom_fichier, 'rb') as fichier:
+        reste = b''
+        while True:
+            donnees = fichier.read(taille_bloc)
+            if not donnees:
+                break
+            coupure = donnees.rfind(b'\n') + 1
+            if coupure == 0:
+                reste += donnees
+                continue
+            yield reste + donnees[:coupure]
+            reste = donnees[coupure:]
+        if reste:
+            yield reste
+
+
+def compter_lignes(tampon, debut, fin, taille_bloc=TAILLE_TAMPON_LECTURE):
+    """
+    Compte les lignes d'un tampon d'octets entre `debut` et `fin`.
+
+    Le comptage se fait par tranches de `taille_bloc` octets (mmap n'a
+    pas de `count()`); une dernière ligne sans saut de ligne compte.
+    """
+    lignes = sum(tampon[position:min(position + taille_bloc, fin)].count(b'\n')
+                 for position in range(debut, fin, taille_bloc))
+    if fin > debut and tampon[fin - 1:fin] != b'\n':
+        lignes += 1
+    return lignes
+
+
+def lignes_candidates(tampon, debut, fin, variantes):
+    """
+    Parcourt les lignes d'un tampon d'octets qui contiennent l'une des variantes.
+
+    La variante est cherchée en C (`find()`, ou une regex s'il y en a
+    plusieurs) à travers les lignes sautées; seule la ligne qui la
+    contient est parsée par `MOTIF_LOG_OCTETS`.
+
+    Args:
+        tampon: Octets des lignes de logs (mmap, bytes)
+        debut (int): Position du premier octet (début de ligne)
+        fin (int): Position de fin (exclue)
+        variantes (tuple): Indices en octets d'un critère (voir `FiltreLogs.indices`)
+
+    Yields:
+        re.Match: Correspondance de `MOTIF_LOG_OCTETS` sur chaque ligne candidate
+    """
+    if not variantes:
+        # Critère impossible (aucun statut ou préfixe commun): aucune ligne
+        return
+    if len(variantes) == 1:
+        indice = variantes[0]
+
+        def chercher(position):
+            return tampon.find(indice, position, fin)
+    else:
+        motif = re.compile(b'|'.join(map(re.escape, variantes)))
+
+        def chercher(position):
+            trouve = motif.search(tampon, position, fin)
+            return -1 if trouve is None else trouve.start()
+
+    position = debut
+    while position < fin:
+        trouve = chercher(position)
+        if trouve == -1:
+            return
+        # Début de la ligne de l'indice (les indices ne contiennent pas de '\n')
+        match = MOTIF_LOG_OCTETS.match(tampon, tampon.rfind(b'\n', position, trouve) + 1 or position, fin)
+        yield match
+        position = match.end()
+
+
+def analyser_fichier_octets(agregats, nom_fichier, debut=0, fin=None, filtre=None):
+    """
+    Analyse un fichier ou une tranche par `AgregatsLogs.analyser_octets()`.
+
+    Un fichier texte est projeté en mémoire (mmap): la regex parcourt
+    directement les pages du fichier, sans copie, par fenêtres de
+    `TAILLE_FENETRE_MMAP` octets alignées sur les lignes; les pages d'une
+    fenêtre analysée sont libérées (la mémoire résidente reste bornée).
+    Un fichier gzip est décompressé par blocs.
+
+    Args:
+        agregats (AgregatsLogs): Agrégats mis à jour en place
+        nom_fichier (str): Chemin du fichier de logs
+        debut (int): Début de la tranche (octets, début de ligne)
+        fin (int): Fin de la tranche (None: fin du fichier)
+        filtre (FiltreLogs): Critères (None: toutes les lignes)
+    """
+    if est_gzip(nom_fichier):
+        for bloc in lire_blocs(nom_fichier):
+            agregats.analyser_octets(bloc, filtre=filtre)
+        return
+    with open(nom_fichier, 'rb') as fichier:
+        if os.fstat(fichier.fileno()).st_size == 0:
+            # mmap refuse les fichiers vides
+            return
+        with mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as tampon:
+            liberer = hasattr(tampon, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+            if liberer:
+                tampon.madvise(mmap.MADV_SEQUENTIAL)
+            fin = len(tampon) if fin is None else fin
+            while debut < fin:
+                coupure = tampon.find(b'\n', min(debut + TAILLE_FENETRE_MMAP, fin) - 1, fin)
+                coupure = fin if coupure == -1 else coupure + 1
+                agregats.analyser_octets(tampon, debut, coupure, filtre)
+                if liberer:
+                    page = debut - debut % mmap.PAGESIZE
+                    tampon.madvise(mmap.MADV_DONTNEED, page, coupure - page)
+                debut = coupure
+
+
+def analyser_segment(nom_fichier, debut, fin, capacite_top=None, precision_hll=None, filtre=None,
+                     graine=None, octets=False, **options):
+    """
+    Analyse une tranche de fichier (exécuté dans un processus du pool).
+
+    Avec `fin=None`, tout le fichier est lu (et décompressé s'il y a lieu).
+    Avec `octets=True`, la tranche est parsée sans décodage
+    (voir `analyser_fichier_octets()`). `graine` est propre à la tranche
+    (voir `deriver_graine()`).
+
+    Returns:
+        AgregatsLogs: Agrégats partiels de la tranche
+    """
+    agregats = AgregatsLogs(capacite_top, precision_hll, graine=graine, **options)
+    if octets:
+        analyser_fichier_octets(agregats, nom_fichier, debut, fin, filtre)
+    elif fin is None:
+        agregats.analyser(lire_logs(nom_fichier), filtre)
+    else:
+        agregats.analyser(lire_segment(nom_fichier, debut, fin), filtre)
+    return agregats
+
+
+def preparer_taches(fichiers, workers):
+    """
+    Répartit des fichiers en tâches d'analyse pour `workers` processus.
+
+    Un fichier compressé est une seule tâche (un flux gzip ne se découpe
+    pas); un fichier texte est découpé en tranches alignées sur les
+    lignes, en proportion de sa part de la taille totale.
+
+    Returns:
+        list: Triplets (fichier, début, fin), avec fin=None pour un fichier entier
+    """
+    tailles = [os.path.getsize(f) for f in fichiers]
+    taille_totale = sum(tailles) or 1
+    taches = []
+    for fichier, taille in zip(fichiers, tailles):
+        nb_parts = max(1, round(workers * taille / taille_totale))
+        if nb_parts == 1 or est_gzip(fichier):
+            taches.append((fichier, 0, None))
+        else:
+            taches.extend((fichier, debut, fin) for debut, fin in decouper_fichier(fichier, nb_parts))
+    return taches
+
+
+def analyser_fichiers(fichiers, workers=1, capacite_top=None, precision_hll=None, filtre=None,
+                      octets=False, **options):
+    """
+    Analyse plusieurs fichiers de logs (texte ou gzip) sur plusieurs processus.
+
+    Chaque processus décompresse et parse ses propres fichiers ou
+    tranches; les agrégats partiels sont fusionnés dans l'ordre des
+    fichiers en un seul rapport.
+
+    Args:
+        fichiers (list): Chemins des fichiers, du plus ancien au plus récent
+        workers (int): Nombre de processus
+        capacite_top (int): Voir `analyser_logs()`
+        precision_hll (int): Voir `analyser_logs()`
+        filtre (FiltreLogs): Critères appliqués à chaque ligne (None: toutes)
+        octets (bool): Parser les octets des fichiers, sans décodage
+            (mmap, voir `analyser_fichier_octets()`; filtre FiltreLogs seulement)
+        **options: Voir `analyser_logs()`
+
+    Returns:
+        dict: Même dictionnaire que `analyser_logs()`
+    """
+    if octets and filtre is not None and not isinstance(filtre, FiltreLogs):
+        raise ValueError("Le parsing des octets ne prend qu'un filtre FiltreLogs")
+    agregats = AgregatsLogs(capacite_top, precision_hll, **options)
+    if workers <= 1:
+        for fichier in fichiers:
+            if octets:
+                analyser_fichier_octets(agregats, fichier, filtre=filtre)
+            else:
+                agregats.analyser(lire_logs(fichier), filtre)
+        return agregats.vers_stats()
+
+    taches = preparer_taches(fichiers, workers)
+    options = dict(options)
+    graine = options.pop('graine', None)
+    with ProcessPoolExecutor(max_workers=workers) as executeur:
+        partiels = executeur.map(
+            partial(analyser_segment, octets=octets, **options),
+            [fichier for fichier, _, _ in taches],
+            [debut for _, debut, _ in taches],
+            [fin for _, _, fin in taches],
+            [capacite_top] * len(taches),
+            [precision_hll] * len(taches),
+            [filtre] * len(taches),
+            # Une graine par tranche: sinon chacune tirerait les mêmes rangs
+            [deriver_graine(graine, 'tranche', numero) for numero in range(len(taches))],
+        )
+        for partiel in partiels:
+            agregats.fusionner(partiel)
+    return agregats.vers_stats()
+
+
+def analyser_logs_parallele(nom_fichier, workers, capacite_top=None, precision_hll=None, **options):
+    """
+    Analyse un fichier de logs sur plusieurs processus.
+
+    Le fichier est découpé en tranches alignées sur les lignes; chaque
+    processus calcule les agrégats de sa tranche, puis ceux-ci sont
+    fusionnés dans l'ordre du fichier (voir `analyser_fichiers()`).
+
+    Args:
+        nom_fichier (str): Chemin du fichier de logs
+        workers (int): Nombre de processus
+        capacite_top (int): Voir `analyser_logs()`
+        precision_hll (int): Voir `analyser_logs()`
+        **options: Voir `analyser_logs()`
+
+    Returns:
+        dict: Même dictionnaire que `analyser_logs()`
+    """
+    return analyser_fichiers([nom_fichier], workers, capacite_top, precision_hll, **options)
+
+
+class FiltreLogs:
+    """
+    Critères d'une requête sur les logs: intervalle de temps, statuts,
+    méthodes, préfixes d'endpoint et d'IP.
+
+    Une instance s'appelle sur un enregistrement (filtre de
+    `AgregatsLogs.analyser()`) et sait dire si un bloc de l'index peut
+    contenir des lignes retenues (`bloc_compatible()`).
+
+    Les critères sont aussi traduits en indices: des sous-chaînes dont
+    l'une au moins (par critère) figure dans toute ligne retenue, comme
+    '" 5' pour les statuts 5xx ou ' /api' pour le préfixe /api.
+    `precontrole()` les cherche dans la ligne brute: une ligne sans
+    indice est écartée sans être parsée.
+    """
+
+    def __init__(self, debut=None, fin=None, statuts=None, methodes=None,
+                 prefixes=None, prefixes_ip=None):
+        # debut/fin: secondes epoch, intervalle [debut, fin[
+        self.debut = debut
+        self.fin = fin
+        self.statuts = None if statuts is None else set(statuts)
+        self.methodes = None if methodes is None else set(methodes)
+        # Préfixes acceptés (l'un d'eux suffit) de l'endpoint et de l'IP
+        self.prefixes = None if prefixes is None else tuple(prefixes)
+        self.prefixes_ip = None if prefixes_ip is None else tuple(prefixes_ip)
+        self.indices = self.calculer_indices()
+        self.derniere_date = None
+        self.dernier_epoch = None
+
+    def calculer_indices(self):
+        """
+        Retourne les indices des critères: un tuple de variantes par critère.
+
+        Les critères sont rangés du plus au moins sélectif en général
+        (statut, endpoint, méthode, IP): le premier est cherché en premier.
+        Un critère dont les variantes couvriraient presque toutes les
+        lignes (statuts de plus de trois centaines) n'a pas d'indice.
+        """
+        indices = []
+        if self.statuts is not None:
+            if len(self.statuts) <= MAX_INDICES_FILTRE:
+                variantes = {f'" {status}' for status in self.statuts}
+            else:
+                variantes = {f'" {str(status)[0]}' for status in self.statuts}
+            if len(variantes) <= MAX_INDICES_FILTRE:
+                indices.append(tuple(sorted(variantes)))
+        if self.prefixes is not None:
+            indices.append(tuple(' ' + prefixe for prefixe in self.prefixes))
+        if self.methodes is not None:
+            indices.append(tuple(sorted(f'"{methode} ' for methode in self.methodes)))
+        if self.prefixes_ip is not None:
+            indices.append(self.prefixes_ip)
+        return tuple(indices)
+
+    def precontrole(self, ligne):
+        """
+        Indique si une ligne brute peut être retenue, sans la parser.
+
+        Faux seulement si la ligne ne peut pas satisfaire les critères;
+        vrai ne dispense pas d'appeler le filtre sur l'enregistrement.
+
+        Args:
+            ligne (str | bytes): Ligne telle que lue (octets pour `en_octets()`)
+        """
+        for variantes in self.indices:
+            for indice in variantes:
+                if indice in ligne:
+                    break
+            else:
+                return False
+        return True
+
+    def en_octets(self):
+        """
+        Retourne le même filtre pour des enregistrements et lignes en octets
+        (voir `AgregatsLogs.analyser_octets()`).
+        """
+        def encoder(valeurs):
+            return None if valeurs is None else [valeur.encode('utf-8') for valeur in valeurs]
+
+        filtre = FiltreLogs(self.debut, self.fin, self.statuts)
+        filtre.methodes = None if self.methodes is None else set(encoder(self.methodes))
+        filtre.prefixes = None if self.prefixes is None else tuple(encoder(self.prefixes))
+        filtre.prefixes_ip = None if self.prefixes_ip is None else tuple(encoder(self.prefixes_ip))
+        filtre.indices = tuple(tuple(encoder(variantes)) for variantes in self.indices)
+        return filtre
+
+    def __call__(self, enregistrement):
+        if self.statuts is not None and enregistrement.status not in self.statuts:
+            return False
+        if self.methodes is not None and enregistrement.method not in self.methodes:
+            return False
+        if self.prefixes is not None and not enregistrement.endpoint.startswith(self.prefixes):
+            return False
+        if self.prefixes_ip is not None and not enregistrement.ip.startswith(self.prefixes_ip):
+            return False
+        if self.debut is None and self.fin is None:
+            return True
+        if enregistrement.date != self.derniere_date:
+            date = self.derniere_date = enregistrement.date
+            if isinstance(date, bytes):
+                date = date.decode('ascii', 'replace')
+            self.dernier_epoch = date_vers_epoch(date)
+        epoch = self.dernier_epoch
+        if epoch is None:
+            return False
+        return ((self.debut is None or epoch >= self.debut)
+                and (self.fin is None or epoch < self.fin))
+
+    def bloc_compatible(self, bloc):
+        """
+        Indique si un bloc de l'index peut contenir des lignes retenues.
+
+        Args:
+            bloc (dict): Résumé d'un bloc (voir `indexer_depuis()`)
+        """
+        if self.statuts is not None and self.statuts.isdisjoint(bloc['statuts']):
+            return False
+        if self.methodes is not None and self.methodes.isdisjoint(bloc['methodes']):
+            return False
+        if self.debut is not None or self.fin is not None:
+            if bloc['t_min'] is None:
+                return False
+            if self.debut is not None and bloc['t_max'] < self.debut:
+                return False
+            if self.fin is not None and bloc['t_min'] >= self.fin:
+                return False
+        return True
+
+
+def lire_statuts(texte):
+    """
+    Convertit une liste de statuts de la ligne de commande en ensemble de codes.
+
+    Args:
+        texte (str): Par exemple "5xx", "404" ou "4xx,503"
+
+    Returns:
+        set: Codes de statut (int)
+    """
+    statuts = set()
+    for element in texte.split(','):
+        element = element.strip().lower()
+        if len(element) == 3 and element.endswith('xx') and element[0].isdigit():
+            centaine = int(element[0]) * 100
+            statuts.update(range(centaine, centaine + 100))
+        else:
+            statuts.add(int(element))
+    return statuts
+
+
+def lire_instant(texte):
+    """
+    Convertit une date ISO ('2024-10-10T14:00', UTC si sans fuseau) en secondes epoch.
+    """
+    instant = datetime.fromisoformat(texte)
+    if instant.tzinfo is None:
+        instant = instant.replace(tzinfo=timezone.utc)
+    return int(instant.timestamp())
+
+
+def lire_filtre(texte, **criteres):
+    """
+    Traduit une expression de filtre en critères de `FiltreLogs`.
+
+    L'expression relie par 'and' des conditions 'champ opérateur valeur':
+    status (== != < <= > >=, valeurs comme '5xx,404'), method (==, liste
+    'GET,POST'), path et ip (^=, préfixes séparés par des virgules), date
+    (>= > < <=, date ISO). Par exemple: 'status>=500 and path^=/api'.
+    Deux conditions '^=' sur un même champ se cumulent: 'path^=/api and
+    path^=/api/v2' garde les endpoints qui commencent par /api/v2.
+
+    Args:
+        texte (str): Expression du filtre
+        **criteres: Critères déjà connus (--statut, --depuis...), restreints
+            par les conditions de l'expression
+
+    Returns:
+        dict: Arguments de `FiltreLogs`
+
+    Raises:
+        ValueError: Si une condition est invalide
+    """
+    criteres = dict(criteres)
+
+    def restreindre(cle, valeurs):
+        actuelles = criteres.get(cle)
+        criteres[cle] = valeurs if actuelles is None else set(actuelles) & valeurs
+
+    for condition in re.split(r'\s+and\s+', texte.strip(), flags=re.IGNORECASE):
+        match = MOTIF_CONDITION.match(condition)
+        if match is None:
+            raise ValueError(f"Condition invalide : '{condition}'")
+        champ, operateur, valeur = match.groups()
+        champ = ALIAS_CHAMPS_FILTRE.get(champ.lower(), champ.lower())
+        operateur = '==' if operateur == '=' else operateur
+        if champ == 'status' and operateur in ('==', '!='):
+            statuts = lire_statuts(valeur)
+            restreindre('statuts', STATUTS_POSSIBLES - statuts if operateur == '!=' else statuts)
+        elif champ == 'status' and operateur in COMPARAISONS:
+            seuil = int(valeur)
+            restreindre('statuts', {status for status in STATUTS_POSSIBLES
+                                    if COMPARAISONS[operateur](status, seuil)})
+        elif champ == 'method' and operateur == '==':
+            restreindre('methodes', set(valeur.upper().split(',')))
+        elif champ in ('path', 'ip') and operateur == '^=':
+            cle = 'prefixes' if champ == 'path' else 'prefixes_ip'
+            prefixes = valeur.split(',')
+            if criteres.get(cle) is not None:
+                # Commencer par p1 et par p2: commencer par le plus long des
+                # deux, si l'un prolonge l'autre
+                prefixes = sorted({max(p1, p2, key=len) for p1 in criteres[cle] for p2 in prefixes
+                                   if p1.startswith(p2) or p2.startswith(p1)})
+            criteres[cle] = prefixes
+        elif champ == 'date' and operateur in COMPARAISONS:
+            # date > t: à partir de t + 1 s; date <= t: jusqu'à t + 1 s exclu
+            instant = lire_instant(valeur) + (operateur in ('>', '<='))
+            cle, garder = ('debut', max) if operateur.startswith('>') else ('fin', min)
+            criteres[cle] = instant if criteres.get(cle) is None else garder(criteres[cle], instant)
+        else:
+            raise ValueError(f"Opérateur '{operateur}' non pris en charge pour le champ '{champ}'")
+    return criteres
+
+
+def chemin_index_par_defaut(nom_fichier):
+    """Chemin de l'index d'un fichier de logs: <fichier>.logindex.json"""
+    return f"{nom_fichier}.logindex.json"
+
+
+def empreinte_bloc(fichier, fin):
+    """
+    Calcule l'empreinte SHA-256 des derniers octets lus avant la position `fin`.
+
+    Args:
+        fichier: Fichier ouvert en mode binaire
+        fin (int): Position (en octets) de fin du bloc
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    debut = max(0, fin - TAILLE_BLOC_CONTROLE)
+    fichier.seek(debut)
+    return hashlib.sha256(fichier.read(fin - debut)).hexdigest()
+
+
+def indexer_depuis(fichier, position, taille_bloc=TAILLE_BLOC_INDEX):
+    """
+    Résume les lignes complètes à partir de `position`, par blocs de `taille_bloc` octets.
+
+    Chaque bloc commence en début de ligne et garde ses positions, ses
+    dates extrêmes (points de repère temps → position) et le nombre de
+    lignes par statut et par méthode. Une dernière ligne sans retour à
+    la ligne n'est pas indexée.
+
+    Args:
+        fichier: Fichier ouvert en mode binaire
+        position (int): Position de départ en octets
+        taille_bloc (int): Taille visée d'un bloc
+
+    Returns:
+        tuple: (liste des blocs, position de fin des lignes indexées)
+    """
+    blocs = []
+    bloc = None
+    derniere_date = epoch = None
+    fichier.seek(position)
+    for ligne in fichier:
+        if not ligne.endswith(b'\n'):
+            break
+        if bloc is None:
+            bloc = {'debut': position, 'fin': position, 't_min': None, 't_max': None,
+                    'statuts': Counter(), 'methodes': Counter()}
+        position += len(ligne)
+        enregistrement = parser_ligne_rapide(ligne.decode('utf-8', errors='replace').strip())
+        if enregistrement is not None:
+            if enregistrement.date != derniere_date:
+                derniere_date = enregistrement.date
+                epoch = date_vers_epoch(derniere_date)
+            if epoch is not None:
+                if bloc['t_min'] is None or epoch < bloc['t_min']:
+                    bloc['t_min'] = epoch
+                if bloc['t_max'] is None or epoch > bloc['t_max']:
+                    bloc['t_max'] = epoch
+            bloc['statuts'][enregistrement.status] += 1
+            bloc['methodes'][enregistrement.method] += 1
+        if position - bloc['debut'] >= taille_bloc:
+            bloc['fin'] = position
+            blocs.append(bloc)
+            bloc = None
+    if bloc is not None:
+        bloc['fin'] = position
+        blocs.append(bloc)
+    return blocs, position
+
+
+def indexer_logs(nom_fichier, chemin_index=None, taille_bloc=TAILLE_BLOC_INDEX):
+    """
+    Construit ou met à jour l'index d'un fichier de logs.
+
+    Si le fichier a seulement grandi depuis la dernière indexation, seules
+    les lignes ajoutées sont lues; s'il a été tronqué ou réécrit, tout
+    est réindexé.
+
+    Args:
+        nom_fichier (str): Chemin du fichier de logs
+        chemin_index (str): Chemin de l'index (par défaut: <fichier>.logindex.json)
+        taille_bloc (int): Taille visée d'un bloc
+
+    Returns:
+        tuple: (index, mode) où mode vaut 'cache', 'incremental' ou 'complet'
+    """
+    if chemin_index is None:
+        chemin_index = chemin_index_par_defaut(nom_fichier)
+
+    infos = os.stat(nom_fichier)
+    valable = charger_index_a_jour(nom_fichier, chemin_index)
+    if valable is not None and valable[1] == 'cache':
+        return valable
+    index = None if valable is None else valable[0]
+
+    with open(nom_fichier, 'rb', buffering=TAILLE_TAMPON_LECTURE) as fichier:
+        mode = 'complet' if index is None else 'incremental'
+        if mode == 'complet':
+            blocs, position = indexer_depuis(fichier, 0, taille_bloc)
+        else:
+            nouveaux, position = indexer_depuis(fichier, index['position'], taille_bloc)
+            blocs = index['blocs'] + nouveaux
+
+        index = {
+            'version': VERSION_INDEX,
+            'taille': infos.st_size,
+            'mtime': infos.st_mtime_ns,
+            'position': position,
+            'empreinte': empreinte_bloc(fichier, position),
+            'blocs': blocs,
+        }
+    sauvegarder_index(chemin_index, index)
+    return index, mode
+
+
+def charger_index_a_jour(nom_fichier, chemin_index=None):
+    """
+    Charge l'index d'un fichier s'il est encore valable, sans jamais l'écrire.
+
+    L'index est valable si le fichier n'a pas changé ('cache') ou s'il
+    a seulement grandi ('partiel': la fin non indexée est lue en entier).
+
+    Args:
+        nom_fichier (str): Chemin du fichier de logs
+        chemin_index (str): Voir `indexer_logs()`
+
+    Returns:
+        tuple: (index, mode), ou None sans index valable
+    """
+    if chemin_index is None:
+        chemin_index = chemin_index_par_defaut(nom_fichier)
+    index = charger_index(chemin_index)
+    if index is None:
+        return None
+    infos = os.stat(nom_fichier)
+    if index['taille'] == infos.st_size and index['mtime'] == infos.st_mtime_ns:
+        return index, 'cache'
+    if index['position'] > infos.st_size:
+        return None
+    with open(nom_fichier, 'rb') as fichier:
+        if empreinte_bloc(fichier, index['position']) != index['empreinte']:
+            return None
+    return index, 'partiel'
+
 
+def charger_index(chemin_index):
+    """
+    Charge l'index s'il existe et s'il est lisible.
 
-def lire_logs(nom_fichier):
+    Returns:
+        dict: Index (clés de statut converties en entiers) ou None
     """
-    Lit un fichier de logs ligne par ligne.
-    
+    try:
+        with open(chemin_index, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != VERSION_INDEX:
+        return None
+    for bloc in index['blocs']:
+        bloc['statuts'] = {int(statut): n for statut, n in bloc['statuts'].items()}
+    return index
+
+
+def sauvegarder_index(chemin_index, index):
+    """Écrit l'index de façon atomique, au format JSON compact."""
+    temporaire = f"{chemin_index}.tmp"
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(temporaire, chemin_index)
+
+
+def analyser_logs_indexe(nom_fichier, filtre, chemin_index=None,
+                         capacite_top=None, precision_hll=None, index=None, **options):
+    """
+    Analyse les lignes qui satisfont un filtre en ne lisant que les blocs utiles.
+
+    L'index doit exister (`indexer_logs()`, --construire-index) et rester
+    valable; il n'est jamais écrit ici. Les blocs qui ne peuvent pas
+    contenir de ligne retenue (dates hors intervalle, aucun statut ou
+    méthode demandé) sont sautés, les blocs consécutifs sont lus d'un
+    seul tenant. La fin du fichier non indexée est toujours lue.
+
     Args:
         nom_fichier (str): Chemin du fichier de logs
-    
+        filtre (FiltreLogs): Critères de la requête
+        chemin_index (str): Voir `indexer_logs()`
+        capacite_top (int): Voir `analyser_logs()`
+        precision_hll (int): Voir `analyser_logs()`
+        index (tuple): (index, mode) déjà chargé par `charger_index_a_jour()`
+        **options: Voir `analyser_logs()`
+
     Returns:
-        list: Liste de lignes du fichier
-    
+        dict: Même dictionnaire que `analyser_logs()`, avec une clé 'index'
+            (mode de l'index, blocs lus, blocs au total)
+
     Raises:
-        FileNotFoundError: Si le fichier n'existe pas
+        ValueError: S'il n'y a pas d'index valable
+    """
+    if index is None:
+        index = charger_index_a_jour(nom_fichier, chemin_index)
+        if index is None:
+            raise ValueError(f"Pas d'index à jour pour '{nom_fichier}' (--construire-index)")
+    index, mode = index
+
+    tranches = []
+    blocs_lus = 0
+    for bloc in index['blocs']:
+        if not filtre.bloc_compatible(bloc):
+            continue
+        blocs_lus += 1
+        if tranches and tranches[-1][1] == bloc['debut']:
+            tranches[-1][1] = bloc['fin']
+        else:
+            tranches.append([bloc['debut'], bloc['fin']])
+    taille = os.path.getsize(nom_fichier)
+    if index['position'] < taille:
+        tranches.append([index['position'], taille])
+
+    agregats = AgregatsLogs(capacite_top, precision_hll, **options)
+    for debut, fin in tranches:
+        agregats.analyser(lire_segment(nom_fichier, debut, fin), filtre)
+    stats = agregats.vers_stats()
+    stats['index'] = {'mode': mode, 'blocs_lus': blocs_lus, 'blocs_total': len(index['blocs'])}
+    return stats
+
+
+def importer_pyarrow():
+    """
+    Importe pyarrow à la demande (seuls l'export et l'analyse Parquet en ont besoin).
+
+    Raises:
+        ImportError: Si pyarrow n'est pas installé
     """
     try:
-        with open(nom_fichier, 'r', encoding='utf-8') as fichier:
-            return fichier.readlines()
-    except FileNotFoundError:
-        print(f"❌ Erreur: Le fichier '{nom_fichier}' n'existe pas")
-        return []
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "Le module 'pyarrow' est nécessaire pour le format Parquet (pip install pyarrow)"
+        ) from None
+    return pyarrow
 
 
-def parser_ligne_log(ligne):
+def schema_parquet(pa):
+    """Schéma des fichiers Parquet: champs texte encodés par dictionnaire."""
+    texte = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('ip', texte),
+        ('endpoint', texte),
+        ('method', texte),
+        ('status', pa.int16()),
+        ('timestamp', pa.timestamp('s', tz='UTC')),
+        ('taille', pa.int64()),
+        ('user_agent', texte),
+        ('duree', pa.float64()),
+    ])
+
+
+def exporter_parquet(lignes, dossier, taille_lot=TAILLE_LOT_PARQUET, filtre=None):
     """
-    Parse une ligne de log pour extraire les informations.
-    
-    Format: IP - - [date] "METHOD /endpoint HTTP/version" status
-    
+    Convertit des lignes de logs en fichiers Parquet partitionnés par jour.
+
+    Chaque jour (UTC) est écrit dans `dossier/jour=AAAA-MM-JJ/partie-0.parquet`
+    (lignes sans date valide: `jour=inconnu`), par lots de `taille_lot`
+    enregistrements. Les colonnes ip, endpoint et method sont encodées
+    par dictionnaire (comme user_agent), status est un entier 16 bits,
+    timestamp une date à la seconde; taille et duree sont nulles en
+    format commun. Le nombre de lignes lues est gardé dans `_resume.json`.
+
     Args:
-        ligne (str): Une ligne de log
-    
+        lignes (iterable): Lignes de logs (str)
+        dossier (str): Dossier de sortie (créé, doit être vide)
+        taille_lot (int): Nombre d'enregistrements par lot
+        filtre (FiltreLogs): N'exporter que les lignes retenues (None: toutes),
+            comptées comme dans `AgregatsLogs.analyser()`
+
     Returns:
-        dict: Dictionnaire contenant les informations parsées ou None si échec
+        dict: Résumé de l'export (lignes lues, lignes exportées, lignes
+            hors filtre, jours)
+
+    Raises:
+        FileExistsError: Si le dossier existe et n'est pas vide
     """
-    # Pattern regex pour parser le log
-    pattern = r'(\S+) - - \[(.*?)\] "(\S+) (\S+) HTTP/\d\.\d" (\d+)'
-    match = re.match(pattern, ligne)
-    
-    if match:
-        return {
-            'ip': match.group(1),
-            'date': match.group(2),
-            'method': match.group(3),
-            'endpoint': match.group(4),
-            'status': int(match.group(5))
-        }
-    return None
+    pa = importer_pyarrow()
+    schema = schema_parquet(pa)
+    dossier = Path(dossier)
+    if dossier.exists() and any(dossier.iterdir()):
+        raise FileExistsError(f"Le dossier '{dossier}' n'est pas vide")
+    dossier.mkdir(parents=True, exist_ok=True)
+
+    ecrivains = {}
+    lots = defaultdict(lambda: ([], [], [], [], [], [], [], []))
+    en_attente = 0
+
+    def vider():
+        for jour, (ips, endpoints, methodes, statuts, instants,
+                   tailles, user_agents, durees) in lots.items():
+            if jour not in ecrivains:
+                (dossier / f"jour={jour}").mkdir()
+                ecrivains[jour] = pa.parquet.ParquetWriter(
+                    dossier / f"jour={jour}" / "partie-0.parquet", schema)
+            ecrivains[jour].write_table(pa.table([
+                pa.array(ips, pa.string()).dictionary_encode(),
+                pa.array(endpoints, pa.string()).dictionary_encode(),
+                pa.array(methodes, pa.string()).dictionary_encode(),
+                pa.array(statuts, pa.int16()),
+                pa.array(instants, pa.timestamp('s', tz='UTC')),
+                pa.array(tailles, pa.int64()),
+                pa.array(user_agents, pa.string()).dictionary_encode(),
+                pa.array(durees, pa.float64()),
+            ], schema=schema))
+        lots.clear()
+
+    total_lignes = lignes_parsees = lignes_filtrees = 0
+    derniere_date = epoch = jour = None
+    dernier_numero_jour = -1
+    precontrole = filtre.precontrole if filtre is not None and filtre.indices else None
+    try:
+        for ligne in lignes:
+            if precontrole is not None and not precontrole(ligne):
+                lignes_filtrees += 1
+                continue
+            total_lignes += 1
+            enregistrement = parser_ligne_rapide(ligne.strip())
+            if enregistrement is None:
+                continue
+            if filtre is not None and not filtre(enregistrement):
+                total_lignes -= 1
+                lignes_filtrees += 1
+                continue
+            lignes_parsees += 1
+            if enregistrement.date != derniere_date:
+                derniere_date = enregistrement.date
+                epoch = date_vers_epoch(derniere_date)
+                numero_jour = None if epoch is None else epoch // 86400
+                if numero_jour != dernier_numero_jour:
+                    dernier_numero_jour = numero_jour
+                    jour = ('inconnu' if epoch is None else
+                            datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d'))
+            colonnes = lots[jour]
+            colonnes[0].append(enregistrement.ip)
+            colonnes[1].append(enregistrement.endpoint)
+            colonnes[2].append(enregistrement.method)
+            colonnes[3].append(enregistrement.status)
+            colonnes[4].append(epoch)
+            colonnes[5].append(enregistrement.taille)
+            colonnes[6].append(enregistrement.user_agent)
+            colonnes[7].append(enregistrement.duree)
+            en_attente += 1
+            if en_attente >= taille_lot:
+                vider()
+                en_attente = 0
+        vider()
+    finally:
+        for ecrivain in ecrivains.values():
+            ecrivain.close()
 
+    resume = {'total_lignes': total_lignes, 'lignes_parsees': lignes_parsees,
+              'lignes_filtrees': lignes_filtrees, 'jours': sorted(ecrivains)}
+    with open(dossier / "_resume.json", 'w', encoding='utf-8') as f:
+        json.dump(resume, f, indent=2)
+    return resume
 
-def analyser_logs(lignes):
+
+def expression_filtre(pa, filtre):
     """
-    Analyse les lignes de logs et extrait des statistiques.
-    
+    Traduit un `FiltreLogs` en expression pyarrow.dataset.
+
+    Les bornes de temps portent aussi sur la partition `jour`: les
+    dossiers des jours hors intervalle ne sont pas ouverts.
+    """
+    champ = pa.dataset.field
+    conditions = []
+    if filtre.statuts is not None:
+        conditions.append(champ('status').isin(sorted(filtre.statuts)))
+    if filtre.methodes is not None:
+        conditions.append(champ('method').isin(sorted(filtre.methodes)))
+    for colonne, prefixes in (('endpoint', filtre.prefixes), ('ip', filtre.prefixes_ip)):
+        if prefixes is not None:
+            # Colonnes en dictionnaire: starts_with n'a de noyau que pour les chaînes
+            valeurs = champ(colonne).cast(pa.string())
+            condition = None
+            for prefixe in prefixes:
+                debute = pa.compute.starts_with(valeurs, pattern=prefixe)
+                condition = debute if condition is None else condition | debute
+            conditions.append(condition)
+    for borne, superieure in ((filtre.debut, False), (filtre.fin, True)):
+        if borne is None:
+            continue
+        instant = pa.scalar(borne, pa.timestamp('s', tz='UTC'))
+        jour = datetime.fromtimestamp(borne, timezone.utc).strftime('%Y-%m-%d')
+        if superieure:
+            conditions += [champ('timestamp') < instant, champ('jour') <= jour]
+        else:
+            conditions += [champ('timestamp') >= instant, champ('jour') >= jour]
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def analyser_parquet(dossier, filtre=None, nb_exemples=NB_EXEMPLES_ERREURS, par_statut=False,
+                     graine=None, normaliseur=None):
+    """
+    Calcule les statistiques à partir des fichiers Parquet de `exporter_parquet()`.
+
+    Les comptages sont des group-by vectorisés de pyarrow sur les
+    colonnes (aucune ligne n'est reparsée); les critères d'un filtre
+    sont appliqués à la lecture.
+
     Args:
-        lignes (list): Liste de lignes de logs
-    
+        dossier (str): Dossier produit par `exporter_parquet()`
+        filtre (FiltreLogs): Critères de la requête (None: tout)
+        nb_exemples, par_statut, graine: Échantillon d'erreurs, voir `AgregatsLogs`
+        normaliseur (NormaliseurEndpoints): Gabarits d'endpoints (None: endpoints bruts)
+
     Returns:
-        dict: Dictionnaire contenant les statistiques
+        dict: Même dictionnaire que `analyser_logs()` (distincts et
+            quantiles de latence exacts, dates des erreurs affichées en UTC)
     """
-    # Structures pour collecter les données
-    ips = []
-    endpoints = []
-    status_codes = []
+    pa = importer_pyarrow()
+    pc = pa.compute
+    jeu = pa.dataset.dataset(dossier, format='parquet', partitioning='hive')
+    expression = None if filtre is None else expression_filtre(pa, filtre)
+    table = jeu.to_table(columns=['ip', 'endpoint', 'method', 'status', 'timestamp',
+                                  'taille', 'user_agent', 'duree'],
+                         filter=expression)
+    # Un dictionnaire commun par colonne (chaque lot a le sien), pour les group-by
+    table = table.unify_dictionaries()
+    endpoints_bruts = table['endpoint']
+    if normaliseur is not None:
+        # Seules les valeurs distinctes du dictionnaire sont normalisées, puis réencodées
+        morceaux = []
+        for morceau in table['endpoint'].chunks:
+            gabarits = pa.array([normaliseur(e) for e in morceau.dictionary.to_pylist()],
+                                pa.string()).dictionary_encode()
+            morceaux.append(pa.DictionaryArray.from_arrays(
+                gabarits.indices.take(morceau.indices), gabarits.dictionary))
+        table = table.set_column(table.schema.get_field_index('endpoint'), 'endpoint',
+                                 pa.chunked_array(morceaux, table.schema.field('endpoint').type))
+        table = table.unify_dictionaries()
+
+    def comptages(colonne):
+        valeurs = pc.value_counts(colonne)
+        return valeurs.field('values'), valeurs.field('counts')
+
+    def top(colonne, k):
+        valeurs, nombres = comptages(table[colonne])
+        indices = pc.array_sort_indices(nombres, order='descending')[:k]
+        return list(zip(valeurs.take(indices).to_pylist(), nombres.take(indices).to_pylist()))
+
+    def distribution(colonne):
+        valeurs, nombres = comptages(colonne)
+        return dict(zip(valeurs.to_pylist(), nombres.to_pylist()))
+
+    statuts = table['status']
+    est_erreur = pc.greater_equal(statuts, 400)
+    total_erreurs = pc.sum(est_erreur).as_py() or 0
+    noms_mois = list(MOIS)
+    # Échantillon d'erreurs: tirage sans remise parmi les lignes en erreur (par statut si demandé)
+    generateur = random.Random(graine)
+    # Les exemples gardent l'endpoint brut, comme dans `AgregatsLogs`
+    table_erreurs = table.set_column(table.schema.get_field_index('endpoint'), 'endpoint',
+                                     endpoints_bruts).filter(est_erreur)
+    if par_statut:
+        groupes = [table_erreurs.filter(pc.equal(table_erreurs['status'], status))
+                   for status in sorted(pc.unique(table_erreurs['status']).to_pylist())]
+    else:
+        groupes = [table_erreurs]
+    exemples = []
+    for groupe in groupes:
+        indices = sorted(generateur.sample(range(groupe.num_rows), min(groupe.num_rows, nb_exemples)))
+        # Indices typés: une liste vide serait un tableau de type null, refusé par take()
+        exemples.extend(sorted(groupe.take(pa.array(indices, pa.int64())).to_pylist(),
+                               key=lambda e: e['timestamp'].timestamp() if e['timestamp'] else 0))
     erreurs = []
-    methodes = []
-    
-    lignes_parsees = 0
-    lignes_ignorees = 0
-    
-    # Parser chaque ligne
-    for ligne in lignes:
-        data = parser_ligne_log(ligne.strip())
-        
-        if data:
-            lignes_parsees += 1
-            ips.append(data['ip'])
-            endpoints.append(data['endpoint'])
-            status_codes.append(data['status'])
-            methodes.append(data['method'])
-            
-            # Détecter les erreurs (4xx et 5xx)
-            if data['status'] >= 400:
-                erreurs.append({
-                    'ip': data['ip'],
-                    'endpoint': data['endpoint'],
-                    'status': data['status'],
-                    'date': data['date']
-                })
-        else:
-            lignes_ignorees += 1
-    
-    # Calculer les statistiques
+    for erreur in exemples:
+        instant = erreur['timestamp']
+        date = ('' if instant is None else
+                f"{instant.day:02d}/{noms_mois[instant.month - 1]}/{instant.year}:"
+                f"{instant:%H:%M:%S} +0000")
+        erreurs.append({'ip': erreur['ip'], 'endpoint': erreur['endpoint'],
+                        'status': erreur['status'], 'date': date})
+
+    # Séries par minute: comptages par minute, reportés dans une SerieMinutes
+    series = SerieMinutes()
+    # Parquet n'a pas d'unité « seconde »: les dates sont relues en millisecondes
+    secondes = table['timestamp'].cast(pa.timestamp('s', tz='UTC')).cast(pa.int64())
+    minutes = pc.divide(secondes, 60)
+    for tableau, masque in ((series.requetes, None), (series.erreurs, est_erreur),
+                            (series.erreurs_5xx, pc.greater_equal(statuts, 500))):
+        selection = minutes if masque is None else minutes.filter(masque)
+        # Minutes les plus chargées d'abord: elles fixent l'origine de la série
+        for minute, nombre in sorted(distribution(selection).items(),
+                                     key=lambda element: -element[1]):
+            if minute is None:
+                continue
+            # Les erreurs suivent la série des requêtes, déjà ancrée
+            indice = series.indice(minute * 60, reancrer=masque is None)
+            if indice is not None:
+                tableau[indice] += nombre
+            elif masque is None:
+                series.hors_portee += nombre
+
+    # Bande passante: somme des tailles par endpoint
+    octets = table.group_by('endpoint').aggregate([('taille', 'sum')])
+    octets = octets.filter(pc.greater(octets['taille_sum'], 0))
+    indices = pc.array_sort_indices(octets['taille_sum'], order='descending')[:5]
+    top_bande_passante = list(zip(octets['endpoint'].take(indices).to_pylist(),
+                                  octets['taille_sum'].take(indices).to_pylist()))
+
+    def resume_latences(durees):
+        durees = pc.drop_null(durees)
+        if len(durees) == 0:
+            return None
+        p50, p95, p99 = pc.quantile(durees, q=[0.50, 0.95, 0.99]).to_pylist()
+        return {'nombre': len(durees), 'p50': p50, 'p95': p95, 'p99': p99}
+
+    top_endpoints = top('endpoint', 5)
+    latences = None
+    globale = resume_latences(table['duree'])
+    if globale is not None:
+        latences = {'globale': globale, 'endpoints': []}
+        for endpoint, _ in top_endpoints:
+            masque = pc.is_in(table['endpoint'], value_set=pa.array([endpoint]))
+            resume = resume_latences(table['duree'].filter(masque))
+            if resume is not None:
+                latences['endpoints'].append((endpoint, resume))
+
+    lignes_filtrees = 0
+    if filtre is None:
+        with open(Path(dossier) / "_resume.json", 'r', encoding='utf-8') as f:
+            total_lignes = json.load(f)['total_lignes']
+    else:
+        total_lignes = table.num_rows
+        # Nombre de lignes lu dans les métadonnées des fichiers Parquet
+        lignes_filtrees = jeu.count_rows() - table.num_rows
+
     stats = {
-        'total_lignes': len(lignes),
-        'lignes_parsees': lignes_parsees,
-        'lignes_ignorees': lignes_ignorees,
-        'top_ips': Counter(ips).most_common(10),
-        'top_endpoints': Counter(endpoints).most_common(5),
-        'status_distribution': dict(Counter(status_codes)),
-        'methodes_distribution': dict(Counter(methodes)),
-        'total_erreurs': len(erreurs),
-        'erreurs': erreurs[:10]  # Limiter à 10 erreurs
+        'total_lignes': total_lignes,
+        'lignes_parsees': table.num_rows,
+        'lignes_ignorees': total_lignes - table.num_rows,
+        'lignes_filtrees': lignes_filtrees,
+        'top_ips': top('ip', 10),
+        'top_endpoints': top_endpoints,
+        'status_distribution': distribution(statuts),
+        'methodes_distribution': distribution(table['method']),
+        'par_minute': series.vers_dict(),
+        'octets_total': pc.sum(table['taille']).as_py() or 0,
+        'top_bande_passante': top_bande_passante,
+        'total_erreurs': total_erreurs,
+        'erreurs': erreurs,
+        'erreurs_par_statut': {status: n for status, n in sorted(distribution(statuts).items())
+                               if status >= 400},
+        'echantillon_erreurs': {'taille': nb_exemples, 'par_statut': par_statut},
+        **({} if normaliseur is None else
+           {'normalisation': [nom for nom, _ in normaliseur.regles]}),
+        'distincts': {
+            'methode': 'exact',
+            'ips': len(comptages(table['ip'])[0]),
+            'endpoints': len(comptages(table['endpoint'])[0]),
+            'user_agents': len(comptages(pc.drop_null(table['user_agent']))[0]),
+            'erreur_relative': 0.0,
+        },
     }
-    
+    if latences is not None:
+        stats['latences'] = latences
     return stats
 
 
+class SuiviLogs:
+    """
+    Lecture continue d'un fichier de logs qui grandit (comme `tail -F`).
+
+    Seules les lignes ajoutées depuis la dernière lecture sont lues.
+    Le fichier est identifié par son inode: s'il est remplacé (rotation
+    par logrotate), la fin de l'ancien fichier est lue puis le nouveau
+    est ouvert depuis le début; s'il rétrécit (troncature), la lecture
+    reprend au début.
+    """
+
+    def __init__(self, nom_fichier, depuis_debut=False):
+        self.nom_fichier = nom_fichier
+        self.fichier = None
+        self.inode = None
+        self.position = 0
+        # Dernière ligne incomplète (pas encore terminée par un saut de ligne)
+        self.reste = b''
+        self.ouvrir(depuis_debut)
+
+    def ouvrir(self, depuis_debut):
+        """Ouvre le fichier, au début ou à la fin."""
+        self.fichier = open(self.nom_fichier, 'rb')
+        etat = os.fstat(self.fichier.fileno())
+        self.inode = (etat.st_dev, etat.st_ino)
+        self.position = 0 if depuis_debut else etat.st_size
+        self.fichier.seek(self.position)
+        self.reste = b''
+
+    def lire_disponible(self, taille_bloc=TAILLE_TAMPON_LECTURE):
+        """
+        Lit les octets ajoutés par blocs et produit les lignes complètes (str).
+
+        Un gros arriéré (premier passage avec `depuis_debut`, rafale
+        d'écritures) n'est jamais chargé en entier: chaque bloc de
+        `taille_bloc` octets donne sa liste de lignes.
+        """
+        while True:
+            donnees = self.fichier.read(taille_bloc)
+            if not donnees:
+                return
+            self.position += len(donnees)
+            *lignes, self.reste = (self.reste + donnees).split(b'\n')
+            if lignes:
+                yield [ligne.decode('utf-8', errors='replace') for ligne in lignes]
+
+    def lire_lots(self, taille_bloc=TAILLE_TAMPON_LECTURE):
+        """
+        Produit les nouvelles lignes complètes par lots, en gérant rotation et troncature.
+
+        Yields:
+            list: Lignes d'un bloc lu depuis l'appel précédent (jamais vide)
+        """
+        yield from self.lire_disponible(taille_bloc)
+        try:
+            etat = os.stat(self.nom_fichier)
+        except FileNotFoundError:
+            # Rotation en cours: le nouveau fichier n'est pas encore créé
+            return
+
+        if (etat.st_dev, etat.st_ino) != self.inode:
+            # Rotation: l'ancien fichier est lu jusqu'au bout, on passe au nouveau
+            if self.reste:
+                yield [self.reste.decode('utf-8', errors='replace')]
+            self.fichier.close()
+            self.ouvrir(depuis_debut=True)
+            yield from self.lire_disponible(taille_bloc)
+        elif etat.st_size < self.position:
+            # Troncature (copytruncate): reprise au début du fichier
+            self.fichier.seek(0)
+            self.position = 0
+            self.reste = b''
+            yield from self.lire_disponible(taille_bloc)
+
+    def lire_lignes(self):
+        """
+        Retourne toutes les nouvelles lignes complètes (voir `lire_lots()`).
+
+        Returns:
+            list: Lignes ajoutées depuis l'appel précédent
+        """
+        return [ligne for lot in self.lire_lots() for ligne in lot]
+
+    def fermer(self):
+        """Ferme le fichier suivi."""
+        if self.fichier is not None:
+            self.fichier.close()
+            self.fichier = None
+
+
+def ecrire_instantane_json(stats, chemin):
+    """
+    Écrit les statistiques dans un fichier JSON de façon atomique.
+
+    Le fichier est écrit à côté puis renommé: un lecteur ne voit jamais
+    un instantané à moitié écrit.
+    """
+    temporaire = f"{chemin}.tmp"
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2, ensure_ascii=False)
+    os.replace(temporaire, chemin)
+
+
+def afficher_en_direct(stats):
+    """Efface le terminal puis affiche les statistiques à jour."""
+    print("\033[2J\033[H", end='')
+    print(f"🔴 Suivi en direct - {datetime.now().strftime('%H:%M:%S')}")
+    afficher_statistiques(stats)
+
+
+def suivre_logs(nom_fichier, agregats, intervalle=5.0, rendu=afficher_en_direct,
+                depuis_debut=False, pause=PAUSE_SUIVI, duree_max=None, filtre=None):
+    """
+    Suit un fichier de logs et met à jour les agrégats au fil de l'eau.
+
+    Seules les nouvelles lignes sont analysées (l'historique n'est jamais
+    relu); les statistiques sont rendues toutes les `intervalle` secondes.
+
+    Args:
+        nom_fichier (str): Chemin du fichier de logs
+        agregats (AgregatsLogs): Agrégats mis à jour en place
+        intervalle (float): Secondes entre deux rendus
+        rendu (callable): Reçoit le dictionnaire de `vers_stats()`
+        depuis_debut (bool): Analyser aussi le contenu déjà présent
+        pause (float): Secondes entre deux lectures du fichier
+        duree_max (float): Arrêt après ce nombre de secondes (None: jamais)
+        filtre (FiltreLogs): Critères appliqués aux nouvelles lignes (None: toutes)
+    """
+    suivi = SuiviLogs(nom_fichier, depuis_debut)
+    debut = time.monotonic()
+    prochain_rendu = debut + intervalle
+    try:
+        while True:
+            for lignes in suivi.lire_lots():
+                agregats.analyser(lignes, filtre)
+            maintenant = time.monotonic()
+            if maintenant >= prochain_rendu:
+                rendu(agregats.vers_stats())
+                prochain_rendu = maintenant + intervalle
+            if duree_max is not None and maintenant - debut >= duree_max:
+                break
+            time.sleep(pause)
+    finally:
+        suivi.fermer()
+        # Dernier rendu avec les lignes lues depuis le précédent
+        rendu(agregats.vers_stats())
+
+
+def extraire_ligne_syslog(message):
+    """
+    Retire l'en-tête syslog d'un message et retourne la ligne de log.
+
+    Un message sans en-tête reconnu est retourné tel quel (sans le code
+    de priorité "<N>" s'il y en a un).
+
+    Args:
+        message (str): Message syslog (RFC 3164 ou RFC 5424)
+    """
+    return message[MOTIF_SYSLOG.match(message).end():]
+
+
+class RecepteurSyslog(asyncio.DatagramProtocol):
+    """Reçoit des logs en syslog UDP et les transmet à une `IngestionLogs`."""
+
+    def __init__(self, ingestion):
+        self.ingestion = ingestion
+
+    def datagram_received(self, donnees, adresse):
+        messages = donnees.decode('utf-8', errors='replace').splitlines()
+        self.ingestion.recevoir([extraire_ligne_syslog(m) for m in messages if m.strip()])
+
+
+def entier_borne(minimum, maximum=None):
+    """
+    Retourne un type argparse: entier compris entre `minimum` et `maximum` (inclus).
+
+    Une valeur hors bornes donne une erreur d'usage au lieu de l'erreur
+    du constructeur qui la recevrait.
+    """
+    def lire(texte):
+        try:
+            valeur = int(texte)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"entier attendu: {texte!r}") from None
+        if valeur < minimum or (maximum is not None and valeur > maximum):
+            bornes = f"au moins {minimum}" if maximum is None else f"entre {minimum} et {maximum}"
+            raise argparse.ArgumentTypeError(f"{valeur} hors bornes (attendu {bornes})")
+        return valeur
+    return lire
+
+
+def lire_adresse(texte):
+    """
+    Convertit 'hôte:port' (ou ':port', 'port') en adresse d'écoute UDP.
+
+    Returns:
+        tuple: (hôte, port), hôte 127.0.0.1 par défaut
+    """
+    hote, _, port = texte.rpartition(':')
+    try:
+        port = int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"adresse invalide: {texte!r} (attendu hôte:port)")
+    return hote or '127.0.0.1', port
+
+
+class IngestionLogs:
+    """
+    Ingestion asynchrone de plusieurs sources vers un même `AgregatsLogs`.
+
+    Chaque fichier est lu par sa propre tâche (lecture dans un thread pour
+    ne pas bloquer la boucle), les datagrammes syslog UDP sont reçus par
+    `RecepteurSyslog`. Les lignes sont regroupées en lots dans une file
+    bornée, vidée par un seul consommateur qui analyse chaque lot dans un
+    thread et rend les statistiques entre deux lots.
+
+    Contre-pression: quand la file est pleine, les lecteurs de fichiers
+    attendent une place; UDP n'a pas de contrôle de flux, les lots reçus
+    sont alors abandonnés et comptés dans `lignes_perdues`.
+    """
+
+    def __init__(self, agregats, taille_lot=TAILLE_LOT_INGESTION, max_lots=MAX_LOTS_INGESTION,
+                 filtre=None):
+        self.agregats = agregats
+        # Critères appliqués à chaque lot (FiltreLogs, None: toutes les lignes)
+        self.filtre = filtre
+        self.taille_lot = taille_lot
+        self.max_lots = max_lots
+        self.file = None
+        self.arret = None
+        self.adresse_udp = None
+        self.sources = 0
+        self.recues_udp = []
+        self.lots = 0
+        self.lignes_recues = 0
+        self.lignes_perdues = 0
+        self.attentes = 0
+
+    async def envoyer(self, lot):
+        """Met un lot dans la file, en attendant une place si elle est pleine."""
+        if self.file.full():
+            self.attentes += 1
+        self.lignes_recues += len(lot)
+        await self.file.put(lot)
+
+    def recevoir(self, lignes):
+        """Ajoute des lignes reçues en UDP; un lot complet part dans la file."""
+        self.recues_udp.extend(lignes)
+        if len(self.recues_udp) >= self.taille_lot:
+            self.vider_udp()
+
+    def vider_udp(self):
+        """Envoie les lignes UDP en attente sans bloquer (abandonnées si la file est pleine)."""
+        if not self.recues_udp:
+            return
+        lot, self.recues_udp = self.recues_udp, []
+        self.lignes_recues += len(lot)
+        try:
+            self.file.put_nowait(lot)
+        except asyncio.QueueFull:
+            self.lignes_perdues += len(lot)
+
+    async def vider_udp_periodiquement(self, pause):
+        """Envoie régulièrement les lignes UDP d'un lot incomplet (trafic faible)."""
+        while True:
+            await asyncio.sleep(pause)
+            self.vider_udp()
+
+    async def lire_fichier(self, chemin, suivre=False, depuis_debut=True, pause=PAUSE_SUIVI):
+        """
+        Lit un fichier par lots (.gz compris), puis le suit s'il est demandé.
+
+        Args:
+            chemin (str): Fichier de logs
+            suivre (bool): Continuer à lire les lignes ajoutées (voir `SuiviLogs`)
+            depuis_debut (bool): En suivi, lire aussi le contenu déjà présent
+            pause (float): Secondes entre deux lectures en suivi
+        """
+        if not suivre:
+            lignes = lire_logs(chemin)
+            while True:
+                lot = await asyncio.to_thread(list, islice(lignes, self.taille_lot))
+                if not lot:
+                    return
+                await self.envoyer(lot)
+        suivi = SuiviLogs(chemin, depuis_debut)
+        lots = suivi.lire_lots()
+        try:
+            while True:
+                # Un bloc à la fois: la file borne la mémoire même sur un gros arriéré
+                lignes = await asyncio.to_thread(next, lots, None)
+                if lignes is None:
+                    await asyncio.sleep(pause)
+                    lots = suivi.lire_lots()
+                    continue
+                for debut in range(0, len(lignes), self.taille_lot):
+                    await self.envoyer(lignes[debut:debut + self.taille_lot])
+        finally:
+            suivi.fermer()
+
+    async def agreger(self, rendu=None, intervalle=5.0):
+        """Analyse les lots de la file jusqu'au lot None; rend les stats toutes les `intervalle` s."""
+        boucle = asyncio.get_running_loop()
+        prochain_rendu = boucle.time() + intervalle
+        # La lecture en attente est gardée d'un tour à l'autre: l'annuler au
+        # délai de rendu (wait_for) peut perdre un lot déjà retiré de la file
+        lecture = None
+        while True:
+            if lecture is None:
+                lecture = asyncio.ensure_future(self.file.get())
+            await asyncio.wait({lecture}, timeout=max(0.0, prochain_rendu - boucle.time()))
+            lot = ()
+            if lecture.done():
+                lot, lecture = lecture.result(), None
+            if lot is None:
+                break
+            if lot:
+                # Dans un thread: la boucle continue de recevoir pendant l'analyse
+                await asyncio.to_thread(self.agregats.analyser, lot, self.filtre)
+                self.lots += 1
+            if rendu is not None and boucle.time() >= prochain_rendu:
+                rendu(self.vers_stats())
+                prochain_rendu = boucle.time() + intervalle
+        if rendu is not None:
+            rendu(self.vers_stats())
+
+    async def executer(self, fichiers=(), adresse_udp=None, suivre=False, depuis_debut=True,
+                       rendu=None, intervalle=5.0, pause=PAUSE_SUIVI, duree_max=None):
+        """
+        Lit toutes les sources en parallèle jusqu'à leur fin, `arreter()` ou `duree_max`.
+
+        Sans suivi ni UDP, l'ingestion s'arrête quand tous les fichiers ont
+        été lus; sinon elle continue jusqu'à l'arrêt.
+
+        Args:
+            fichiers (list): Fichiers de logs
+            adresse_udp (tuple): (hôte, port) d'écoute syslog UDP (port 0: choisi
+                par le système, lisible ensuite dans `adresse_udp`)
+            suivre (bool): Suivre les fichiers (voir `lire_fichier()`)
+            depuis_debut (bool): En suivi, lire aussi le contenu déjà présent
+            rendu (callable): Reçoit le dictionnaire de `vers_stats()`
+            intervalle (float): Secondes entre deux rendus
+            pause (float): Secondes entre deux lectures des fichiers suivis et
+                entre deux envois des lignes UDP en attente
+            duree_max (float): Arrêt après ce nombre de secondes (None: jamais)
+        """
+        self.file = asyncio.Queue(self.max_lots)
+        self.arret = asyncio.Event()
+        boucle = asyncio.get_running_loop()
+        fin = None if duree_max is None else boucle.time() + duree_max
+        transport = None
+        lecteurs = [asyncio.create_task(self.lire_fichier(chemin, suivre, depuis_debut, pause))
+                    for chemin in fichiers]
+        producteurs = list(lecteurs)
+        self.sources = len(fichiers)
+        if adresse_udp is not None:
+            transport, _ = await boucle.create_datagram_endpoint(
+                lambda: RecepteurSyslog(self), local_addr=adresse_udp)
+            self.adresse_udp = transport.get_extra_info('sockname')[:2]
+            with contextlib.suppress(OSError):
+                transport.get_extra_info('socket').setsockopt(
+                    socket.SOL_SOCKET, socket.SO_RCVBUF, TAILLE_TAMPON_UDP)
+            self.sources += 1
+            producteurs.append(asyncio.create_task(self.vider_udp_periodiquement(pause)))
+        consommateur = asyncio.create_task(self.agreger(rendu, intervalle))
+
+        arret = asyncio.create_task(self.arret.wait())
+        lecture_finie = bool(lecteurs) and not suivre and transport is None
+        surveilles = {arret, *lecteurs}
+        try:
+            while True:
+                delai = None if fin is None else max(0.0, fin - boucle.time())
+                termines, surveilles = await asyncio.wait(
+                    surveilles, timeout=delai, return_when=asyncio.FIRST_COMPLETED)
+                # Durée écoulée, arrêt demandé ou lecteur en erreur (suivi compris)
+                if not termines or arret in termines or any(
+                        not t.cancelled() and t.exception() is not None for t in termines):
+                    break
+                if lecture_finie and surveilles == {arret}:
+                    break
+        finally:
+            for tache in producteurs + [arret]:
+                tache.cancel()
+            if transport is not None:
+                transport.close()
+                self.vider_udp()
+            # Les lots déjà en file sont analysés avant le dernier rendu
+            await self.file.put(None)
+            await consommateur
+        # Erreur d'un lecteur de fichier (fichier illisible...)
+        for tache in lecteurs:
+            if tache.done() and not tache.cancelled() and (erreur := tache.exception()):
+                raise erreur
+
+    def arreter(self):
+        """Demande l'arrêt de `executer()` (les lots en file sont encore analysés)."""
+        self.arret.set()
+
+    def vers_stats(self):
+        """Statistiques des agrégats, avec les compteurs de l'ingestion."""
+        stats = self.agregats.vers_stats()
+        stats['ingestion'] = {
+            'sources': self.sources,
+            'lots': self.lots,
+            'lignes_recues': self.lignes_recues,
+            'lignes_perdues': self.lignes_perdues,
+            'attentes': self.attentes,
+            'udp': None if self.adresse_udp is None else f"{self.adresse_udp[0]}:{self.adresse_udp[1]}",
+        }
+        return stats
+
+
+class ProfilEtapes:
+    """
+    Temps passé dans chaque étape d'une analyse (--profile).
+
+    La lecture est chronométrée par lots de lignes (`lignes()` relaie les
+    lignes du fichier); le coût du parsing est estimé en parsant une
+    seconde fois une ligne sur `echantillon`, ce temps supplémentaire étant
+    retiré de l'analyse. L'agrégation est le reste du temps d'analyse.
+    """
+
+    def __init__(self, echantillon=ECHANTILLON_PROFIL, taille_lot=TAILLE_LOT_PROFIL):
+        self.echantillon = echantillon
+        self.taille_lot = taille_lot
+        self.durees = {}
+        self.lignes_lues = 0
+        self.lignes_echantillon = 0
+        self.duree_echantillon = 0.0
+
+    @contextlib.contextmanager
+    def etape(self, nom):
+        """Chronomètre un bloc; les durées d'une même étape s'additionnent."""
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durees[nom] = self.durees.get(nom, 0.0) + time.perf_counter() - debut
+
+    def lignes(self, lignes):
+        """
+        Relaie des lignes en chronométrant leur lecture et le parsing d'une partie.
+
+        Args:
+            lignes (iterable): Lignes de logs (générateur de `lire_logs()`)
+
+        Yields:
+            str: Les mêmes lignes, dans le même ordre
+        """
+        iterateur = iter(lignes)
+        horloge = time.perf_counter
+        parser = parser_ligne_rapide
+        lecture = 0.0
+        try:
+            while True:
+                debut = horloge()
+                lot = list(islice(iterateur, self.taille_lot))
+                lecture += horloge() - debut
+                if not lot:
+                    return
+                debut = horloge()
+                echantillon = lot[-self.lignes_lues % self.echantillon::self.echantillon]
+                for ligne in echantillon:
+                    parser(ligne.strip())
+                self.duree_echantillon += horloge() - debut
+                self.lignes_echantillon += len(echantillon)
+                self.lignes_lues += len(lot)
+                yield from lot
+        finally:
+            self.durees['lire_logs'] = self.durees.get('lire_logs', 0.0) + lecture
+
+    def repartition(self):
+        """
+        Retourne la durée de chaque étape, le parsing étant extrapolé.
+
+        Returns:
+            list: Tuples (étape, secondes); l'analyse exclut lecture et parsing
+        """
+        lecture = self.durees.get('lire_logs', 0.0)
+        parsing = 0.0
+        if self.lignes_echantillon:
+            parsing = self.duree_echantillon / self.lignes_echantillon * self.lignes_lues
+        if 'analyser_logs' in self.durees:
+            # L'extrapolation (premiers appels plus lents...) ne dépasse pas le temps mesuré
+            reste = max(0.0, self.durees['analyser_logs'] - lecture - self.duree_echantillon)
+            parsing = min(parsing, reste)
+        etapes = [('lire_logs', lecture), ('parser_ligne_rapide', parsing)]
+        if 'analyser_logs' in self.durees:
+            etapes.append(('analyser_logs', reste - parsing))
+        etapes.extend((nom, duree) for nom, duree in self.durees.items()
+                      if nom not in ('lire_logs', 'analyser_logs'))
+        return etapes
+
+
+def afficher_profil(profil):
+    """Affiche la répartition du temps par étape (--profile)."""
+    etapes = profil.repartition()
+    total = sum(duree for _, duree in etapes) or 1.0
+    details = {
+        'lire_logs': "lecture et décodage",
+        'parser_ligne_rapide': (f"estimé sur {profil.lignes_echantillon} lignes "
+                                f"(1 sur {profil.echantillon})"),
+        'analyser_logs': "agrégation (hors lecture et parsing)",
+    }
+    print()
+    print("⏱️  PROFIL PAR ÉTAPE")
+    print("-" * 80)
+    print(f"{'Étape':<26} {'Durée (s)':>10} {'Part':>7} {'µs/ligne':>9}  Détail")
+    print("-" * 80)
+    for nom, duree in etapes:
+        par_ligne = f"{duree / profil.lignes_lues * 1e6:.2f}" if profil.lignes_lues else "-"
+        print(f"{nom:<26} {duree:>10.3f} {duree / total:>7.1%} {par_ligne:>9}  "
+              f"{details.get(nom, '')}")
+    print("-" * 80)
+    print(f"{'Total':<26} {total:>10.3f} {'':>7} {'':>9}  {profil.lignes_lues} lignes lues")
+
+
+def ecrire_speedscope(profil, chemin):
+    """
+    Écrit la répartition par étape au format JSON de speedscope (https://www.speedscope.app).
+
+    Chaque étape devient une pile « analyse;étape » pondérée par sa durée:
+    speedscope l'affiche comme un flame graph.
+
+    Args:
+        profil (ProfilEtapes): Profil mesuré
+        chemin (str): Fichier JSON à écrire
+    """
+    etapes = [(nom, duree) for nom, duree in profil.repartition() if duree > 0]
+    noms = ['analyse'] + [nom for nom, _ in etapes]
+    document = {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': [{'name': nom} for nom in noms]},
+        'profiles': [{
+            'type': 'sampled',
+            'name': 'log_analyzer --profile',
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': sum(duree for _, duree in etapes),
+            'samples': [[0, i] for i in range(1, len(noms))],
+            'weights': [duree for _, duree in etapes],
+        }],
+        'exporter': 'log_analyzer.py',
+    }
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+
+
 def afficher_statistiques(stats):
     """
     Affiche les statistiques de manière formatée.
@@ -148,6 +3205,22 @@ def afficher_statistiques(stats):
     print(f"Total de lignes           : {stats['total_lignes']}")
     print(f"Lignes parsées avec succès: {stats['lignes_parsees']}")
     print(f"Lignes ignorées           : {stats['lignes_ignorees']}")
+    if stats.get('lignes_filtrees'):
+        print(f"Lignes hors filtre        : {stats['lignes_filtrees']}")
+    if 'distincts' in stats:
+        print(f"IPs distinctes            : {formater_distincts(stats, 'ips')}")
+        print(f"Endpoints distincts       : {formater_distincts(stats, 'endpoints')}")
+        if stats['distincts'].get('user_agents'):
+            print(f"User-agents distincts     : {formater_distincts(stats, 'user_agents')}")
+    if stats.get('octets_total'):
+        print(f"Volume transféré          : {formater_octets(stats['octets_total'])}")
+    if 'normalisation' in stats:
+        print(f"Endpoints normalisés      : règles {', '.join(stats['normalisation'])}")
+    if 'ingestion' in stats:
+        ingestion = stats['ingestion']
+        print(f"Ingestion                 : {ingestion['sources']} sources, {ingestion['lots']} lots, "
+              f"{ingestion['lignes_perdues']} lignes UDP perdues, "
+              f"{ingestion['attentes']} attentes de la lecture")
     print()
     
     # Top IPs
@@ -157,8 +3230,35 @@ def afficher_statistiques(stats):
     print("-" * 70)
     for i, (ip, count) in enumerate(stats['top_ips'], 1):
         print(f"{i:<6} {ip:<20} {count:<20}")
+    if 'precision_top' in stats:
+        afficher_precision_top(stats['precision_top']['ips'])
     print()
     
+    # Sessions par IP (--sessions)
+    if 'sessions' in stats:
+        sessions = stats['sessions']
+        print("👥 SESSIONS PAR IP")
+        print("-" * 70)
+        print(f"Sessions                  : {sessions['total']} (inactivité max "
+              f"{sessions['delai']} s, {sessions['ouvertes']} encore ouvertes)")
+        print(f"IPs actives simultanément : {sessions['ouvertes_max']} au plus")
+        duree, requetes = sessions['duree'], sessions['requetes']
+        # Sans session (aucune date lisible), les quantiles valent None
+        if sessions['total']:
+            print(f"Durée (s)                 : p50 {duree['p50']:.0f}  p95 {duree['p95']:.0f}  "
+                  f"p99 {duree['p99']:.0f}")
+            print(f"Requêtes par session      : p50 {requetes['p50']:.0f}  "
+                  f"p95 {requetes['p95']:.0f}  p99 {requetes['p99']:.0f}")
+        print(f"IPs au débit anormal      : {sessions['nb_anomalies']} "
+              f"(plus de {sessions['seuil']} requêtes en {sessions['fenetre']} s)")
+        if sessions['anomalies']:
+            print(f"{'Adresse IP':<20} {'Pic':>8} {'Dépassements':>14}  Premier dépassement (UTC)")
+            for anomalie in sessions['anomalies']:
+                debut = datetime.fromtimestamp(anomalie['debut'], timezone.utc)
+                print(f"{anomalie['ip']:<20} {anomalie['pic']:>8} {anomalie['depassements']:>14}  "
+                      f"{debut:%Y-%m-%d %H:%M:%S}")
+        print()
+    
     # Top Endpoints
     print("🎯 TOP 5 DES ENDPOINTS")
     print("-" * 70)
@@ -166,8 +3266,32 @@ def afficher_statistiques(stats):
     print("-" * 70)
     for i, (endpoint, count) in enumerate(stats['top_endpoints'], 1):
         print(f"{i:<6} {endpoint:<40} {count:<10}")
+    if 'precision_top' in stats:
+        afficher_precision_top(stats['precision_top']['endpoints'])
     print()
     
+    # Bande passante (format combiné)
+    if stats.get('top_bande_passante'):
+        print("💾 TOP 5 DES ENDPOINTS PAR BANDE PASSANTE")
+        print("-" * 70)
+        print(f"{'Rang':<6} {'Endpoint':<40} {'Volume':>12}")
+        print("-" * 70)
+        for i, (endpoint, octets) in enumerate(stats['top_bande_passante'], 1):
+            print(f"{i:<6} {endpoint:<40} {formater_octets(octets):>12}")
+        print()
+    
+    # Latences (format avec durée de requête)
+    if 'latences' in stats:
+        print("🐢 LATENCES (ms)")
+        print("-" * 70)
+        print(f"{'Endpoint':<34} {'Requêtes':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+        print("-" * 70)
+        lignes_latences = [('(toutes)', stats['latences']['globale'])] + stats['latences']['endpoints']
+        for endpoint, resume in lignes_latences:
+            print(f"{endpoint:<34} {resume['nombre']:>9} {resume['p50'] * 1000:>8.1f} "
+                  f"{resume['p95'] * 1000:>8.1f} {resume['p99'] * 1000:>8.1f}")
+        print()
+    
     # Distribution des méthodes HTTP
     print("📡 DISTRIBUTION DES MÉTHODES HTTP")
     print("-" * 70)
@@ -209,17 +3333,38 @@ def afficher_statistiques(stats):
     
     print()
     
+    # Trafic par minute
+    lignes_minutes = lignes_par_minute(stats.get('par_minute'))
+    if lignes_minutes:
+        print(f"⏱️  TRAFIC PAR MINUTE (UTC, {NB_MINUTES_AFFICHEES} dernières minutes)")
+        print("-" * 70)
+        print(f"{'Minute':<18} {'Requêtes':>10} {'Erreurs':>10} {'Taux 5xx':>10}")
+        print("-" * 70)
+        for minute, requetes, erreurs, taux_5xx in lignes_minutes[-NB_MINUTES_AFFICHEES:]:
+            print(f"{minute:<18} {requetes:>10} {erreurs:>10} {taux_5xx * 100:>9.1f}%")
+        pic = max(lignes_minutes, key=lambda ligne: ligne[1])
+        print(f"\nPic de trafic : {pic[1]} requêtes à {pic[0]}")
+        print()
+    hors_portee = (stats.get('par_minute') or {}).get('hors_portee')
+    if hors_portee:
+        print(f"⚠️  {hors_portee} lignes aux dates aberrantes hors de la série par minute")
+        print()
+    
     # Erreurs détectées
     if stats['total_erreurs'] > 0:
         print(f"⚠️  ERREURS DÉTECTÉES (4xx & 5xx): {stats['total_erreurs']} erreurs")
+        echantillon = stats.get('echantillon_erreurs')
+        if echantillon and stats['total_erreurs'] > len(stats['erreurs']):
+            detail = " par code de statut" if echantillon['par_statut'] else ""
+            print(f"(échantillon aléatoire de {echantillon['taille']} exemples{detail})")
         print("-" * 70)
         print(f"{'IP':<20} {'Endpoint':<30} {'Status':<10} {'Date':<25}")
         print("-" * 70)
         for erreur in stats['erreurs']:
             print(f"{erreur['ip']:<20} {erreur['endpoint']:<30} {erreur['status']:<10} {erreur['date']:<25}")
         
-        if stats['total_erreurs'] > 10:
-            print(f"\n... et {stats['total_erreurs'] - 10} autres erreurs")
+        if stats['total_erreurs'] > len(stats['erreurs']):
+            print(f"\n... et {stats['total_erreurs'] - len(stats['erreurs'])} autres erreurs")
     else:
         print("✅ AUCUNE ERREUR DÉTECTÉE")
     
@@ -228,6 +3373,69 @@ def afficher_statistiques(stats):
     print()
 
 
+def lignes_par_minute(par_minute):
+    """
+    Met en forme la série par minute pour l'affichage.
+
+    Args:
+        par_minute (dict): Résultat de `SerieMinutes.vers_dict()` (ou None)
+
+    Returns:
+        list: Tuples (minute 'AAAA-MM-JJ HH:MM', requêtes, erreurs, taux de 5xx)
+    """
+    if not par_minute or par_minute['debut'] is None:
+        return []
+    lignes = []
+    for i, (requetes, erreurs, erreurs_5xx) in enumerate(
+            zip(par_minute['requetes'], par_minute['erreurs'], par_minute['erreurs_5xx'])):
+        minute = datetime.fromtimestamp(par_minute['debut'] + 60 * i, timezone.utc)
+        lignes.append((minute.strftime('%Y-%m-%d %H:%M'), requetes, erreurs,
+                       erreurs_5xx / requetes if requetes else 0.0))
+    return lignes
+
+
+def formater_octets(octets):
+    """Formate un nombre d'octets avec l'unité adaptée (par exemple "1.5 Mo")."""
+    for unite in ('o', 'Ko', 'Mo', 'Go'):
+        if octets < 1024 or unite == 'Go':
+            break
+        octets /= 1024
+    return f"{octets:.0f} {unite}" if unite == 'o' else f"{octets:.1f} {unite}"
+
+
+def formater_distincts(stats, cle):
+    """
+    Formate un nombre de valeurs distinctes (exact ou estimé).
+
+    Args:
+        stats (dict): Statistiques contenant la clé 'distincts'
+        cle (str): 'ips', 'endpoints' ou 'user_agents'
+
+    Returns:
+        str: Par exemple "1234" ou "~1234 (±1.6%)"
+    """
+    distincts = stats['distincts']
+    if distincts['methode'] == 'exact':
+        return str(distincts[cle])
+    return f"~{distincts[cle]} (±{distincts['erreur_relative'] * 100:.1f}%)"
+
+
+def afficher_precision_top(precision):
+    """
+    Affiche les bornes d'erreur d'un top approximatif (Space-Saving).
+
+    Args:
+        precision (dict): Résultat de `SpaceSaving.precision()`
+    """
+    if precision['erreur_max_top'] == 0:
+        print(f"(top exact: {precision['suivis']} valeurs distinctes suivies "
+              f"sur {precision['capacite']} possibles)")
+    else:
+        print(f"(top approximatif: compteurs surestimés d'au plus "
+              f"{precision['erreur_max_top']}, {precision['garantis']} rangs garantis, "
+              f"capacité {precision['capacite']})")
+
+
 def generer_rapport_markdown(stats, fichier_sortie="rapport_logs.md"):
     """
     Génère un rapport au format Markdown.
@@ -243,7 +3451,19 @@ def generer_rapport_markdown(stats, fichier_sortie="rapport_logs.md"):
         f.write("## Résumé Général\n\n")
         f.write(f"- Total de lignes : {stats['total_lignes']}\n")
         f.write(f"- Lignes parsées : {stats['lignes_parsees']}\n")
-        f.write(f"- Lignes ignorées : {stats['lignes_ignorees']}\n\n")
+        f.write(f"- Lignes ignorées : {stats['lignes_ignorees']}\n")
+        if stats.get('lignes_filtrees'):
+            f.write(f"- Lignes hors filtre : {stats['lignes_filtrees']}\n")
+        if 'distincts' in stats:
+            f.write(f"- Visiteurs uniques (IPs) : {formater_distincts(stats, 'ips')}\n")
+            f.write(f"- URLs uniques : {formater_distincts(stats, 'endpoints')}\n")
+            if stats['distincts'].get('user_agents'):
+                f.write(f"- User-agents uniques : {formater_distincts(stats, 'user_agents')}\n")
+        if stats.get('octets_total'):
+            f.write(f"- Volume transféré : {formater_octets(stats['octets_total'])}\n")
+        if 'normalisation' in stats:
+            f.write(f"- Endpoints normalisés : règles {', '.join(stats['normalisation'])}\n")
+        f.write("\n")
         
         f.write("## Top 10 des IPs\n\n")
         f.write("| Rang | Adresse IP | Nombre de requêtes |\n")
@@ -251,14 +3471,64 @@ def generer_rapport_markdown(stats, fichier_sortie="rapport_logs.md"):
         for i, (ip, count) in enumerate(stats['top_ips'], 1):
             f.write(f"| {i} | {ip} | {count} |\n")
         
+        if 'sessions' in stats:
+            sessions = stats['sessions']
+            f.write("\n## Sessions par IP\n\n")
+            f.write(f"- Sessions : {sessions['total']} (inactivité max {sessions['delai']} s)\n")
+            if sessions['total']:
+                f.write(f"- Durée médiane : {sessions['duree']['p50']:.0f} s "
+                        f"(p95 {sessions['duree']['p95']:.0f} s)\n")
+                f.write(f"- Requêtes par session : p50 {sessions['requetes']['p50']:.0f}, "
+                        f"p95 {sessions['requetes']['p95']:.0f}\n")
+            f.write(f"- IPs au débit anormal (plus de {sessions['seuil']} requêtes en "
+                    f"{sessions['fenetre']} s) : {sessions['nb_anomalies']}\n")
+            if sessions['anomalies']:
+                f.write("\n| Adresse IP | Pic | Dépassements |\n")
+                f.write("|------------|-----|--------------|\n")
+                for anomalie in sessions['anomalies']:
+                    f.write(f"| {anomalie['ip']} | {anomalie['pic']} | {anomalie['depassements']} |\n")
+        
         f.write("\n## Top 5 des Endpoints\n\n")
         f.write("| Rang | Endpoint | Nombre de visites |\n")
         f.write("|------|----------|-------------------|\n")
         for i, (endpoint, count) in enumerate(stats['top_endpoints'], 1):
             f.write(f"| {i} | {endpoint} | {count} |\n")
         
+        if 'precision_top' in stats:
+            precision = stats['precision_top']['endpoints']
+            f.write(f"\n_Top approximatif (Space-Saving, capacité {precision['capacite']}) : "
+                    f"compteurs surestimés d'au plus {precision['erreur_max_top']}._\n")
+        
+        if stats.get('top_bande_passante'):
+            f.write("\n## Bande Passante par Endpoint\n\n")
+            f.write("| Rang | Endpoint | Volume |\n")
+            f.write("|------|----------|--------|\n")
+            for i, (endpoint, octets) in enumerate(stats['top_bande_passante'], 1):
+                f.write(f"| {i} | {endpoint} | {formater_octets(octets)} |\n")
+        
+        if 'latences' in stats:
+            f.write("\n## Latences (ms)\n\n")
+            f.write("| Endpoint | Requêtes | p50 | p95 | p99 |\n")
+            f.write("|----------|----------|-----|-----|-----|\n")
+            for endpoint, resume in [('(toutes)', stats['latences']['globale'])] + stats['latences']['endpoints']:
+                f.write(f"| {endpoint} | {resume['nombre']} | {resume['p50'] * 1000:.1f} | "
+                        f"{resume['p95'] * 1000:.1f} | {resume['p99'] * 1000:.1f} |\n")
+        
+        lignes_minutes = lignes_par_minute(stats.get('par_minute'))
+        if lignes_minutes:
+            f.write("\n## Trafic par Minute (UTC)\n\n")
+            f.write("| Minute | Requêtes | Erreurs | Taux 5xx |\n")
+            f.write("|--------|----------|---------|----------|\n")
+            for minute, requetes, erreurs, taux_5xx in lignes_minutes:
+                f.write(f"| {minute} | {requetes} | {erreurs} | {taux_5xx * 100:.1f}% |\n")
+        hors_portee = (stats.get('par_minute') or {}).get('hors_portee')
+        if hors_portee:
+            f.write(f"\n{hors_portee} lignes aux dates aberrantes sont hors de la série par minute.\n")
+        
         f.write(f"\n## Erreurs\n\n")
         f.write(f"Total d'erreurs détectées : {stats['total_erreurs']}\n\n")
+        for status, nombre in stats.get('erreurs_par_statut', {}).items():
+            f.write(f"- {status} : {nombre}\n")
     
     print(f"✅ Rapport Markdown généré : {fichier_sortie}")
 
@@ -267,34 +3537,277 @@ def main():
     """
     Fonction principale du script.
     """
-    # Nom du fichier de logs
+    # Nom du fichier de logs par défaut
     script_dir = Path(__file__).parent
-    nom_fichier = script_dir / 'sample.log'
+
+    parser = argparse.ArgumentParser(description="Analyseur de logs web")
+    parser.add_argument('fichiers', nargs='*',
+                        help="Fichiers, dossiers ou motifs glob à analyser, .gz compris "
+                             "(défaut: sample.log, aucun avec --udp)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Nombre de processus pour l'analyse (défaut: 1)")
+    parser.add_argument('--exact', action='store_true',
+                        help="Top IPs/endpoints exacts (mémoire proportionnelle au nombre de valeurs distinctes)")
+    parser.add_argument('--top-capacite', type=entier_borne(1), default=CAPACITE_TOP_DEFAUT,
+                        help=f"Compteurs du top approximatif (défaut: {CAPACITE_TOP_DEFAUT})")
+    parser.add_argument('--precision-hll', type=entier_borne(4, 18), default=PRECISION_HLL_DEFAUT,
+                        help="Précision HyperLogLog des distincts, de 4 à 18 "
+                             f"(défaut: {PRECISION_HLL_DEFAUT}; ignorée avec --exact)")
+    parser.add_argument('--follow', action='store_true',
+                        help="Suivre le fichier en direct (rotation et troncature gérées)")
+    parser.add_argument('--intervalle', type=float, default=5.0,
+                        help="Secondes entre deux affichages en mode --follow (défaut: 5)")
+    parser.add_argument('--json', metavar='FICHIER',
+                        help="En mode --follow, écrire un instantané JSON au lieu d'afficher")
+    parser.add_argument('--depuis-debut', action='store_true',
+                        help="En mode --follow, analyser aussi les lignes déjà présentes")
+    parser.add_argument('--udp', type=lire_adresse, metavar='HOTE:PORT',
+                        help="Écouter les logs envoyés en syslog UDP (en plus des fichiers donnés, "
+                             "suivis avec --follow) jusqu'à Ctrl+C")
+    parser.add_argument('--construire-index', action='store_true',
+                        help="Construire (ou mettre à jour) l'index <fichier>.logindex.json et quitter")
+    parser.add_argument('--depuis', type=lire_instant, metavar='DATE',
+                        help="Ne garder que les lignes à partir de DATE (ISO, UTC par défaut)")
+    parser.add_argument('--jusqu-a', type=lire_instant, metavar='DATE',
+                        help="Ne garder que les lignes avant DATE (ISO, UTC par défaut)")
+    parser.add_argument('--statut', type=lire_statuts,
+                        help="Ne garder que ces statuts, par exemple 5xx ou 404,503")
+    parser.add_argument('--methode', type=lambda texte: set(texte.upper().split(',')),
+                        help="Ne garder que ces méthodes, par exemple GET ou POST,PUT")
+    parser.add_argument('--filtre', metavar='EXPRESSION',
+                        help="Critères combinés par 'and', vérifiés sur la ligne brute avant le "
+                             "parsing, par ex. 'status>=500 and path^=/api' (champs status, method, "
+                             "path, ip, date; conditions sur un même champ cumulées)")
+    parser.add_argument('--exemples', type=int, default=NB_EXEMPLES_ERREURS,
+                        help=f"Taille de l'échantillon aléatoire d'erreurs (défaut: {NB_EXEMPLES_ERREURS})")
+    parser.add_argument('--par-statut', action='store_true',
+                        help="Un échantillon d'erreurs par code de statut")
+    parser.add_argument('--graine', type=int,
+                        help="Graine du tirage des exemples d'erreurs (résultat reproductible)")
+    parser.add_argument('--normaliser', action='store_true',
+                        help="Compter les endpoints par gabarit (/users/48213 -> /users/{id})")
+    parser.add_argument('--regle', type=lire_regle, action='append', metavar='NOM=REGEX',
+                        help="Règle de normalisation ajoutée avant celles par défaut, qu'elle "
+                             "remplace si le nom est le même (implique --normaliser)")
+    parser.add_argument('--sessions', action='store_true',
+                        help="Regrouper les requêtes de chaque IP en sessions et signaler les IPs "
+                             "au débit anormal; l'analyse se fait dans un seul processus")
+    parser.add_argument('--inactivite', type=int, default=DELAI_SESSION, metavar='SECONDES',
+                        help=f"Inactivité qui clôt une session (défaut: {DELAI_SESSION}); implique --sessions")
+    parser.add_argument('--fenetre-debit', type=int, default=FENETRE_DEBIT, metavar='SECONDES',
+                        help=f"Fenêtre glissante du débit par IP (défaut: {FENETRE_DEBIT})")
+    parser.add_argument('--seuil-debit', type=int, default=SEUIL_DEBIT, metavar='N',
+                        help=f"Débit anormal: plus de N requêtes sur la fenêtre (défaut: {SEUIL_DEBIT}); "
+                             "implique --sessions")
+    parser.add_argument('--export-parquet', metavar='DOSSIER',
+                        help="Convertir les logs en Parquet partitionné par jour et quitter (pyarrow)")
+    parser.add_argument('--parquet', action='store_true',
+                        help="Le fichier est un dossier produit par --export-parquet")
+    parser.add_argument('--mmap', action='store_true',
+                        help="Parser les octets des fichiers projetés en mémoire, sans décoder les "
+                             "lignes (seules les valeurs affichées sont décodées)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Afficher le temps passé par étape (lecture, parsing, agrégation, "
+                             "affichage, rapport); l'analyse se fait dans un seul processus")
+    parser.add_argument('--profile-echantillon', type=int, default=ECHANTILLON_PROFIL, metavar='N',
+                        help=f"Chronométrer le parsing d'une ligne sur N (défaut: {ECHANTILLON_PROFIL})")
+    parser.add_argument('--profile-sortie', metavar='FICHIER',
+                        help="Écrire le profil: .json au format speedscope, sinon dump cProfile "
+                             "(pstats, snakeviz); implique --profile")
+    args = parser.parse_args()
+    if not args.fichiers and args.udp is None:
+        args.fichiers = [script_dir / 'sample.log']
+    capacite_top = None if args.exact else args.top_capacite
+    precision_hll = None if args.exact else args.precision_hll
+    options = {'nb_exemples': args.exemples, 'par_statut': args.par_statut, 'graine': args.graine}
+    if args.normaliser or args.regle:
+        options['normaliseur'] = NormaliseurEndpoints((args.regle or []) + REGLES_NORMALISATION)
+    criteres = {'debut': args.depuis, 'fin': args.jusqu_a, 'statuts': args.statut,
+                'methodes': args.methode}
+    if args.filtre:
+        try:
+            criteres = lire_filtre(args.filtre, **criteres)
+        except ValueError as e:
+            print(f"❌ Erreur: filtre invalide ({e})")
+            return
+    requete = any(critere is not None for critere in criteres.values())
+    filtre = FiltreLogs(**criteres) if requete else None
+    if (args.sessions or args.inactivite != DELAI_SESSION or args.fenetre_debit != FENETRE_DEBIT
+            or args.seuil_debit != SEUIL_DEBIT):
+        if args.parquet:
+            print("❌ Erreur: --sessions porte sur des fichiers de logs, pas sur --parquet")
+            return
+        try:
+            options['sessions'] = SessionsIP(args.inactivite, args.fenetre_debit, args.seuil_debit)
+        except ValueError as e:
+            print(f"❌ Erreur: {e}")
+            return
+        if args.workers > 1:
+            # Les sessions suivent l'ordre des lignes: un processus pour tout le fichier
+            print("👥 --sessions : analyse dans un seul processus (--workers ignoré)")
+            args.workers = 1
     
     print("📖 Analyseur de Logs Web")
-    print(f"📁 Lecture du fichier : {nom_fichier}")
+    
+    if args.parquet:
+        # Le chemin donné est un dossier Parquet, pas une liste de logs
+        fichiers = [str(args.fichiers[0])]
+    else:
+        try:
+            fichiers = lister_fichiers_logs(args.fichiers)
+        except FileNotFoundError as e:
+            print(f"❌ Erreur: Le fichier '{e.args[0]}' n'existe pas")
+            return
+    
+    if args.udp is not None or (args.follow and len(fichiers) > 1):
+        # Plusieurs sources en direct: ingestion asynchrone vers les mêmes agrégats
+        if args.follow and any(map(est_gzip, fichiers)):
+            print("❌ Erreur: --follow porte sur des fichiers non compressés")
+            return
+        sources = fichiers + ([f"udp://{args.udp[0]}:{args.udp[1]}"] if args.udp else [])
+        if args.json:
+            print(f"🔴 Ingestion de {', '.join(sources)}, instantané toutes les "
+                  f"{args.intervalle:g} s dans {args.json} (Ctrl+C pour arrêter)")
+
+            def rendu(stats):
+                ecrire_instantane_json(stats, args.json)
+        else:
+            rendu = afficher_en_direct
+        ingestion = IngestionLogs(AgregatsLogs(capacite_top, precision_hll, **options),
+                                  filtre=filtre)
+        asyncio.run(ingestion.executer(fichiers, args.udp, args.follow, args.depuis_debut,
+                                       rendu, args.intervalle))
+        return
+    
+    nom_fichier = fichiers[0]
+    if len(fichiers) == 1:
+        print(f"📁 Lecture du fichier : {nom_fichier}")
+    else:
+        print(f"📁 Lecture de {len(fichiers)} fichiers : {fichiers[0]} ... {fichiers[-1]}")
     print()
     
-    # Lecture du fichier
-    lignes = lire_logs(nom_fichier)
+    if (args.follow or args.construire_index) and (len(fichiers) > 1 or est_gzip(nom_fichier)):
+        print("❌ Erreur: --follow et --construire-index portent sur un seul fichier non compressé")
+        return
+    
+    if args.export_parquet:
+        resume = exporter_parquet((ligne for fichier in fichiers for ligne in lire_logs(fichier)),
+                                  args.export_parquet, filtre=filtre)
+        print(f"✅ {resume['lignes_parsees']} enregistrements sur {resume['total_lignes']} lignes "
+              f"exportés dans {args.export_parquet} ({len(resume['jours'])} jours)")
+        return
+    
+    if args.construire_index:
+        try:
+            index, mode = indexer_logs(nom_fichier)
+        except OSError as e:
+            print(f"❌ Erreur: impossible d'écrire l'index ({e})")
+            return
+        print(f"✅ Index {mode} : {len(index['blocs'])} blocs, "
+              f"{index['position']} octets indexés ({chemin_index_par_defaut(nom_fichier)})")
+        return
     
-    if not lignes:
+    if args.follow:
+        if args.json:
+            print(f"🔴 Suivi en direct, instantané toutes les {args.intervalle:g} s dans {args.json} (Ctrl+C pour arrêter)")
+
+            def rendu(stats):
+                ecrire_instantane_json(stats, args.json)
+        else:
+            rendu = afficher_en_direct
+        agregats = AgregatsLogs(capacite_top, precision_hll, **options)
+        suivre_logs(nom_fichier, agregats, args.intervalle, rendu, args.depuis_debut,
+                    filtre=filtre)
         return
     
-    print(f"✅ {len(lignes)} lignes lues")
+    profil = None
+    if args.profile or args.profile_sortie:
+        if args.parquet:
+            print("❌ Erreur: --profile mesure la lecture des fichiers de logs, pas --parquet")
+            return
+        profil = ProfilEtapes(args.profile_echantillon)
+        if args.workers > 1:
+            print("⏱️  --profile : analyse dans un seul processus (--workers ignoré)")
+    # Dump cProfile (fonction par fonction) si le profil n'est pas demandé en speedscope
+    profileur = None
+    if args.profile_sortie and not args.profile_sortie.endswith('.json'):
+        profileur = cProfile.Profile()
+
+    @contextlib.contextmanager
+    def etape(nom):
+        # Sans --profile rien n'est mesuré; cProfile n'est actif que pendant les étapes
+        if profil is None:
+            yield
+            return
+        if profileur is not None:
+            profileur.enable()
+        try:
+            with profil.etape(nom):
+                yield
+        finally:
+            if profileur is not None:
+                profileur.disable()
+
     print("🔍 Analyse en cours...")
     print()
     
-    # Analyse
-    stats = analyser_logs(lignes)
+    # Lecture et analyse en flux: les lignes ne sont jamais toutes en mémoire
+    if args.mmap and (args.parquet or profil is not None):
+        print("❌ Erreur: --mmap ne se combine pas avec --parquet ni --profile")
+        return
+    index = None
+    if (requete and profil is None and not args.parquet and not args.mmap and args.workers <= 1
+            and len(fichiers) == 1 and not est_gzip(nom_fichier)):
+        # Seul un index déjà construit (--construire-index) et valable est utilisé:
+        # le construire ici parserait tout le fichier et écrirait à côté du log
+        index = charger_index_a_jour(nom_fichier)
+    if profil is not None:
+        # Tout est mesuré dans ce processus: lecture séquentielle, sans index
+        with etape('analyser_logs'):
+            agregats = AgregatsLogs(capacite_top, precision_hll, **options)
+            agregats.analyser(profil.lignes(chain.from_iterable(map(lire_logs, fichiers))), filtre)
+            stats = agregats.vers_stats()
+    elif args.parquet:
+        stats = analyser_parquet(nom_fichier, filtre, **options)
+    elif index is not None:
+        # Requête ciblée: l'index permet de sauter les blocs sans ligne utile
+        stats = analyser_logs_indexe(nom_fichier, filtre, capacite_top=capacite_top,
+                                     precision_hll=precision_hll, index=index, **options)
+        print(f"🗂️  Index ({stats['index']['mode']}) : {stats['index']['blocs_lus']} blocs lus "
+              f"sur {stats['index']['blocs_total']}")
+    else:
+        # Sans index, les lignes sans indice du filtre sont écartées avant le parsing
+        stats = analyser_fichiers(fichiers, args.workers, capacite_top, precision_hll,
+                                  filtre, octets=args.mmap, **options)
+    
+    if stats['total_lignes'] == 0:
+        if requete:
+            print("⚠️  Aucune ligne ne correspond aux critères")
+        else:
+            print("⚠️  Le fichier de logs est vide")
+        return
+    
+    print(f"✅ {stats['total_lignes']} lignes lues"
+          + (f" dans {len(fichiers)} fichiers" if len(fichiers) > 1 else ""))
     
     # Affichage
-    afficher_statistiques(stats)
+    with etape('afficher_statistiques'):
+        afficher_statistiques(stats)
     
     # Génération du rapport (optionnel)
     reponse = input("Voulez-vous générer un rapport Markdown ? (o/n) : ").strip().lower()
     if reponse == 'o':
-        generer_rapport_markdown(stats)
+        with etape('generer_rapport_markdown'):
+            generer_rapport_markdown(stats)
+    
+    if profil is not None:
+        afficher_profil(profil)
+        if profileur is not None:
+            profileur.dump_stats(args.profile_sortie)
+        elif args.profile_sortie:
+            ecrire_speedscope(profil, args.profile_sortie)
+        if args.profile_sortie:
+            print(f"✅ Profil enregistré dans {args.profile_sortie}")
 
 
 if __name__ == "__main__":
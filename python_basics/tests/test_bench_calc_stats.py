@@ -0,0 +1,70 @@
+"""
+Tests unitaires pour le module bench_calc_stats.py
+
+Ce fichier contient des tests pour valider les générateurs de données
+synthétiques et l'exécution d'un mode du benchmark.
+
+Pour exécuter les tests:
+    pytest tests/test_bench_calc_stats.py
+    pytest tests/test_bench_calc_stats.py -v  # Mode verbeux
+"""
+
+import csv
+import pytest
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au path pour importer bench_calc_stats
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_calc_stats import generer_nombres, generer_ventes, executer_mode
+from calc_stats import lire_nombres_csv
+
+
+# ============================================================================
+# Tests des générateurs
+# ============================================================================
+
+def test_generer_nombres_taille_et_malformees(tmp_path):
+    """Test le nombre de lignes et de valeurs malformées générées."""
+    fichier = tmp_path / "nombres.csv"
+    malformees = generer_nombres(fichier, 5000, taux_malformes=0.05, graine=1)
+    lignes = fichier.read_text(encoding='utf-8').splitlines()
+    assert lignes[0] == "valeur"
+    assert len(lignes) == 5001
+    assert 150 < malformees < 350
+    assert len(lire_nombres_csv(fichier)) == 5000 - malformees
+
+
+def test_generer_nombres_reproductible(tmp_path):
+    """Test qu'une même graine produit le même fichier."""
+    premier, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    generer_nombres(premier, 100, distribution='lognormale', graine=3)
+    generer_nombres(second, 100, distribution='lognormale', graine=3)
+    assert premier.read_bytes() == second.read_bytes()
+
+
+def test_generer_ventes_format_et_tri(tmp_path):
+    """Test que le fichier de ventes a le format de sales_data.csv et est trié."""
+    fichier = tmp_path / "ventes.csv"
+    generer_ventes(fichier, 2000, graine=2)
+    with open(fichier, encoding='utf-8') as f:
+        lignes = list(csv.DictReader(f))
+    assert len(lignes) == 2000
+    assert set(lignes[0]) == {'date', 'produit', 'categorie', 'quantite',
+                              'prix_unitaire', 'client', 'ville'}
+    dates = [ligne['date'] for ligne in lignes]
+    assert dates == sorted(dates)
+
+
+# ============================================================================
+# Tests de l'exécution d'un mode
+# ============================================================================
+
+@pytest.mark.parametrize("mode", ['liste', 'incremental', 'gzip'])
+def test_executer_mode(tmp_path, mode):
+    """Test qu'un mode s'exécute et retourne ses mesures."""
+    fichier = tmp_path / "nombres.csv"
+    generer_nombres(fichier, 1000, taux_malformes=0.01, graine=0)
+    mesures = executer_mode(mode, fichier)
+    assert mesures['duree_s'] > 0
@@ -0,0 +1,58 @@
+"""
+Tests unitaires pour le module bench_commun.py
+
+Ce fichier contient des tests pour valider les outils partagés par les
+benchmarks (compression, mémoire, dépendances optionnelles, mesure d'un
+mode dans un processus séparé).
+
+Pour exécuter les tests:
+    pytest tests/test_bench_commun.py
+    pytest tests/test_bench_commun.py -v  # Mode verbeux
+"""
+
+import gzip
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au path pour importer bench_commun
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import bench_calc_stats
+from bench_commun import (
+    preparer_gzip, pic_memoire_mo, mesurer_mode, module_disponible, infos_machine
+)
+
+
+# ============================================================================
+# Tests des outils communs
+# ============================================================================
+
+def test_preparer_gzip(tmp_path):
+    """Test que l'archive est créée une seule fois et contient le fichier."""
+    fichier = tmp_path / "donnees.csv"
+    fichier.write_text("valeur\n1\n2\n", encoding='utf-8')
+    archive = preparer_gzip(fichier)
+    assert archive == tmp_path / "donnees.csv.gz"
+    assert gzip.decompress(archive.read_bytes()) == fichier.read_bytes()
+    date_archive = archive.stat().st_mtime_ns
+    assert preparer_gzip(fichier) == archive
+    assert archive.stat().st_mtime_ns == date_archive
+
+
+def test_memoire_dependances_et_machine():
+    """Test le pic de mémoire, la détection des modules et la description de la machine."""
+    pic = pic_memoire_mo()
+    assert pic is None or pic > 0
+    assert module_disponible('json')
+    assert not module_disponible('module_absent_du_benchmark')
+    assert set(infos_machine()) == {'python', 'plateforme', 'processeurs'}
+
+
+def test_mesurer_mode(tmp_path):
+    """Test la mesure d'un mode dans un processus séparé, et l'erreur d'un mode inconnu."""
+    fichier = tmp_path / "nombres.csv"
+    bench_calc_stats.generer_nombres(fichier, 500, graine=0)
+    mesures = mesurer_mode(bench_calc_stats.__file__, 'liste', fichier)
+    assert mesures['duree_s'] > 0
+    erreur = mesurer_mode(bench_calc_stats.__file__, 'inconnu', fichier)
+    assert 'KeyError' in erreur['erreur'][0]
@@ -0,0 +1,91 @@
+"""
+Tests unitaires pour le module bench_log_analyzer.py
+
+Ce fichier contient des tests pour valider les générateurs de données
+(IPs, logs synthétiques) et les mesures du benchmark de log_analyzer.py.
+
+Pour exécuter les tests:
+    pytest tests/test_bench_log_analyzer.py
+    pytest tests/test_bench_log_analyzer.py -v  # Mode verbeux
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au path pour importer bench_log_analyzer
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench_log_analyzer import (
+    generer_ips, comparer_cardinalites, generer_logs, poids_zipf, executer_mode
+)
+from log_analyzer import lire_logs, analyser_logs
+
+
+# ============================================================================
+# Tests de la comparaison exact / HyperLogLog
+# ============================================================================
+
+def test_generer_ips_nombre_de_distincts():
+    """Test que le flux contient exactement le nombre demandé de distincts."""
+    flux = generer_ips(500, 1200, graine=4)
+    assert len(flux) == 1200
+    assert len(set(flux)) == 500
+
+
+def test_comparer_cardinalites():
+    """Test qu'il y a un résultat exact puis un par précision."""
+    resultats = comparer_cardinalites(generer_ips(2000, 4000), [10, 12])
+    assert [r['methode'] for r in resultats] == ['exact', 'hyperloglog p=10', 'hyperloglog p=12']
+    assert resultats[0]['estimation'] == 2000
+    assert resultats[2]['memoire_octets'] == 4096
+    assert resultats[2]['erreur_relative'] < 0.1
+
+
+# ============================================================================
+# Tests du générateur de logs et de la mesure du débit
+# ============================================================================
+
+def test_generer_logs_lisibles(tmp_path):
+    """Test le nombre de lignes, les lignes malformées et le format combiné."""
+    fichier = tmp_path / "access.log"
+    malformees = generer_logs(fichier, 5000, nb_ips=300, taux_erreurs=0.1,
+                              taux_malformes=0.02, graine=1)
+    stats = analyser_logs(lire_logs(fichier))
+    assert stats['total_lignes'] == 5000
+    assert stats['lignes_ignorees'] == malformees > 0
+    assert stats['distincts']['ips'] <= 300
+    assert 0.07 < stats['total_erreurs'] / stats['lignes_parsees'] < 0.13
+    assert stats['latences']['globale']['nombre'] == stats['lignes_parsees']
+
+
+def test_generer_logs_zipf_et_reproductible(tmp_path):
+    """Test que les endpoints suivent leur rang et que la graine fixe le fichier."""
+    premier, second = tmp_path / "a.log", tmp_path / "b.log"
+    generer_logs(premier, 3000, nb_endpoints=50, zipf=1.5, graine=3)
+    generer_logs(second, 3000, nb_endpoints=50, zipf=1.5, graine=3)
+    assert premier.read_bytes() == second.read_bytes()
+
+    top = analyser_logs(lire_logs(premier))['top_endpoints']
+    assert top[0][0] == '/api/users/page0'
+    poids = poids_zipf(50, 1.5)
+    assert abs(top[0][1] / 3000 - poids[0] / poids[-1]) < 0.05
+
+
+@pytest.mark.parametrize("mode", ['exact', 'exact_mmap', 'normalise', 'sessions', 'gzip',
+                                  'index', 'filtre', 'filtre_mmap'])
+def test_executer_mode(tmp_path, mode):
+    """Test qu'un mode s'exécute et retourne ses mesures par étape."""
+    fichier = tmp_path / "access.log"
+    generer_logs(fichier, 2000, graine=0)
+    mesures = executer_mode(mode, fichier)
+    assert mesures['duree_s'] > 0
+    assert {'affichage', 'rapport'} <= set(mesures['etapes'])
+    assert sum(mesures['etapes'].values()) <= mesures['duree_s'] * 1.01
+    if mode == 'index':
+        assert {'indexation', 'requete'} <= set(mesures['etapes'])
+    elif mode.startswith('filtre'):
+        # Seules les lignes retenues par le filtre sont comptées
+        assert 0 < mesures['lignes_lues'] < 2000
+    else:
+        assert mesures['lignes_lues'] == 2000
@@ -0,0 +1,446 @@
+"""
+Tests unitaires pour le module calc_stats.py
+
+Ce fichier contient des tests pour valider le calcul des statistiques
+descriptives, le mode incrémental avec cache, la lecture des fichiers
+compressés, les statistiques glissantes, le bootstrap et les corrélations.
+
+Pour exécuter les tests:
+    pytest tests/test_calc_stats.py
+    pytest tests/test_calc_stats.py -v  # Mode verbeux
+"""
+
+import bz2
+import csv
+import gzip
+import pytest
+import random
+import statistics
+import sys
+from pathlib import Path
+
+# Ajouter le dossier parent au path pour importer calc_stats
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from calc_stats import (
+    calculer_statistiques, AccumulateurStats,
+    calculer_statistiques_incrementales, detecter_compression,
+    lire_blocs_arriere_plan, iterer_lignes, lire_nombres_csv,
+    FenetreGlissante, calculer_statistiques_glissantes, intervalles_bootstrap,
+    AccumulateurCovariance, calculer_correlations, covariance_segment, main
+)
+
+
+VALEURS = [42.5, 38.2, 45.7, 51.3, 39.8, 47.3, 39.5, 51.8, 43.2]
+
+
+def ecrire_csv(chemin, valeurs, en_tete=True):
+    """Écrit un fichier CSV d'une colonne de valeurs."""
+    lignes = (["valeur"] if en_tete else []) + [str(v) for v in valeurs]
+    chemin.write_text("\n".join(lignes) + "\n", encoding='utf-8')
+
+
+# ============================================================================
+# Tests de calculer_statistiques()
+# ============================================================================
+
+def test_calculer_statistiques_valeurs_simples():
+    """Test avec quelques valeurs connues."""
+    stats = calculer_statistiques([1, 2, 3, 4])
+    assert stats['count'] == 4
+    assert stats['mean'] == 2.5
+    assert stats['median'] == 2.5
+    assert stats['range'] == 3
+
+
+def test_calculer_statistiques_liste_vide():
+    """Test qu'une liste vide lève une ValueError."""
+    with pytest.raises(ValueError):
+        calculer_statistiques([])
+
+
+# ============================================================================
+# Tests de AccumulateurStats
+# ============================================================================
+
+def test_accumulateur_identique_au_calcul_exact():
+    """Test que l'accumulateur donne les mêmes moments que statistics."""
+    accumulateur = AccumulateurStats()
+    for valeur in VALEURS:
+        accumulateur.ajouter(valeur)
+    stats = accumulateur.statistiques()
+    assert stats['count'] == len(VALEURS)
+    assert stats['mean'] == pytest.approx(statistics.mean(VALEURS))
+    assert stats['variance'] == pytest.approx(statistics.variance(VALEURS))
+    assert stats['min'] == min(VALEURS)
+    assert stats['max'] == max(VALEURS)
+    assert stats['median'] is None
+
+
+def test_accumulateur_fusion():
+    """Test que la fusion de deux moitiés équivaut au calcul global."""
+    gauche, droite = AccumulateurStats(), AccumulateurStats()
+    for valeur in VALEURS[:4]:
+        gauche.ajouter(valeur)
+    for valeur in VALEURS[4:]:
+        droite.ajouter(valeur)
+    gauche.fusionner(droite)
+    assert gauche.statistiques()['variance'] == pytest.approx(statistics.variance(VALEURS))
+    assert gauche.statistiques()['mean'] == pytest.approx(statistics.mean(VALEURS))
+
+
+def test_accumulateur_serialisation():
+    """Test l'aller-retour vers_dict() / depuis_dict()."""
+    accumulateur = AccumulateurStats()
+    for valeur in VALEURS:
+        accumulateur.ajouter(valeur)
+    copie = AccumulateurStats.depuis_dict(accumulateur.vers_dict())
+    assert copie.statistiques() == accumulateur.statistiques()
+
+
+# ============================================================================
+# Tests du mode incrémental
+# ============================================================================
+
+def test_incremental_premier_passage_complet(tmp_path):
+    """Test que le premier passage fait un calcul complet."""
+    fichier = tmp_path / "nombres.csv"
+    ecrire_csv(fichier, VALEURS)
+    stats, mode = calculer_statistiques_incrementales(fichier)
+    assert mode == 'complet'
+    assert stats['count'] == len(VALEURS)
+
+
+def test_incremental_fichier_inchange(tmp_path):
+    """Test qu'un fichier inchangé est servi depuis le cache."""
+    fichier = tmp_path / "nombres.csv"
+    ecrire_csv(fichier, VALEURS)
+    calculer_statistiques_incrementales(fichier)
+    stats, mode = calculer_statistiques_incrementales(fichier)
+    assert mode == 'cache'
+    assert stats['count'] == len(VALEURS)
+
+
+def test_incremental_lignes_ajoutees(tmp_path):
+    """Test que seules les lignes ajoutées sont lues et fusionnées."""
+    fichier = tmp_path / "nombres.csv"
+    ecrire_csv(fichier, VALEURS[:5])
+    calculer_statistiques_incrementales(fichier)
+    with open(fichier, 'a', encoding='utf-8') as f:
+        f.write("\n".join(str(v) for v in VALEURS[5:]) + "\n")
+
+    stats, mode = calculer_statistiques_incrementales(fichier)
+    assert mode == 'incremental'
+    assert stats['count'] == len(VALEURS)
+    assert stats['mean'] == pytest.approx(statistics.mean(VALEURS))
+
+
+def test_incremental_ligne_finale_incomplete(tmp_path):
+    """Test qu'une ligne sans retour final est comptée mais relue ensuite."""
+    fichier = tmp_path / "nombres.csv"
+    fichier.write_text("valeur\n1\n2\n3", encoding='utf-8')
+    stats, _ = calculer_statistiques_incrementales(fichier)
+    assert stats['count'] == 3
+
+    with open(fichier, 'a', encoding='utf-8') as f:
+        f.write("0\n")
+    stats, mode = calculer_statistiques_incrementales(fichier)
+    assert mode == 'incremental'
+    assert stats['count'] == 3
+    assert stats['max'] == 30
+
+
+def test_incremental_fichier_reecrit(tmp_path):
+    """Test qu'un fichier tronqué ou réécrit déclenche un recalcul complet."""
+    fichier = tmp_path / "nombres.csv"
+    ecrire_csv(fichier, VALEURS)
+    calculer_statistiques_incrementales(fichier)
+
+    ecrire_csv(fichier, [1, 2])
+    stats, mode = calculer_statistiques_incrementales(fichier)
+    assert mode == 'complet'
+    assert stats['count'] == 2
+
+    ecrire_csv(fichier, [7, 8, 9])
+    stats, mode = calculer_statistiques_incrementales(fichier)
+    assert mode == 'complet'
+    assert stats['mean'] == 8
+
+
+# ============================================================================
+# Tests des fichiers compressés
+# ============================================================================
+
+def contenu_csv(valeurs):
+    """Retourne le contenu binaire d'un CSV d'une colonne."""
+    return ("valeur\n" + "\n".join(str(v) for v in valeurs) + "\n").encode('utf-8')
+
+
+def test_detecter_compression(tmp_path):
+    """Test la détection du format d'après les premiers octets."""
+    brut = tmp_path / "brut.csv"
+    brut.write_bytes(contenu_csv(VALEURS))
+    compresse_gz = tmp_path / "sans_extension"
+    compresse_gz.write_bytes(gzip.compress(contenu_csv(VALEURS)))
+    compresse_bz2 = tmp_path / "donnees.csv"
+    compresse_bz2.write_bytes(bz2.compress(contenu_csv(VALEURS)))
+
+    assert detecter_compression(brut) is None
+    assert detecter_compression(compresse_gz) == 'gzip'
+    assert detecter_compression(compresse_bz2) == 'bz2'
+
+
+@pytest.mark.parametrize("compresser", [gzip.compress, bz2.compress])
+def test_lire_nombres_csv_compresse(tmp_path, compresser):
+    """Test que les fichiers compressés donnent les mêmes valeurs."""
+    fichier = tmp_path / "nombres.csv.x"
+    fichier.write_bytes(compresser(contenu_csv(VALEURS)))
+    assert lire_nombres_csv(fichier) == VALEURS
+
+
+def test_iterer_lignes_coupure_entre_blocs():
+    """Test qu'une ligne coupée entre deux blocs est reconstituée."""
+    blocs = [b"valeur\n4", b"2.5\n38", b".2\n", b"45.7"]
+    assert list(iterer_lignes(blocs)) == [b"valeur", b"42.5", b"38.2", b"45.7"]
+
+
+def test_lire_blocs_arriere_plan_propage_erreur():
+    """Test qu'une erreur de lecture du thread est relancée à l'appelant."""
+    class FluxCasse:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def read(self, taille):
+            raise OSError("flux corrompu")
+
+    with pytest.raises(OSError):
+        list(lire_blocs_arriere_plan(FluxCasse()))
+
+
+# ============================================================================
+# Tests des statistiques glissantes
+# ============================================================================
+
+def test_fenetre_glissante_comparaison_force_brute():
+    """Test la fenêtre glissante contre un recalcul complet à chaque pas."""
+    generateur = random.Random(42)
+    valeurs = [generateur.uniform(-100, 100) for _ in range(200)]
+    fenetre = FenetreGlissante()
+    for i, valeur in enumerate(valeurs):
+        fenetre.ajouter(valeur)
+        if len(fenetre) > 7:
+            fenetre.retirer_plus_ancien()
+        attendu = valeurs[max(0, i - 6):i + 1]
+        stats = fenetre.statistiques()
+        assert stats['count'] == len(attendu)
+        assert stats['mean'] == pytest.approx(statistics.mean(attendu))
+        assert stats['min'] == min(attendu)
+        assert stats['max'] == max(attendu)
+        if len(attendu) >= 2:
+            assert stats['stdev'] == pytest.approx(statistics.stdev(attendu))
+
+
+def test_statistiques_glissantes_par_jours(tmp_path):
+    """Test une fenêtre de 2 jours sur des lignes datées."""
+    entree = tmp_path / "ventes.csv"
+    entree.write_text(
+        "date,quantite\n"
+        "2024-01-01,2\n2024-01-01,4\n2024-01-02,6\n2024-01-04,10\n",
+        encoding='utf-8'
+    )
+    sortie = tmp_path / "glissant.csv"
+    assert calculer_statistiques_glissantes(entree, 'quantite', sortie, jours=2) == 4
+
+    with open(sortie, encoding='utf-8') as f:
+        lignes = list(csv.DictReader(f))
+    assert [int(l['count']) for l in lignes] == [1, 2, 3, 1]
+    assert float(lignes[2]['moyenne']) == 4
+    assert float(lignes[3]['min']) == 10
+
+
+def test_statistiques_glissantes_dates_non_triees(tmp_path):
+    """Test qu'un fichier non trié par date est refusé en mode jours."""
+    entree = tmp_path / "ventes.csv"
+    entree.write_text("date,quantite\n2024-01-02,1\n2024-01-01,2\n", encoding='utf-8')
+    with pytest.raises(ValueError):
+        calculer_statistiques_glissantes(entree, 'quantite', tmp_path / "s.csv", jours=3)
+
+
+def test_statistiques_glissantes_lignes_sans_date_valide(tmp_path):
+    """Test qu'une fenêtre en lignes garde les lignes dont la date est invalide."""
+    entree = tmp_path / "ventes.csv"
+    entree.write_text("date,quantite\n2024-01-01,1\nhier,2\n,3\n", encoding='utf-8')
+    sortie = tmp_path / "glissant.csv"
+    assert calculer_statistiques_glissantes(entree, 'quantite', sortie, fenetre=2) == 3
+    with open(sortie, encoding='utf-8') as f:
+        lignes = list(csv.DictReader(f))
+    assert [l['date'] for l in lignes] == ['2024-01-01', '', '']
+    assert float(lignes[2]['moyenne']) == 2.5
+
+
+def test_statistiques_glissantes_fenetre_nulle_et_colonne_date(tmp_path, monkeypatch, capsys):
+    """Test le refus d'une fenêtre nulle et l'en-tête de la colonne de date."""
+    entree = tmp_path / "ventes.csv"
+    entree.write_text("jour,quantite\n2024-01-01,1\n2024-01-02,3\n", encoding='utf-8')
+    sortie = tmp_path / "glissant.csv"
+    for options in ({'fenetre': 0}, {'jours': 0}):
+        with pytest.raises(ValueError):
+            calculer_statistiques_glissantes(entree, 'quantite', sortie, **options)
+    monkeypatch.setattr(sys, 'argv', ['calc_stats.py', str(entree), '--fenetre', '0'])
+    with pytest.raises(SystemExit):
+        main()
+    assert "positive" in capsys.readouterr().out
+
+    calculer_statistiques_glissantes(entree, 'quantite', sortie, jours=2, colonne_date='jour')
+    with open(sortie, encoding='utf-8') as f:
+        assert [l['jour'] for l in csv.DictReader(f)] == ['2024-01-01', '2024-01-02']
+
+
+def test_main_glissant_premiere_colonne_numerique(tmp_path, monkeypatch, capsys):
+    """Test que --fenetre sans --colonne prend la première colonne numérique."""
+    entree = tmp_path / "ventes.csv"
+    entree.write_text("date,produit,quantite\n2024-01-01,a,2\n2024-01-02,b,4\n", encoding='utf-8')
+    sortie = tmp_path / "glissant.csv"
+    monkeypatch.setattr(sys, 'argv', ['calc_stats.py', str(entree), '--fenetre', '2',
+                                      '--sortie', str(sortie)])
+    main()
+    sortie_console = capsys.readouterr().out
+    assert "Colonne analysée: quantite" in sortie_console
+    assert "Avertissement" not in sortie_console
+    with open(sortie, encoding='utf-8') as f:
+        assert [l['quantite'] for l in csv.DictReader(f)] == ['2.0', '4.0']
+
+
+def test_zstd_sans_module(tmp_path, monkeypatch, capsys):
+    """Test le message d'erreur (sans traceback) quand zstandard manque."""
+    entree = tmp_path / "nombres.csv.zst"
+    entree.write_bytes(b'\x28\xb5\x2f\xfd' + b'\x00' * 16)
+    # Un module à None dans sys.modules fait échouer son import
+    monkeypatch.setitem(sys.modules, 'zstandard', None)
+    with pytest.raises(SystemExit):
+        lire_nombres_csv(entree)
+    assert "❌ Erreur: Le module 'zstandard'" in capsys.readouterr().out
+    monkeypatch.setattr(sys, 'argv', ['calc_stats.py', str(entree), '--fenetre', '2'])
+    with pytest.raises(SystemExit):
+        main()
+    assert "zstandard" in capsys.readouterr().out
+
+
+# ============================================================================
+# Tests du bootstrap
+# ============================================================================
+
+def test_bootstrap_reproductible_et_independant_des_blocs():
+    """Test qu'une même graine donne le même résultat, en 1 ou 2 processus."""
+    pytest.importorskip("numpy")
+    memoire = 24 * len(VALEURS) * 50  # Blocs de 50 rééchantillons
+    seul = intervalles_bootstrap(VALEURS, 400, graine=7, memoire_bloc=memoire)
+    pool = intervalles_bootstrap(VALEURS, 400, graine=7, processus=2, memoire_bloc=memoire)
+    assert seul == pool
+
+
+def test_bootstrap_intervalle_contient_estimation():
+    """Test que l'intervalle encadre la moyenne et la médiane observées."""
+    pytest.importorskip("numpy")
+    resultat = intervalles_bootstrap(VALEURS, 2000, niveau=0.9, graine=1)
+    bas, haut = resultat['mean']
+    assert bas < statistics.mean(VALEURS) < haut
+    bas, haut = resultat['median']
+    assert bas <= statistics.median(VALEURS) <= haut
+    assert resultat['niveau'] == 0.9
+
+
+def test_bootstrap_parametres_invalides():
+    """Test les erreurs sur des paramètres invalides."""
+    pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        intervalles_bootstrap([], 100)
+    with pytest.raises(ValueError):
+        intervalles_bootstrap(VALEURS, 100, niveau=1.5)
+
+
+def test_bootstrap_options_incompatibles(monkeypatch, capsys):
+    """Test le refus de --bootstrap avec un mode qui ne l'applique pas."""
+    for options in (['--cache'], ['--correlations'], ['--fenetre', '3'], ['--fenetre-jours', '2']):
+        monkeypatch.setattr(sys, 'argv', ['calc_stats.py', '--bootstrap', '100'] + options)
+        with pytest.raises(SystemExit):
+            main()
+        assert f"--bootstrap ne se combine pas avec {options[0]}" in capsys.readouterr().err
+    for options, message in ((['--bootstrap', '0'], "--bootstrap: au moins 1"),
+                             (['--bootstrap', '-5', '--cache'], "--bootstrap: au moins 1"),
+                             (['--bootstrap', '100', '--niveau', '1.5'], "--niveau: valeur attendue")):
+        monkeypatch.setattr(sys, 'argv', ['calc_stats.py'] + options)
+        with pytest.raises(SystemExit):
+            main()
+        erreurs = capsys.readouterr()
+        assert message in erreurs.err and "Statistiques" not in erreurs.out
+
+
+# ============================================================================
+# Tests de la matrice de covariance / corrélation
+# ============================================================================
+
+def ecrire_csv_colonnes(chemin, nb_lignes, graine=0):
+    """Écrit un CSV avec une colonne texte et trois colonnes numériques corrélées."""
+    generateur = random.Random(graine)
+    with open(chemin, 'w', encoding='utf-8', newline='') as f:
+        ecrivain = csv.writer(f)
+        ecrivain.writerow(['produit', 'a', 'b', 'c'])
+        for i in range(nb_lignes):
+            a = generateur.gauss(10, 2)
+            ecrivain.writerow([f"p{i}", a, 3 * a + generateur.gauss(0, 1), generateur.random()])
+
+
+def test_covariance_par_lots_identique_numpy():
+    """Test que des lots successifs donnent la covariance de numpy."""
+    np = pytest.importorskip("numpy")
+    donnees = np.random.default_rng(3).normal(size=(1000, 4))
+    accumulateur = AccumulateurCovariance(['w', 'x', 'y', 'z'])
+    for debut in range(0, 1000, 137):
+        accumulateur.ajouter_lot(donnees[debut:debut + 137])
+    assert np.allclose(accumulateur.covariance(), np.cov(donnees, rowvar=False))
+    assert np.allclose(accumulateur.correlation(), np.corrcoef(donnees, rowvar=False))
+
+
+def test_covariance_fusion_et_serialisation():
+    """Test la fusion de deux accumulateurs passés par vers_dict()."""
+    np = pytest.importorskip("numpy")
+    donnees = np.random.default_rng(5).normal(size=(300, 2))
+    gauche, droite = AccumulateurCovariance(['x', 'y']), AccumulateurCovariance(['x', 'y'])
+    gauche.ajouter_lot(donnees[:100])
+    droite.ajouter_lot(donnees[100:])
+    gauche = AccumulateurCovariance.depuis_dict(gauche.vers_dict())
+    gauche.fusionner(AccumulateurCovariance.depuis_dict(droite.vers_dict()))
+    assert gauche.count == 300
+    assert np.allclose(gauche.covariance(), np.cov(donnees, rowvar=False))
+
+
+def test_correlations_fichier_colonnes_numeriques(tmp_path):
+    """Test que seules les colonnes numériques sont retenues."""
+    pytest.importorskip("numpy")
+    fichier = tmp_path / "donnees.csv"
+    ecrire_csv_colonnes(fichier, 500)
+    accumulateur = calculer_correlations(fichier)
+    assert accumulateur.colonnes == ['a', 'b', 'c']
+    assert accumulateur.count == 500
+    assert accumulateur.correlation()[0][1] > 0.9
+
+
+def test_correlations_segments_couvrent_tout_le_fichier(tmp_path):
+    """Test que des tranches d'octets arbitraires comptent chaque ligne une fois."""
+    np = pytest.importorskip("numpy")
+    fichier = tmp_path / "donnees.csv"
+    ecrire_csv_colonnes(fichier, 200)
+    taille = fichier.stat().st_size
+    bornes = [0, 17, taille // 3, taille // 2 + 1, taille]
+    total = AccumulateurCovariance(['a', 'b', 'c'])
+    for debut, fin in zip(bornes[:-1], bornes[1:]):
+        total.fusionner(AccumulateurCovariance.depuis_dict(
+            covariance_segment(fichier, debut, fin, [1, 2, 3], ['a', 'b', 'c'])
+        ))
+    reference = calculer_correlations(fichier)
+    assert total.count == 200
+    assert np.allclose(total.covariance(), reference.covariance())
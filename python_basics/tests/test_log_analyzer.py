@@ -0,0 +1,1263 @@
+"""
+Tests unitaires pour le module log_analyzer.py
+
+Ce fichier contient des tests pour valider la lecture, le parsing
+et l'analyse des logs de serveur web.
+
+Pour exécuter les tests:
+    pytest tests/test_log_analyzer.py
+    pytest tests/test_log_analyzer.py -v  # Mode verbeux
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import pickle
+import os
+import pytest
+import random
+import socket
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Ajouter le dossier parent au path pour importer log_analyzer
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import log_analyzer
+from log_analyzer import (
+    lire_logs, parser_ligne_log, parser_ligne_rapide, analyser_logs,
+    EnregistrementLog, AgregatsLogs, decouper_fichier, analyser_segment,
+    analyser_logs_parallele, SpaceSaving, HyperLogLog, SuiviLogs, suivre_logs,
+    ecrire_instantane_json, date_vers_epoch, SerieMinutes, FiltreLogs, lire_statuts,
+    lire_instant, indexer_logs, analyser_logs_indexe, exporter_parquet, analyser_parquet,
+    EsquisseQuantiles, lister_fichiers_logs, analyser_fichiers, preparer_taches, Reservoir,
+    NormaliseurEndpoints, lire_regle, ProfilEtapes, afficher_profil, ecrire_speedscope,
+    IngestionLogs, extraire_ligne_syslog, lire_adresse, lire_blocs, SessionsIP, lire_filtre,
+    afficher_statistiques, generer_rapport_markdown, deriver_graine, REGLES_NORMALISATION
+)
+
+
+LIGNES = [
+    '192.168.1.10 - - [10/Oct/2024:13:55:36 +0000] "GET /index.html HTTP/1.1" 200\n',
+    '192.168.1.11 - - [10/Oct/2024:13:55:37 +0000] "POST /api/login HTTP/1.1" 401\n',
+    '192.168.1.10 - - [10/Oct/2024:13:55:38 +0000] "GET /api/users HTTP/1.1" 200\n',
+    'ligne invalide\n',
+    '10.0.0.5 - - [10/Oct/2024:13:56:01 +0000] "GET /index.html HTTP/1.0" 500\n',
+    '192.168.1.10 - - [10/Oct/2024:13:56:02 +0000] "DELETE /api/users/3 HTTP/1.1" 204\n',
+]
+
+
+@pytest.fixture
+def fichier_logs(tmp_path):
+    """Fichier de logs d'exemple."""
+    fichier = tmp_path / "access.log"
+    fichier.write_text("".join(LIGNES), encoding='utf-8')
+    return fichier
+
+
+# ============================================================================
+# Tests de parser_ligne_log()
+# ============================================================================
+
+def test_parser_ligne_valide():
+    """Test le parsing d'une ligne bien formée."""
+    data = parser_ligne_log(LIGNES[1].strip())
+    assert data['ip'] == '192.168.1.11'
+    assert data['date'] == '10/Oct/2024:13:55:37 +0000'
+    assert data['method'] == 'POST'
+    assert data['endpoint'] == '/api/login'
+    assert data['status'] == 401
+
+
+def test_parser_ligne_invalide():
+    """Test qu'une ligne mal formée retourne None."""
+    assert parser_ligne_log("ligne invalide") is None
+
+
+def test_parser_rapide_enregistrement():
+    """Test que le parser rapide retourne un tuple nommé."""
+    enregistrement = parser_ligne_rapide(LIGNES[4].strip())
+    assert isinstance(enregistrement, EnregistrementLog)
+    assert enregistrement == EnregistrementLog(
+        '10.0.0.5', '10/Oct/2024:13:56:01 +0000', 'GET', '/index.html', 500
+    )
+
+
+@pytest.mark.parametrize("ligne", [
+    '1.2.3.4 - - [10/Oct/2024:13:55:36 +0000] "GET /a HTTP/2" 200',
+    '1.2.3.4 - - [10/Oct/2024:13:55:36 +0000] "GET /a" 200',
+    '',
+])
+def test_parser_rapide_lignes_invalides(ligne):
+    """Test que les lignes non conformes retournent None."""
+    assert parser_ligne_rapide(ligne) is None
+
+
+# ============================================================================
+# Tests de lire_logs() et analyser_logs()
+# ============================================================================
+
+def test_lire_logs_generateur(fichier_logs):
+    """Test que lire_logs() produit les lignes à la demande."""
+    lignes = lire_logs(fichier_logs)
+    assert next(lignes) == LIGNES[0]
+    assert list(lignes) == LIGNES[1:]
+
+
+def test_lire_logs_fichier_inexistant(tmp_path):
+    """Test qu'un fichier inexistant lève FileNotFoundError à la lecture."""
+    with pytest.raises(FileNotFoundError):
+        list(lire_logs(tmp_path / "absent.log"))
+
+
+def test_analyser_logs_depuis_generateur(fichier_logs):
+    """Test que l'analyse en flux compte les lignes au fil de l'eau."""
+    stats = analyser_logs(lire_logs(fichier_logs))
+    assert stats['total_lignes'] == 6
+    assert stats['lignes_parsees'] == 5
+    assert stats['lignes_ignorees'] == 1
+    assert stats['top_ips'][0] == ('192.168.1.10', 3)
+    assert stats['top_endpoints'][0] == ('/index.html', 2)
+    assert stats['status_distribution'] == {200: 2, 401: 1, 500: 1, 204: 1}
+    assert stats['methodes_distribution'] == {'GET': 3, 'POST': 1, 'DELETE': 1}
+    assert stats['total_erreurs'] == 2
+    assert [e['status'] for e in stats['erreurs']] == [401, 500]
+
+
+def test_analyser_logs_vide():
+    """Test l'analyse d'un flux vide."""
+    stats = analyser_logs(iter([]))
+    assert stats['total_lignes'] == 0
+    assert stats['top_ips'] == []
+
+
+# ============================================================================
+# Tests de l'analyse parallèle
+# ============================================================================
+
+@pytest.mark.parametrize("nb_parts", [1, 2, 3, 7, 50])
+def test_decouper_fichier_aligne_sur_les_lignes(fichier_logs, nb_parts):
+    """Test que les tranches sont contiguës et commencent en début de ligne."""
+    contenu = fichier_logs.read_bytes()
+    segments = decouper_fichier(fichier_logs, nb_parts)
+    assert segments[0][0] == 0
+    assert segments[-1][1] == len(contenu)
+    for (_, fin), (debut, _) in zip(segments, segments[1:]):
+        assert fin == debut
+        assert contenu[debut - 1:debut] == b"\n"
+
+
+def test_fusion_segments_identique_analyse_complete(fichier_logs):
+    """Test que la fusion des agrégats partiels donne les stats complètes."""
+    agregats = AgregatsLogs()
+    for debut, fin in decouper_fichier(fichier_logs, 4):
+        agregats.fusionner(analyser_segment(fichier_logs, debut, fin))
+    assert agregats.vers_stats() == analyser_logs(lire_logs(fichier_logs))
+
+
+def test_analyser_logs_parallele(fichier_logs):
+    """Test l'analyse sur plusieurs processus."""
+    assert analyser_logs_parallele(fichier_logs, 2) == analyser_logs(lire_logs(fichier_logs))
+
+
+# ============================================================================
+# Tests du top approximatif (Space-Saving)
+# ============================================================================
+
+def flux_avec_gros_emetteurs(nb_aleatoires=20000, graine=0):
+    """Flux de 3 éléments très fréquents noyés dans des valeurs uniques."""
+    generateur = random.Random(graine)
+    flux = [f"10.0.0.{generateur.randrange(10**6)}" for _ in range(nb_aleatoires)]
+    flux += ["1.1.1.1"] * 3000 + ["2.2.2.2"] * 2000 + ["3.3.3.3"] * 1000
+    generateur.shuffle(flux)
+    return flux
+
+
+def test_space_saving_exact_sous_la_capacite():
+    """Test qu'en dessous de la capacité, le résultat est celui de Counter."""
+    flux = ["a", "b", "a", "c", "b", "a", "d"]
+    resume = SpaceSaving(10)
+    for element in flux:
+        resume.ajouter(element)
+    assert resume.most_common(3) == Counter(flux).most_common(3)
+    assert resume.precision(3)['erreur_max_top'] == 0
+
+
+def test_space_saving_memoire_fixe_et_bornes():
+    """Test que les gros émetteurs sont trouvés et que les bornes sont respectées."""
+    flux = flux_avec_gros_emetteurs()
+    exact = Counter(flux)
+    resume = SpaceSaving(100)
+    for element in flux:
+        resume.ajouter(element)
+
+    assert len(resume) == 100
+    assert [e for e, _ in resume.most_common(3)] == ["1.1.1.1", "2.2.2.2", "3.3.3.3"]
+    for element, erreur in resume.top_avec_erreurs(3):
+        compteur = resume.compteurs[element]
+        assert compteur - erreur <= exact[element] <= compteur
+        assert compteur - exact[element] <= len(flux) // 100
+    assert resume.precision(3)['garantis'] == 3
+
+
+def test_space_saving_fusion():
+    """Test que la fusion de deux résumés garde les gros émetteurs et les bornes."""
+    flux = flux_avec_gros_emetteurs(graine=1)
+    exact = Counter(flux)
+    gauche, droite = SpaceSaving(100), SpaceSaving(100)
+    for element in flux[:len(flux) // 2]:
+        gauche.ajouter(element)
+    for element in flux[len(flux) // 2:]:
+        droite.ajouter(element)
+    gauche.fusionner(droite)
+
+    assert gauche.total == len(flux)
+    assert [e for e, _ in gauche.most_common(3)] == ["1.1.1.1", "2.2.2.2", "3.3.3.3"]
+    for element, erreur in gauche.top_avec_erreurs(3):
+        assert gauche.compteurs[element] - erreur <= exact[element] <= gauche.compteurs[element]
+
+
+def test_top_capacite_invalide_refusee(monkeypatch, capsys):
+    """Test que capacité et précision hors bornes sont des erreurs d'usage, pas inattendues."""
+    monkeypatch.setattr(sys, 'argv', ['log_analyzer.py', '--top-capacite', '0'])
+    with pytest.raises(SystemExit):
+        log_analyzer.main()
+    assert "--top-capacite: 0 hors bornes (attendu au moins 1)" in capsys.readouterr().err
+    monkeypatch.setattr(sys, 'argv', ['log_analyzer.py', '--precision-hll', '19'])
+    with pytest.raises(SystemExit):
+        log_analyzer.main()
+    assert "--precision-hll: 19 hors bornes (attendu entre 4 et 18)" in capsys.readouterr().err
+    assert log_analyzer.entier_borne(1)('5') == 5
+    with pytest.raises(argparse.ArgumentTypeError):
+        log_analyzer.entier_borne(1)('cinq')
+
+
+def test_analyser_logs_top_approximatif(fichier_logs):
+    """Test que le mode approximatif donne le même top sur un petit fichier."""
+    exact = analyser_logs(lire_logs(fichier_logs))
+    approx = analyser_logs(lire_logs(fichier_logs), capacite_top=100)
+    assert approx['top_ips'] == exact['top_ips']
+    assert approx['top_endpoints'] == exact['top_endpoints']
+    assert approx['precision_top']['ips']['erreur_max_top'] == 0
+    assert 'precision_top' not in exact
+
+
+# ============================================================================
+# Tests de HyperLogLog
+# ============================================================================
+
+@pytest.mark.parametrize("nb_distincts", [10, 1000, 50000])
+def test_hyperloglog_erreur_relative(nb_distincts):
+    """Test que l'estimation reste dans 4 écarts-types de la valeur exacte."""
+    hll = HyperLogLog(12)
+    for i in range(nb_distincts):
+        hll.ajouter(f"192.168.{i // 256}.{i % 256}")
+        hll.ajouter(f"192.168.{i // 256}.{i % 256}")  # Les doublons ne comptent pas
+    assert abs(hll.estimation() - nb_distincts) <= 4 * hll.erreur_relative() * nb_distincts
+    assert len(hll.registres) == 4096
+
+
+def test_hyperloglog_fusion():
+    """Test que la fusion équivaut à l'ajout de toutes les valeurs."""
+    gauche, droite, total = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    for i in range(3000):
+        (gauche if i % 2 else droite).ajouter(f"/users/{i}")
+        total.ajouter(f"/users/{i}")
+    gauche.fusionner(droite)
+    assert gauche.registres == total.registres
+
+
+def test_hyperloglog_precision_invalide():
+    """Test les précisions hors limites et la fusion incompatible."""
+    with pytest.raises(ValueError):
+        HyperLogLog(3)
+    with pytest.raises(ValueError):
+        HyperLogLog(10).fusionner(HyperLogLog(12))
+
+
+def test_analyser_logs_distincts(fichier_logs):
+    """Test les distincts exacts et estimés, y compris en parallèle."""
+    exact = analyser_logs(lire_logs(fichier_logs))
+    assert exact['distincts']['methode'] == 'exact'
+    assert exact['distincts']['ips'] == 3
+    assert exact['distincts']['endpoints'] == 4
+
+    estime = analyser_logs_parallele(fichier_logs, 2, capacite_top=100, precision_hll=12)
+    assert estime['distincts']['methode'] == 'hyperloglog'
+    assert estime['distincts']['ips'] == 3
+    assert estime['distincts']['endpoints'] == 4
+
+
+# ============================================================================
+# Tests du mode --follow
+# ============================================================================
+
+def test_suivi_lit_seulement_les_ajouts(fichier_logs):
+    """Test la reprise à la fin du fichier et les lignes incomplètes."""
+    suivi = SuiviLogs(fichier_logs)
+    assert suivi.lire_lignes() == []
+
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write(LIGNES[0] + LIGNES[1][:20])
+    assert suivi.lire_lignes() == [LIGNES[0].rstrip('\n')]
+
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write(LIGNES[1][20:])
+    assert suivi.lire_lignes() == [LIGNES[1].rstrip('\n')]
+    suivi.fermer()
+
+
+def test_suivi_lecture_par_blocs(fichier_logs):
+    """Test que l'arriéré est lu bloc par bloc, sans couper de ligne."""
+    suivi = SuiviLogs(fichier_logs, depuis_debut=True)
+    lots = list(suivi.lire_lots(taille_bloc=64))
+    assert len(lots) > 1
+    assert [l for lot in lots for l in lot] == [l.rstrip('\n') for l in LIGNES]
+    assert list(suivi.lire_lots()) == []
+    suivi.fermer()
+
+
+def test_suivi_rotation_et_troncature(fichier_logs):
+    """Test le changement d'inode (rotation) puis la troncature."""
+    suivi = SuiviLogs(fichier_logs, depuis_debut=True)
+    assert len(suivi.lire_lignes()) == len(LIGNES)
+
+    # Rotation: la fin de l'ancien fichier est lue, puis le nouveau depuis le début
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write(LIGNES[0])
+    os.rename(fichier_logs, fichier_logs.with_suffix('.log.1'))
+    fichier_logs.write_text(LIGNES[1] + LIGNES[2], encoding='utf-8')
+    assert suivi.lire_lignes() == [l.rstrip('\n') for l in LIGNES[:3]]
+
+    # Troncature: le fichier rétrécit, lecture reprise au début
+    fichier_logs.write_text(LIGNES[4], encoding='utf-8')
+    assert suivi.lire_lignes() == [LIGNES[4].rstrip('\n')]
+    suivi.fermer()
+
+
+def test_suivre_logs_agregats_incrementaux(fichier_logs, tmp_path):
+    """Test la boucle de suivi et l'instantané JSON."""
+    instantane = tmp_path / "etat.json"
+    agregats = AgregatsLogs()
+    suivre_logs(fichier_logs, agregats, intervalle=0,
+                rendu=lambda stats: ecrire_instantane_json(stats, instantane),
+                depuis_debut=True, pause=0, duree_max=0)
+
+    stats = json.loads(instantane.read_text(encoding='utf-8'))
+    assert stats['total_lignes'] == len(LIGNES)
+    assert stats['lignes_parsees'] == 5
+    assert stats['status_distribution'] == {'200': 2, '401': 1, '500': 1, '204': 1}
+
+
+def test_suivre_logs_filtre(fichier_logs):
+    """Test que le suivi applique les critères de la requête."""
+    rendus = []
+    suivre_logs(fichier_logs, AgregatsLogs(), intervalle=0, rendu=rendus.append,
+                depuis_debut=True, pause=0, duree_max=0,
+                filtre=FiltreLogs(**lire_filtre("status>=400")))
+    assert rendus[-1]['status_distribution'] == {401: 1, 500: 1}
+    assert rendus[-1]['lignes_filtrees'] == len(LIGNES) - 2
+
+
+# ============================================================================
+# Tests des séries par minute
+# ============================================================================
+
+@pytest.mark.parametrize("texte", [
+    "10/Oct/2024:13:55:36 +0000",
+    "29/Feb/2024:23:59:59 +0200",
+    "01/Jan/1999:00:00:00 -0530",
+    "31/Dec/2030:12:00:01 +0000",
+])
+def test_date_vers_epoch_identique_a_strptime(texte):
+    """Test le calcul manuel de l'epoch contre datetime.strptime."""
+    attendu = datetime.strptime(texte, "%d/%b/%Y:%H:%M:%S %z").timestamp()
+    assert date_vers_epoch(texte) == attendu
+
+
+@pytest.mark.parametrize("texte", ["", "date invalide", "10/Foo/2024:13:55:36 +0000"])
+def test_date_vers_epoch_invalide(texte):
+    assert date_vers_epoch(texte) is None
+
+
+def test_analyser_logs_par_minute(fichier_logs):
+    """Test les requêtes, erreurs et 5xx par minute, y compris en parallèle."""
+    stats = analyser_logs(lire_logs(fichier_logs))
+    par_minute = stats['par_minute']
+    assert par_minute['debut'] == date_vers_epoch("10/Oct/2024:13:55:00 +0000")
+    assert par_minute['requetes'] == [3, 2]
+    assert par_minute['erreurs'] == [1, 1]
+    assert par_minute['erreurs_5xx'] == [0, 1]
+
+    assert analyser_logs_parallele(fichier_logs, 3)['par_minute'] == par_minute
+
+
+def test_serie_minutes_desordre_et_fusion():
+    """Test une ligne antérieure à l'origine et la fusion de séries décalées."""
+    debut = date_vers_epoch("10/Oct/2024:13:55:00 +0000")
+    serie = SerieMinutes()
+    serie.requetes[serie.indice(debut)] += 1
+    serie.requetes[serie.indice(debut - 3 * 3600)] += 1
+    assert serie.vers_dict()['debut'] == debut - 3 * 3600
+    assert sum(serie.vers_dict()['requetes']) == 2
+
+    autre = SerieMinutes()
+    autre.requetes[autre.indice(debut + 600)] += 5
+    serie.fusionner(autre)
+    resultat = serie.vers_dict()
+    assert sum(resultat['requetes']) == 7
+    assert resultat['requetes'][-1] == 5
+    assert len(resultat['requetes']) == 3 * 60 + 11
+
+    # Date aberrante: ignorée plutôt que d'allouer des années de minutes
+    assert serie.indice(0) is None
+
+
+def test_serie_minutes_premiere_date_aberrante(capsys):
+    """Test que la série repart après une première date aberrante et compte les lignes ignorées."""
+    lignes = [LIGNES[0].replace('2024', '1990')] + [
+        f'10.0.0.1 - - [10/Oct/2024:13:{minute:02d}:00 +0000] "GET / HTTP/1.1" 200\n'
+        for minute in range(50, 60)] + [LIGNES[4].replace('2024', '2090')]
+    stats = analyser_logs(lignes)
+    par_minute = stats['par_minute']
+    # La ligne de 1990 et la première de 2024 (avant de repartir), puis celle de 2090
+    assert par_minute['hors_portee'] == 3
+    assert sum(par_minute['requetes']) == stats['lignes_parsees'] - 3
+    assert par_minute['debut'] == date_vers_epoch("10/Oct/2024:13:51:00 +0000")
+    afficher_statistiques(stats)
+    assert "3 lignes aux dates aberrantes" in capsys.readouterr().out
+
+
+# ============================================================================
+# Tests de l'index et des requêtes filtrées
+# ============================================================================
+
+def test_lire_statuts_et_instant():
+    assert lire_statuts("404,5xx") == {404} | set(range(500, 600))
+    assert lire_instant("2024-10-10T13:55:36") == date_vers_epoch("10/Oct/2024:13:55:36 +0000")
+    assert lire_instant("2024-10-10T15:55:36+02:00") == lire_instant("2024-10-10T13:55:36")
+
+
+def test_filtre_enregistrements():
+    """Test les critères de temps, de statut et de méthode."""
+    enregistrements = [parser_ligne_rapide(ligne.strip()) for ligne in LIGNES]
+    enregistrements = [e for e in enregistrements if e is not None]
+    filtre = FiltreLogs(debut=lire_instant("2024-10-10T13:55:37"),
+                        fin=lire_instant("2024-10-10T13:56:02"), statuts=lire_statuts("4xx,5xx"))
+    assert [e.status for e in enregistrements if filtre(e)] == [401, 500]
+    assert [e.method for e in enregistrements if FiltreLogs(methodes={'DELETE'})(e)] == ['DELETE']
+
+
+def test_index_cache_incremental_et_complet(fichier_logs):
+    """Test la réutilisation de l'index, l'ajout de lignes et la réécriture."""
+    index, mode = indexer_logs(fichier_logs, taille_bloc=100)
+    assert mode == 'complet'
+    assert len(index['blocs']) > 1
+    assert sum(sum(bloc['statuts'].values()) for bloc in index['blocs']) == 5
+
+    assert indexer_logs(fichier_logs, taille_bloc=100)[1] == 'cache'
+
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write(LIGNES[4] + LIGNES[0][:15])
+    index, mode = indexer_logs(fichier_logs, taille_bloc=100)
+    assert mode == 'incremental'
+    assert sum(sum(bloc['statuts'].values()) for bloc in index['blocs']) == 6
+    assert index['position'] == fichier_logs.stat().st_size - 15
+
+    fichier_logs.write_text(LIGNES[1], encoding='utf-8')
+    assert indexer_logs(fichier_logs, taille_bloc=100)[1] == 'complet'
+
+
+def test_main_requete_index_seulement_s_il_existe(fichier_logs, monkeypatch, capsys):
+    """Test qu'une requête n'écrit pas d'index et n'utilise qu'un index déjà construit."""
+    monkeypatch.setattr('builtins.input', lambda invite: 'n')
+    monkeypatch.setattr(sys, 'argv', ['log_analyzer.py', str(fichier_logs), '--filtre', 'status>=400'])
+    chemin_index = Path(f"{fichier_logs}.logindex.json")
+    log_analyzer.main()
+    sortie = capsys.readouterr().out
+    assert not chemin_index.exists()
+    assert "Index" not in sortie and "✅ 2 lignes lues" in sortie
+
+    indexer_logs(fichier_logs)
+    log_analyzer.main()
+    assert "Index (cache)" in capsys.readouterr().out
+
+    # Le fichier a grandi: l'index reste valable, la fin est lue sans être indexée
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write(LIGNES[4])
+    contenu_index = chemin_index.read_text(encoding='utf-8')
+    log_analyzer.main()
+    sortie = capsys.readouterr().out
+    assert "Index (partiel)" in sortie and "✅ 3 lignes lues" in sortie
+    assert chemin_index.read_text(encoding='utf-8') == contenu_index
+
+
+def test_analyser_logs_indexe_saute_les_blocs(tmp_path):
+    """Test qu'une requête lit peu de blocs et donne le même résultat qu'un parcours complet."""
+    fichier = tmp_path / "access.log"
+    debut = date_vers_epoch("10/Oct/2024:00:00:00 +0000")
+    lignes = []
+    for i in range(2000):
+        date = datetime.fromtimestamp(debut + 30 * i, timezone.utc).strftime("%d/%b/%Y:%H:%M:%S +0000")
+        status = 503 if i % 97 == 0 else 200
+        lignes.append(f'10.0.0.{i % 7} - - [{date}] "GET /page/{i % 13} HTTP/1.1" {status}\n')
+    fichier.write_text("".join(lignes), encoding='utf-8')
+    indexer_logs(fichier, taille_bloc=4096)
+
+    filtre = FiltreLogs(debut=lire_instant("2024-10-10T06:00"),
+                        fin=lire_instant("2024-10-10T08:00"), statuts=lire_statuts("5xx"))
+    stats = analyser_logs_indexe(fichier, filtre)
+    assert stats['index']['mode'] == 'cache'
+    assert stats['index']['blocs_lus'] < stats['index']['blocs_total'] // 4
+
+    attendu = AgregatsLogs()
+    attendu.analyser(lire_logs(fichier), FiltreLogs(filtre.debut, filtre.fin, filtre.statuts))
+    attendu = attendu.vers_stats()
+    assert stats['total_lignes'] == attendu['total_lignes'] > 0
+    assert stats['status_distribution'] == attendu['status_distribution'] == {503: 2}
+
+
+# ============================================================================
+# Tests de l'export Parquet (pyarrow optionnel)
+# ============================================================================
+
+def test_parquet_memes_statistiques(fichier_logs, tmp_path):
+    """Test que les statistiques calculées sur le Parquet sont celles du texte."""
+    pytest.importorskip("pyarrow")
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write('10.0.0.9 - - [11/Oct/2024:00:00:01 +0000] "PUT /api/users/3 HTTP/1.1" 503\n')
+    dossier = tmp_path / "parquet"
+    resume = exporter_parquet(lire_logs(fichier_logs), dossier, taille_lot=2)
+    assert resume == {'total_lignes': 7, 'lignes_parsees': 6, 'lignes_filtrees': 0,
+                      'jours': ['2024-10-10', '2024-10-11']}
+
+    attendu = analyser_logs(lire_logs(fichier_logs))
+    stats = analyser_parquet(dossier)
+    for cle in ('total_lignes', 'lignes_ignorees', 'status_distribution',
+                'methodes_distribution', 'total_erreurs', 'erreurs', 'distincts'):
+        assert stats[cle] == attendu[cle], cle
+    assert stats['top_ips'][0] == attendu['top_ips'][0] == ('192.168.1.10', 3)
+    assert stats['par_minute']['requetes'] == attendu['par_minute']['requetes']
+
+
+def test_export_parquet_filtre(fichier_logs, tmp_path):
+    """Test que l'export Parquet n'écrit que les lignes retenues par le filtre."""
+    pytest.importorskip("pyarrow")
+    dossier = tmp_path / "parquet"
+    filtre = FiltreLogs(**lire_filtre("path^=/api"))
+    resume = exporter_parquet(lire_logs(fichier_logs), dossier, filtre=filtre)
+    assert resume['lignes_parsees'] == 3
+    assert resume['lignes_filtrees'] == len(LIGNES) - 3
+    attendu = AgregatsLogs()
+    attendu.analyser(lire_logs(fichier_logs), filtre)
+    assert analyser_parquet(dossier)['top_endpoints'] == attendu.vers_stats()['top_endpoints']
+
+
+def test_parquet_filtre_et_dossier_non_vide(fichier_logs, tmp_path):
+    """Test les critères appliqués à la lecture et le refus d'écraser un export."""
+    pytest.importorskip("pyarrow")
+    dossier = tmp_path / "parquet"
+    exporter_parquet(lire_logs(fichier_logs), dossier)
+    filtre = FiltreLogs(debut=lire_instant("2024-10-10T13:55:37"), statuts=lire_statuts("4xx,5xx"))
+    stats = analyser_parquet(dossier, filtre)
+    assert stats['status_distribution'] == {401: 1, 500: 1}
+    assert stats['total_lignes'] == 2
+    assert stats['lignes_filtrees'] == len(LIGNES) - 1 - 2
+
+    with pytest.raises(FileExistsError):
+        exporter_parquet(lire_logs(fichier_logs), dossier)
+
+
+# ============================================================================
+# Tests du format combiné (taille, user-agent, durée)
+# ============================================================================
+
+LIGNES_COMBINEES = [
+    '1.2.3.4 - alice [10/Oct/2024:13:55:36 +0000] "GET /a HTTP/1.1" 200 2326 "http://x/" "Mozilla/5.0 (X11)" 0.120\n',
+    '1.2.3.5 - - [10/Oct/2024:13:55:37 +0000] "GET /a HTTP/1.1" 304 - "-" "curl/8.0" 0.004\n',
+    '1.2.3.4 - - [10/Oct/2024:13:55:38 +0000] "POST /b HTTP/1.1" 500 100 "-" "curl/8.0" 1.500\n',
+    '1.2.3.6 - - [10/Oct/2024:13:55:39 +0000] "GET /a HTTP/1.1" 200 1000\n',
+]
+
+
+def test_parser_format_combine():
+    """Test l'extraction de la taille, du referer, du user-agent et de la durée."""
+    enregistrement = parser_ligne_rapide(LIGNES_COMBINEES[0].strip())
+    assert enregistrement.taille == 2326
+    assert enregistrement.referer == 'http://x/'
+    assert enregistrement.user_agent == 'Mozilla/5.0 (X11)'
+    assert enregistrement.duree == 0.12
+    assert parser_ligne_rapide(LIGNES_COMBINEES[1].strip()).taille == 0
+    commun = parser_ligne_rapide(LIGNES_COMBINEES[3].strip())
+    assert (commun.taille, commun.user_agent, commun.duree) == (1000, None, None)
+    echappe = parser_ligne_rapide(
+        '1.2.3.4 - - [10/Oct/2024:13:55:36 +0000] "GET /a HTTP/1.1" 200 5 "-" "x \\"y\\" z" 0.5')
+    assert (echappe.user_agent, echappe.duree) == ('x \\"y\\" z', 0.5)
+
+
+def test_esquisse_quantiles_precision_et_fusion():
+    """Test l'erreur relative des quantiles, la fusion et la mémoire bornée."""
+    generateur = random.Random(3)
+    valeurs = sorted(generateur.lognormvariate(-3, 1) for _ in range(20000))
+    gauche, droite = EsquisseQuantiles(), EsquisseQuantiles()
+    for i, valeur in enumerate(valeurs):
+        (gauche if i % 2 else droite).ajouter(valeur)
+    gauche.fusionner(droite)
+    assert gauche.nombre == len(valeurs)
+    for q in (0.5, 0.95, 0.99):
+        exact = valeurs[int(q * (len(valeurs) - 1))]
+        assert abs(gauche.quantile(q) - exact) / exact <= 0.021
+
+    # Classes basses regroupées: les hauts quantiles gardent leur précision
+    bornee = EsquisseQuantiles(nb_classes_max=64)
+    for valeur in valeurs:
+        bornee.ajouter(valeur)
+    assert len(bornee.classes) <= 64
+    exact = valeurs[int(0.99 * (len(valeurs) - 1))]
+    assert abs(bornee.quantile(0.99) - exact) / exact <= 0.021
+    assert EsquisseQuantiles().quantile(0.5) is None
+
+
+def test_analyser_logs_bande_passante_et_latences(tmp_path):
+    """Test la bande passante, les latences et les user-agents, y compris en parallèle."""
+    fichier = tmp_path / "combine.log"
+    fichier.write_text("".join(LIGNES_COMBINEES), encoding='utf-8')
+    stats = analyser_logs(lire_logs(fichier))
+    assert stats['octets_total'] == 3426
+    assert stats['top_bande_passante'] == [('/a', 3326), ('/b', 100)]
+    assert stats['distincts']['user_agents'] == 2
+    assert stats['latences']['globale']['nombre'] == 3
+    latences = dict(stats['latences']['endpoints'])
+    assert latences['/b']['p50'] == pytest.approx(1.5, rel=0.02)
+
+    parallele = analyser_logs_parallele(fichier, 2)
+    assert parallele['top_bande_passante'] == stats['top_bande_passante']
+    assert parallele['latences'] == stats['latences']
+
+
+def test_latences_par_lot_comme_esquisses():
+    """Test que les latences comptées par lot donnent les esquisses valeur par valeur."""
+    generateur = random.Random(4)
+    lignes, globale, par_endpoint = [], EsquisseQuantiles(), {}
+    for i in range(2000):
+        endpoint, duree = f"/e{i % 7}", round(generateur.lognormvariate(-3, 1), 3)
+        lignes.append(f'1.2.3.4 - - [10/Oct/2024:13:55:36 +0000] "GET {endpoint} HTTP/1.1" '
+                      f'200 10 "-" "curl" {duree:.3f}')
+        globale.ajouter(duree)
+        par_endpoint.setdefault(endpoint, EsquisseQuantiles()).ajouter(duree)
+    agregats = AgregatsLogs()
+    agregats.analyser(lignes)
+    assert agregats.latence_globale.classes == globale.classes
+    assert list(agregats.latences) == list(par_endpoint)
+    assert all(agregats.latences[e].classes == esquisse.classes
+               for e, esquisse in par_endpoint.items())
+
+
+def test_parquet_bande_passante_et_latences(tmp_path):
+    """Test que l'analyse Parquet retrouve la bande passante et les latences."""
+    pytest.importorskip("pyarrow")
+    fichier = tmp_path / "combine.log"
+    fichier.write_text("".join(LIGNES_COMBINEES), encoding='utf-8')
+    exporter_parquet(lire_logs(fichier), tmp_path / "parquet")
+    stats = analyser_parquet(tmp_path / "parquet")
+    attendu = analyser_logs(lire_logs(fichier))
+    assert stats['octets_total'] == attendu['octets_total']
+    assert stats['top_bande_passante'] == attendu['top_bande_passante']
+    assert stats['distincts']['user_agents'] == 2
+    assert stats['latences']['globale']['p50'] == pytest.approx(0.12)
+
+
+# ============================================================================
+# Tests de l'analyse de plusieurs fichiers (rotation, gzip)
+# ============================================================================
+
+@pytest.fixture
+def dossier_rotation(tmp_path):
+    """Logs tournés: access.log.2.gz (le plus ancien), access.log.1, access.log."""
+    dossier = tmp_path / "logs"
+    dossier.mkdir()
+    with gzip.open(dossier / "access.log.2.gz", 'wt', encoding='utf-8') as f:
+        f.write("".join(LIGNES[:2]))
+    (dossier / "access.log.1").write_text("".join(LIGNES[2:4]), encoding='utf-8')
+    (dossier / "access.log").write_text("".join(LIGNES[4:]), encoding='utf-8')
+    (dossier / "notes.txt").write_text("pas un log", encoding='utf-8')
+    return dossier
+
+
+def test_lister_fichiers_logs(dossier_rotation):
+    """Test les dossiers, les motifs glob, l'ordre de rotation et les chemins absents."""
+    attendus = [str(dossier_rotation / nom) for nom in ("access.log.2.gz", "access.log.1", "access.log")]
+    assert lister_fichiers_logs([dossier_rotation]) == attendus
+    assert lister_fichiers_logs([str(dossier_rotation / "access.log*")]) == attendus
+    assert lister_fichiers_logs([dossier_rotation / "access.log", dossier_rotation]) == [
+        attendus[2], attendus[0], attendus[1]]
+    with pytest.raises(FileNotFoundError):
+        lister_fichiers_logs([str(dossier_rotation / "*.zip")])
+
+
+def test_lire_logs_gzip(dossier_rotation):
+    """Test la décompression transparente."""
+    assert list(lire_logs(dossier_rotation / "access.log.2.gz")) == LIGNES[:2]
+
+
+def test_analyser_fichiers_identique_a_un_seul_fichier(dossier_rotation, fichier_logs):
+    """Test la fusion des agrégats de fichiers texte et gzip, en série et en parallèle."""
+    fichiers = lister_fichiers_logs([dossier_rotation])
+    attendu = analyser_logs(lire_logs(fichier_logs))
+    for workers in (1, 3):
+        stats = analyser_fichiers(fichiers, workers)
+        for cle in ('total_lignes', 'top_ips', 'status_distribution', 'erreurs', 'par_minute'):
+            assert stats[cle] == attendu[cle], (workers, cle)
+
+    filtre = FiltreLogs(statuts=lire_statuts("5xx"))
+    assert analyser_fichiers(fichiers, 2, filtre=filtre)['status_distribution'] == {500: 1}
+
+
+def test_preparer_taches_gzip_entier(dossier_rotation):
+    """Test qu'un gzip reste une seule tâche et qu'un gros fichier texte est découpé."""
+    gros = dossier_rotation / "access.log"
+    gros.write_text("".join(LIGNES) * 50, encoding='utf-8')
+    taches = preparer_taches([str(dossier_rotation / "access.log.2.gz"), str(gros)], 4)
+    assert taches[0] == (str(dossier_rotation / "access.log.2.gz"), 0, None)
+    assert len(taches) == 5
+    assert [fin for _, _, fin in taches[1:]][-1] == gros.stat().st_size
+
+
+# ============================================================================
+# Tests de l'échantillonnage des erreurs (réservoir)
+# ============================================================================
+
+def test_reservoir_uniforme():
+    """Test que chaque élément a la même probabilité d'être retenu, fusion comprise."""
+    essais, taille = 4000, 5
+    simple, fusion = Counter(), Counter()
+    for essai in range(essais):
+        reservoir = Reservoir(taille, graine=essai)
+        for i in range(50):
+            reservoir.ajouter(i)
+        assert len(reservoir) == taille and reservoir.vus == 50
+        simple.update(reservoir.elements)
+
+        gauche, droite = Reservoir(taille, graine=2 * essai), Reservoir(taille, graine=2 * essai + 1)
+        for i in range(15):
+            gauche.ajouter(i)
+        for i in range(15, 50):
+            droite.ajouter(i)
+        gauche.fusionner(droite)
+        fusion.update(gauche.elements)
+
+    attendu = essais * taille / 50
+    for compteur in (simple, fusion):
+        assert len(compteur) == 50
+        assert all(abs(n - attendu) < 0.25 * attendu for n in compteur.values())
+
+
+def test_reservoir_reste_uniforme_apres_fusion():
+    """Test l'ajout d'éléments après une fusion (saut tiré selon la loi Bêta)."""
+    essais, compteur = 3000, Counter()
+    for essai in range(essais):
+        gauche, droite = Reservoir(4, graine=essai), Reservoir(4, graine=-essai - 1)
+        for i in range(10):
+            (gauche if i < 5 else droite).ajouter(i)
+        gauche.fusionner(droite)
+        for i in range(10, 40):
+            gauche.ajouter(i)
+        compteur.update(gauche.elements)
+    attendu = essais * 4 / 40
+    assert all(abs(compteur[i] - attendu) < 0.25 * attendu for i in range(40))
+
+
+def test_graines_distinctes_par_statut():
+    """Test que les réservoirs par statut ne tirent pas les mêmes rangs."""
+    lignes = [f'10.0.0.1 - - [10/Oct/2024:13:55:36 +0000] "GET /{status}/{i} HTTP/1.1" {status}\n'
+              for i in range(50) for status in (404, 500)]
+    rangs_identiques = []
+    for graine in range(5):
+        stats = analyser_logs(lignes, nb_exemples=1, par_statut=True, graine=graine)
+        rang_404, rang_500 = (e['endpoint'].rsplit('/', 1)[1] for e in stats['erreurs'])
+        rangs_identiques.append(rang_404 == rang_500)
+    assert not all(rangs_identiques)
+    assert deriver_graine(1, 404) == deriver_graine(1, 404) != deriver_graine(1, 500)
+    assert deriver_graine(None, 404) is None
+
+
+def test_echantillon_erreurs_par_statut(fichier_logs):
+    """Test l'échantillon par statut et les comptes exacts d'erreurs."""
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write(LIGNES[4] * 200)
+    stats = analyser_logs(lire_logs(fichier_logs), nb_exemples=3, par_statut=True, graine=0)
+    assert stats['total_erreurs'] == 202
+    assert stats['erreurs_par_statut'] == {401: 1, 500: 201}
+    assert [e['status'] for e in stats['erreurs']] == [401, 500, 500, 500]
+
+    parallele = analyser_fichiers([str(fichier_logs)], 3, nb_exemples=3)
+    assert len(parallele['erreurs']) == 3
+    assert parallele['erreurs_par_statut'] == stats['erreurs_par_statut']
+
+
+# --- Normalisation des endpoints ---
+
+def test_normaliseur_gabarits():
+    """Test le remplacement des segments variables par leur gabarit."""
+    normaliser = NormaliseurEndpoints()
+    assert normaliser('/users/48213/orders/99') == '/users/{id}/orders/{id}'
+    assert normaliser('/s/123e4567-e89b-12d3-a456-426614174000') == '/s/{uuid}'
+    assert normaliser('/blob/0123456789abcdef0123') == '/blob/{hash}'
+    assert normaliser('/files/123.json?v=2') == '/files/{id}.json'
+    assert normaliser('/v2/api') == '/v2/api'
+    assert NormaliseurEndpoints(garder_requete=True)('/a/1?b=2') == '/a/{id}?b=2'
+
+
+def test_normaliseur_cache_et_pickle():
+    """Test le cache LRU et la reconstruction du motif après pickle."""
+    normaliser = NormaliseurEndpoints(taille_cache=8)
+    for _ in range(3):
+        normaliser('/users/1')
+    assert normaliser.normaliser.cache_info().hits == 2
+    copie = pickle.loads(pickle.dumps(normaliser))
+    assert copie('/users/1') == '/users/{id}'
+    assert copie.taille_cache == 8
+
+
+def test_regles_personnalisees():
+    """Test une règle ajoutée en tête et le rejet des règles invalides."""
+    normaliser = NormaliseurEndpoints([lire_regle('annee=\\d{4}'), ('id', r'\d+')])
+    assert normaliser('/archives/2024/12') == '/archives/{annee}/{id}'
+    for texte in ('sans-egal', '1nom=x', 'nom=('):
+        with pytest.raises(argparse.ArgumentTypeError):
+            lire_regle(texte)
+    # Une règle de même nom qu'une règle par défaut la remplace
+    normaliser = NormaliseurEndpoints([lire_regle('id=[0-9]{3}')] + REGLES_NORMALISATION)
+    assert [nom for nom, _ in normaliser.regles] == ['id', 'uuid', 'hash']
+    assert normaliser('/users/123/posts/45') == '/users/{id}/posts/45'
+
+
+def test_agregats_normalises(fichier_logs):
+    """Test que les compteurs d'endpoints utilisent les gabarits, en série comme en parallèle."""
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        for i in range(20):
+            f.write(f'10.0.0.{i} - - [10/Oct/2024:13:56:00 +0000] "GET /users/{i} HTTP/1.1" 404 10\n')
+    stats = analyser_logs(lire_logs(fichier_logs), normaliseur=NormaliseurEndpoints())
+    assert dict(stats['top_endpoints'])['/users/{id}'] == 20
+    assert stats['normalisation'] == ['uuid', 'id', 'hash']
+    # Les exemples d'erreurs gardent l'endpoint brut
+    assert all(e['endpoint'][len('/users/'):].isdigit() for e in stats['erreurs']
+               if e['status'] == 404)
+
+    parallele = analyser_logs_parallele(fichier_logs, 3, normaliseur=NormaliseurEndpoints())
+    assert parallele['top_endpoints'] == stats['top_endpoints']
+
+
+def test_parquet_normalise(fichier_logs, tmp_path):
+    """Test la normalisation vectorisée sur le dictionnaire des endpoints Parquet."""
+    pytest.importorskip("pyarrow")
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        for i in range(5):
+            f.write(f'10.0.0.{i} - - [10/Oct/2024:13:56:00 +0000] "GET /users/{i} HTTP/1.1" 500 10\n')
+    dossier = tmp_path / 'parquet'
+    exporter_parquet(lire_logs(fichier_logs), dossier, taille_lot=3)
+    attendu = analyser_logs(lire_logs(fichier_logs), normaliseur=NormaliseurEndpoints())
+    stats = analyser_parquet(dossier, normaliseur=NormaliseurEndpoints())
+    assert dict(stats['top_endpoints']) == dict(attendu['top_endpoints'])
+    assert stats['distincts']['endpoints'] == len(dict(attendu['top_endpoints']))
+    assert '{id}' not in ''.join(e['endpoint'] for e in stats['erreurs'])
+
+
+# --- Profil par étape ---
+
+def test_profil_relaie_les_lignes_et_echantillonne(fichier_logs):
+    """Test que les lignes passent inchangées et qu'une ligne sur N est parsée à part."""
+    profil = ProfilEtapes(echantillon=3, taille_lot=4)
+    lignes = [f'{i}\n' for i in range(11)]
+    assert list(profil.lignes(lignes)) == lignes
+    assert profil.lignes_lues == 11
+    # Lignes 0, 3, 6 et 9: le pas continue d'un lot à l'autre
+    assert profil.lignes_echantillon == 4
+    assert 'lire_logs' in profil.durees
+
+
+def test_profil_repartition(fichier_logs, capsys):
+    """Test la répartition par étape d'une analyse mesurée."""
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write(LIGNES[0] * 500)
+    profil = ProfilEtapes(echantillon=10)
+    with profil.etape('analyser_logs'):
+        stats = analyser_logs(profil.lignes(lire_logs(fichier_logs)))
+    with profil.etape('afficher_statistiques'):
+        pass
+    assert stats['total_lignes'] == profil.lignes_lues == 506
+    etapes = dict(profil.repartition())
+    assert list(etapes) == ['lire_logs', 'parser_ligne_rapide', 'analyser_logs',
+                            'afficher_statistiques']
+    assert etapes['parser_ligne_rapide'] > 0
+    assert sum(etapes.values()) <= profil.durees['analyser_logs'] + profil.durees['afficher_statistiques']
+
+    afficher_profil(profil)
+    assert '506 lignes lues' in capsys.readouterr().out
+
+
+def test_ecrire_speedscope(tmp_path):
+    """Test le document speedscope: une pile par étape, pondérée par sa durée."""
+    profil = ProfilEtapes()
+    profil.durees = {'lire_logs': 0.5, 'analyser_logs': 2.0, 'afficher_statistiques': 0.25}
+    chemin = tmp_path / 'profil.json'
+    ecrire_speedscope(profil, chemin)
+    document = json.loads(chemin.read_text(encoding='utf-8'))
+    noms = [frame['name'] for frame in document['shared']['frames']]
+    assert noms == ['analyse', 'lire_logs', 'analyser_logs', 'afficher_statistiques']
+    profile = document['profiles'][0]
+    assert profile['samples'] == [[0, 1], [0, 2], [0, 3]]
+    assert profile['weights'] == [0.5, 1.5, 0.25]
+    assert profile['endValue'] == 2.25
+
+
+# --- Ingestion asynchrone (fichiers et syslog UDP) ---
+
+def test_extraire_ligne_syslog():
+    """Test le retrait des en-têtes RFC 3164 et RFC 5424."""
+    ligne = LIGNES[0].strip()
+    assert extraire_ligne_syslog(f'<134>Oct 10 13:55:36 web1 nginx: {ligne}') == ligne
+    assert extraire_ligne_syslog(f'<134>Oct  1 03:05:06 web1 nginx[42]: {ligne}') == ligne
+    assert extraire_ligne_syslog(f'<134>1 2024-10-10T13:55:36Z web1 nginx - - - {ligne}') == ligne
+    assert extraire_ligne_syslog(f'<134>1 2024-10-10T13:55:36Z web1 nginx 7 ID [a b="c"] {ligne}') == ligne
+    assert extraire_ligne_syslog(ligne) == ligne
+    assert lire_adresse('0.0.0.0:5140') == ('0.0.0.0', 5140)
+    assert lire_adresse(':514') == ('127.0.0.1', 514)
+    with pytest.raises(argparse.ArgumentTypeError):
+        lire_adresse('hote:port')
+
+
+def test_ingestion_plusieurs_fichiers(dossier_rotation):
+    """Test que l'ingestion asynchrone donne les mêmes comptes que l'analyse des fichiers."""
+    fichiers = lister_fichiers_logs([dossier_rotation])
+    ingestion = IngestionLogs(AgregatsLogs(), taille_lot=2)
+    asyncio.run(ingestion.executer(fichiers))
+    stats = ingestion.vers_stats()
+    attendu = analyser_fichiers(fichiers)
+    assert stats['total_lignes'] == attendu['total_lignes']
+    assert stats['status_distribution'] == attendu['status_distribution']
+    assert stats['ingestion']['sources'] == len(fichiers)
+    assert stats['ingestion']['lignes_recues'] == attendu['total_lignes']
+
+
+def test_ingestion_contre_pression(fichier_logs):
+    """Test que la lecture attend quand la file est pleine, sans perdre de lignes."""
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write(LIGNES[0] * 300)
+    ingestion = IngestionLogs(AgregatsLogs(), taille_lot=5, max_lots=1)
+    asyncio.run(ingestion.executer([str(fichier_logs)]))
+    assert ingestion.attentes > 0
+    assert ingestion.vers_stats()['total_lignes'] == 306
+
+    async def file_pleine():
+        ingestion.file = asyncio.Queue(1)
+        ingestion.file.put_nowait(['déjà là'])
+        ingestion.recevoir(['a', 'b'])
+        ingestion.vider_udp()
+    asyncio.run(file_pleine())
+    assert ingestion.lignes_perdues == 2
+
+
+def test_ingestion_rendus_frequents_sans_perte(fichier_logs):
+    """Test qu'un délai de rendu écoulé pendant l'attente d'un lot ne perd aucun lot."""
+    with open(fichier_logs, 'a', encoding='utf-8') as f:
+        f.write(LIGNES[0] * 300)
+    rendus = []
+    ingestion = IngestionLogs(AgregatsLogs(), taille_lot=3, max_lots=1)
+    asyncio.run(ingestion.executer([str(fichier_logs)], rendu=rendus.append, intervalle=0))
+    assert len(rendus) > 1
+    assert rendus[-1]['total_lignes'] == 306
+
+
+def test_ingestion_erreur_lecteur_en_suivi(tmp_path):
+    """Test qu'un fichier illisible arrête le suivi tout de suite, avec son erreur."""
+    ingestion = IngestionLogs(AgregatsLogs())
+    debut = time.monotonic()
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(ingestion.executer([str(tmp_path / 'absent.log')], suivre=True,
+                                       pause=0.05, duree_max=30))
+    assert time.monotonic() - debut < 10
+
+
+def test_ingestion_filtre(dossier_rotation):
+    """Test que l'ingestion asynchrone applique les critères à chaque lot."""
+    fichiers = lister_fichiers_logs([dossier_rotation])
+    filtre = FiltreLogs(**lire_filtre("method==GET"))
+    ingestion = IngestionLogs(AgregatsLogs(), taille_lot=2, filtre=filtre)
+    asyncio.run(ingestion.executer(fichiers))
+    stats = ingestion.vers_stats()
+    attendu = analyser_fichiers(fichiers, filtre=filtre)
+    assert stats['methodes_distribution'] == attendu['methodes_distribution'] == {
+        'GET': attendu['lignes_parsees']}
+    assert stats['lignes_filtrees'] == attendu['lignes_filtrees'] > 0
+
+
+def test_ingestion_udp():
+    """Test la réception de logs syslog envoyés en UDP sur la boucle locale."""
+    messages = [f'<134>Oct 10 13:55:36 web{i % 2} nginx: {LIGNES[i % 3]}'.strip() for i in range(30)]
+
+    async def scenario():
+        ingestion = IngestionLogs(AgregatsLogs(), taille_lot=8)
+        tache = asyncio.create_task(ingestion.executer(adresse_udp=('127.0.0.1', 0),
+                                                       pause=0.05, duree_max=10))
+        while ingestion.adresse_udp is None:
+            await asyncio.sleep(0.01)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as envoyeur:
+            for message in messages:
+                envoyeur.sendto(message.encode(), ingestion.adresse_udp)
+        while ingestion.lignes_recues < len(messages):
+            await asyncio.sleep(0.01)
+        ingestion.arreter()
+        await tache
+        return ingestion.vers_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['total_lignes'] == stats['lignes_parsees'] == 30
+    assert stats['status_distribution'] == {200: 20, 401: 10}
+    assert stats['ingestion']['udp'].startswith('127.0.0.1:')
+    assert stats['ingestion']['lignes_perdues'] == 0
+
+
+# --- Parsing des octets (mmap) ---
+
+def test_analyser_octets_comme_texte():
+    """Test que le parsing des octets donne les mêmes statistiques que le texte."""
+    lignes = LIGNES + LIGNES_COMBINEES + ['\n', '  \n', LIGNES[4].rstrip('\n')]
+    for options in ({}, {'capacite_top': 3, 'precision_hll': 10}):
+        texte = AgregatsLogs(graine=5, par_statut=True, **options)
+        texte.analyser(lignes)
+        octets = AgregatsLogs(graine=5, par_statut=True, **options)
+        octets.analyser_octets(''.join(lignes).encode('utf-8'))
+        assert octets.vers_stats() == texte.vers_stats()
+    assert octets.total_lignes == len(lignes)
+
+
+def test_analyser_octets_garde_les_cles_en_octets():
+    """Test que les compteurs restent indexés par octets jusqu'à vers_stats()."""
+    agregats = AgregatsLogs(normaliseur=NormaliseurEndpoints())
+    agregats.analyser_octets(''.join(LIGNES).encode('utf-8'))
+    assert set(agregats.ips) == {b'192.168.1.10', b'192.168.1.11', b'10.0.0.5'}
+    assert b'/api/users/{id}' in agregats.endpoints
+    stats = agregats.vers_stats()
+    assert ('/api/users/{id}', 1) in stats['top_endpoints']
+    assert all(isinstance(e['ip'], str) for e in stats['erreurs'])
+    with pytest.raises(ValueError):
+        agregats.analyser(LIGNES)
+
+
+def test_analyser_fichiers_octets(dossier_rotation, tmp_path, monkeypatch):
+    """Test le mmap par fenêtres, les tranches parallèles et les fichiers gzip."""
+    fichiers = lister_fichiers_logs([dossier_rotation])
+    assert analyser_fichiers(fichiers, octets=True, graine=1) == analyser_fichiers(fichiers, graine=1)
+
+    fichier = tmp_path / 'grand.log'
+    fichier.write_text(''.join(LIGNES_COMBINEES * 50 + LIGNES * 50), encoding='utf-8')
+    # Fenêtres plus petites qu'une ligne: chaque fenêtre s'étend jusqu'à la fin de ligne
+    monkeypatch.setattr(log_analyzer, 'TAILLE_FENETRE_MMAP', 50)
+    attendu = analyser_fichiers([str(fichier)], graine=1)
+    assert analyser_fichiers([str(fichier)], octets=True, graine=1) == attendu
+    parallele = analyser_fichiers([str(fichier)], 3, octets=True)
+    assert parallele['top_ips'] == attendu['top_ips']
+    assert parallele['par_minute'] == attendu['par_minute']
+
+    (tmp_path / 'vide.log').write_bytes(b'')
+    assert analyser_fichiers([str(tmp_path / 'vide.log')], octets=True)['total_lignes'] == 0
+    with pytest.raises(ValueError):
+        analyser_fichiers(fichiers, octets=True, filtre=lambda enregistrement: True)
+
+
+def test_lire_blocs(dossier_rotation):
+    """Test que les blocs finissent en fin de ligne et redonnent tout le fichier."""
+    blocs = list(lire_blocs(dossier_rotation / "access.log.2.gz", taille_bloc=30))
+    assert b''.join(blocs) == ''.join(LIGNES[:2]).encode('utf-8')
+    assert all(bloc.endswith(b'\n') for bloc in blocs)
+
+
+# --- Sessions par IP et débits anormaux ---
+
+def ligne_a(ip, instant):
+    """Ligne de log d'une IP à un instant epoch donné."""
+    date = datetime.fromtimestamp(instant, timezone.utc).strftime('%d/%b/%Y:%H:%M:%S +0000')
+    return f'{ip} - - [{date}] "GET / HTTP/1.1" 200 10\n'
+
+
+def test_sessions_inactivite_et_eviction():
+    """Test qu'une pause plus longue que le délai ouvre une nouvelle session."""
+    sessions = SessionsIP(delai=100, fenetre=10, seuil=1000)
+    for instant in (0, 50, 120):
+        sessions('a', instant)
+    sessions('b', 130)
+    assert list(sessions.actives) == ['a', 'b']
+    sessions('b', 300)          # 'a' inactive depuis 180 s: sa session est close
+    assert list(sessions.actives) == ['b']
+    sessions('b', 301)
+    resume = sessions.resume()
+    # a: [0..120], b: [130], b: [300, 301]
+    assert resume['total'] == 3 and resume['ouvertes'] == 1
+    assert resume['ouvertes_max'] == 2
+    assert dict(resume['top_ips']) == {'a': 1, 'b': 2}
+    assert resume['duree']['nombre'] == 3
+    assert sessions.durees.quantile(1) == pytest.approx(120, rel=0.02)
+    # resume() ne modifie pas l'état
+    assert sessions.resume() == resume
+
+
+def test_sessions_fenetre_glissante():
+    """Test que le débit ne compte que les requêtes de la fenêtre."""
+    sessions = SessionsIP(fenetre=60, nb_cases=6, seuil=20)
+    for instant in range(0, 200, 3):        # 20 requêtes par minute: jamais au-delà du seuil
+        sessions('lent', instant)
+    for instant in range(0, 30):
+        sessions('rafale', 1000 + instant // 10)
+    assert sessions.actives['lent'].debit <= 21
+    resume = sessions.resume()
+    assert [a['ip'] for a in resume['anomalies']] == ['rafale']
+    assert resume['anomalies'][0]['pic'] == 30
+    assert resume['anomalies'][0]['debut'] == 1002
+    # Après une longue pause l'anneau est vidé
+    sessions('rafale', 2000)
+    assert sessions.actives['rafale'].debit == 1
+
+
+def test_sessions_anomalies_bornees():
+    """Test que le nombre d'IPs anormales gardées est borné."""
+    sessions = SessionsIP(seuil=1, max_anomalies=2)
+    for ip in 'abcd':
+        sessions(ip, 0)
+        sessions(ip, 0)
+    resume = sessions.resume()
+    assert resume['nb_anomalies'] == 2 and resume['anomalies_ignorees'] == 2
+
+
+def test_agregats_sessions_texte_et_octets():
+    """Test les sessions calculées par analyser() et analyser_octets()."""
+    lignes = [ligne_a('10.0.0.1', 1728518400 + t) for t in range(0, 40, 2)]
+    lignes += [ligne_a('10.0.0.2', 1728518400 + t) for t in (5, 4000)] + ['ligne invalide\n']
+    texte = AgregatsLogs(sessions=SessionsIP(seuil=10))
+    texte.analyser(lignes)
+    octets = AgregatsLogs(sessions=SessionsIP(seuil=10))
+    octets.analyser_octets(''.join(lignes).encode('utf-8'))
+    stats = texte.vers_stats()
+    assert octets.vers_stats() == stats
+    assert stats['sessions']['total'] == 3
+    assert stats['sessions']['anomalies'][0]['ip'] == '10.0.0.1'
+    assert stats['sessions']['anomalies'][0]['debut'] == 1728518400 + 20
+    assert 'sessions' not in AgregatsLogs().vers_stats()
+
+
+def test_sessions_sans_date_lisible(tmp_path, capsys):
+    """Test l'affichage et le rapport quand aucune session n'a pu être formée."""
+    agregats = AgregatsLogs(sessions=SessionsIP())
+    agregats.analyser(['10.0.0.1 - - [garbage] "GET / HTTP/1.1" 200 10\n'])
+    stats = agregats.vers_stats()
+    assert stats['sessions']['total'] == 0
+    assert stats['sessions']['duree']['p50'] is None
+    afficher_statistiques(stats)
+    assert "Sessions                  : 0" in capsys.readouterr().out
+    rapport = tmp_path / "rapport.md"
+    generer_rapport_markdown(stats, rapport)
+    assert "- Sessions : 0" in rapport.read_text(encoding='utf-8')
+
+
+def test_sessions_fusion_et_pickle():
+    """Test la fusion de morceaux consécutifs et le passage à un autre processus."""
+    premier, second = SessionsIP(delai=100), SessionsIP(delai=100)
+    premier('a', 0)
+    premier('b', 10)
+    second('b', 50)
+    second = pickle.loads(pickle.dumps(second))
+    premier.fusionner(second)
+    # La session de 'b' à cheval sur les deux morceaux compte deux fois
+    assert premier.resume()['total'] == 3
+    assert list(premier.actives) == ['b']
+
+
+# --- Filtre poussé avant le parsing ---
+
+def test_lire_filtre():
+    """Test la traduction d'une expression en critères de FiltreLogs."""
+    criteres = lire_filtre("status>=500 and path^=/api,/static AND method==get,post")
+    assert criteres['statuts'] == set(range(500, 600))
+    assert criteres['prefixes'] == ['/api', '/static']
+    assert criteres['methodes'] == {'GET', 'POST'}
+    # Les conditions restreignent les critères déjà donnés
+    criteres = lire_filtre("status!=5xx and date>2024-10-10T14:00 and ip^=10.",
+                           statuts=lire_statuts("404,500"), debut=lire_instant("2024-10-10T15:00"))
+    assert criteres['statuts'] == {404}
+    assert criteres['debut'] == lire_instant("2024-10-10T15:00")
+    assert lire_filtre("date<=2024-10-10T14:00")['fin'] == lire_instant("2024-10-10T14:00") + 1
+    for expression in ("status~500", "method>=GET", "taille>10"):
+        with pytest.raises(ValueError):
+            lire_filtre(expression)
+    # Deux préfixes sur un même champ: le plus long quand l'un prolonge l'autre
+    assert lire_filtre("path^=/api,/static and path^=/api/v2,/admin")['prefixes'] == ['/api/v2']
+    assert lire_filtre("path^=/a and path^=/b")['prefixes'] == []
+
+
+def test_filtre_indices():
+    """Test les indices cherchés dans la ligne brute."""
+    filtre = FiltreLogs(**lire_filtre("method==GET and status==404,503 and path^=/api"))
+    assert filtre.indices == (('" 404', '" 503'), (' /api',), ('"GET ',))
+    assert filtre.precontrole(LIGNES[1]) is False
+    assert FiltreLogs(statuts=lire_statuts("4xx")).precontrole(LIGNES[1])
+    # Trop de centaines: pas d'indice, le statut est vérifié après le parsing
+    assert FiltreLogs(**lire_filtre("status!=200")).indices == ()
+    assert FiltreLogs(prefixes_ip=['10.']).en_octets().indices == ((b'10.',),)
+
+
+def test_precontrole_evite_le_parsing(monkeypatch):
+    """Test que les lignes sans indice ne sont pas parsées et donnent les mêmes stats."""
+    appels = []
+
+    def parser_compte(ligne):
+        appels.append(ligne)
+        return parser_ligne_rapide(ligne)
+
+    monkeypatch.setattr(log_analyzer, 'parser_ligne_rapide', parser_compte)
+    filtre = FiltreLogs(**lire_filtre("status>=400 and path^=/api"))
+    pousse = AgregatsLogs()
+    pousse.analyser(LIGNES + LIGNES_COMBINEES, filtre)
+    assert all('" 4' in ligne or '" 5' in ligne for ligne in appels)
+    assert len(appels) < len(LIGNES + LIGNES_COMBINEES)
+    attendu = AgregatsLogs()
+    attendu.analyser(LIGNES + LIGNES_COMBINEES, lambda e: filtre(e))
+    stats, attendu = pousse.vers_stats(), attendu.vers_stats()
+    assert stats['lignes_parsees'] == attendu['lignes_parsees'] > 0
+    assert stats['status_distribution'] == attendu['status_distribution']
+    # La ligne invalide n'a pas d'indice: elle est comptée hors filtre
+    assert stats['lignes_ignorees'] == 0 < attendu['lignes_ignorees']
+    assert stats['total_lignes'] + stats['lignes_filtrees'] == len(LIGNES + LIGNES_COMBINEES)
+    assert attendu['total_lignes'] + attendu['lignes_filtrees'] == len(LIGNES + LIGNES_COMBINEES)
+
+
+def test_analyser_octets_filtre(tmp_path, monkeypatch):
+    """Test que le filtre sur les octets (lignes candidates) donne les mêmes stats que le texte."""
+    fichier = tmp_path / 'grand.log'
+    fichier.write_text(''.join((LIGNES_COMBINEES + LIGNES) * 30), encoding='utf-8')
+    monkeypatch.setattr(log_analyzer, 'TAILLE_FENETRE_MMAP', 300)
+    for expression in ("status>=400", "status==401,500 and method==POST,GET", "path^=/api and ip^=192.",
+                       "date>=2024-10-10T13:56", "method==DELETE"):
+        filtre = FiltreLogs(**lire_filtre(expression))
+        attendu = analyser_fichiers([str(fichier)], filtre=filtre, graine=2)
+        assert analyser_fichiers([str(fichier)], filtre=filtre, octets=True, graine=2) == attendu, expression
+        assert attendu['lignes_parsees'] > 0
+        assert attendu['total_lignes'] + attendu['lignes_filtrees'] == len(LIGNES_COMBINEES + LIGNES) * 30
+    # Préfixes incompatibles: aucune ligne candidate, toutes hors filtre
+    filtre = FiltreLogs(**lire_filtre("path^=/a and path^=/b"))
+    stats = analyser_fichiers([str(fichier)], filtre=filtre, octets=True)
+    assert stats['total_lignes'] == 0
+    assert stats['lignes_filtrees'] == len(LIGNES_COMBINEES + LIGNES) * 30
+
+
+def test_parquet_filtre_prefixes(fichier_logs, tmp_path):
+    """Test les préfixes d'endpoint et d'IP appliqués à la lecture du Parquet."""
+    pytest.importorskip("pyarrow")
+    dossier = tmp_path / "parquet"
+    exporter_parquet(lire_logs(fichier_logs), dossier)
+    stats = analyser_parquet(dossier, FiltreLogs(**lire_filtre("path^=/api and ip^=192.168.1.10")))
+    assert stats['top_endpoints'] == [('/api/users', 1), ('/api/users/3', 1)]
+    assert stats['total_erreurs'] == 0